@@ -1,5 +1,6 @@
 from .crossover import *
 from .encoding import *
+from .evaluation import *
 from .genetic_algorithm import *
 from .mutation import *
 from .selection import *
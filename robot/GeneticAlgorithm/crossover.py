@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from .encoding import Genotype, Chromosome
-from typing import Tuple
+from .encoding import Genotype, Chromosome, PackedGenotype, as_packed
+from typing import Tuple, Union
 import random
+
+import numpy as np
 from fuzzy_logic import CombinedMembershipFunctions, MembershipFunction
 
 
@@ -11,118 +13,162 @@ class CrossoverStrategy(ABC):
     @abstractmethod
     def crossover(
         self, parent1: Genotype, parent2: Genotype
-    ) -> Tuple[Genotype, Genotype]:
-        """Performs crossover between two parent genotypes."""
+    ) -> Tuple[PackedGenotype, PackedGenotype]:
+        """Performs crossover between two parent genotypes and returns packed offspring."""
         pass
 
+    def crossover_mask(
+        self, shape: Tuple[int, int, int], rng: np.random.Generator
+    ) -> np.ndarray:
+        """Boolean (pairs, chromosomes, genes) mask of the genes taken from the other parent."""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support batch crossover."
+        )
+
+    def crossover_batch(
+        self,
+        parents1: np.ndarray,
+        parents2: np.ndarray,
+        rng: np.random.Generator,
+        integer1: np.ndarray = None,
+        integer2: np.ndarray = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Crosses (pairs, chromosomes, genes) value arrays pairwise in one pass.
+
+        The `PackedGenotype.integer` masks of the parents, when given, are crossed the same way in place.
+        """
+        mask = self.crossover_mask(parents1.shape, rng)
+        if integer1 is not None:
+            crossed = np.where(mask, integer2, integer1)
+            integer2[...] = np.where(mask, integer1, integer2)
+            integer1[...] = crossed
+        return np.where(mask, parents2, parents1), np.where(mask, parents1, parents2)
+
+
+def _clone_parents(
+    parent1: Union[Genotype, PackedGenotype], parent2: Union[Genotype, PackedGenotype]
+) -> Tuple[PackedGenotype, PackedGenotype]:
+    offspring1 = as_packed(parent1).clone()
+    packed2 = as_packed(parent2)
+    offspring2 = PackedGenotype(offspring1.layout, packed2.values.copy(), packed2.integer.copy())
+    if offspring1.values.shape != offspring2.values.shape:
+        raise ValueError("Parents must have the same genotype layout.")
+    return offspring1, offspring2
+
+
+def _swap_genes(offspring1: PackedGenotype, offspring2: PackedGenotype, index) -> None:
+    """Exchanges the genes at index, values and integer marks alike."""
+    for array1, array2 in ((offspring1.values, offspring2.values), (offspring1.integer, offspring2.integer)):
+        taken = array1[index].copy()
+        array1[index] = array2[index]
+        array2[index] = taken
+
 
 class OnePointCrossoverExtra(CrossoverStrategy):
     """One-point crossover strategy at the gene level inside each chromosome."""
 
     def crossover(
         self, parent1: Genotype, parent2: Genotype
-    ) -> Tuple[Genotype, Genotype]:
-        offspring1 = Genotype()
-        offspring2 = Genotype()
-        for c1, c2 in zip(parent1.chromosomes, parent2.chromosomes):
-            # Perform one-point crossover for each chromosome
-            point = random.randint(0, len(c1.genes_list) - 1)
-            new_c1 = c1.clone()
-            new_c2 = c2.clone()
+    ) -> Tuple[PackedGenotype, PackedGenotype]:
+        offspring1, offspring2 = _clone_parents(parent1, parent2)
+        num_genes = offspring1.values.shape[1]
 
-            for i in range(point, len(new_c1)):
-                new_c1.set_gene_at_index(i, c2.genes_list[i].clone())
-                new_c2.set_gene_at_index(i, c1.genes_list[i].clone())
-
-            offspring1.add_chromosome(new_c1)
-            offspring2.add_chromosome(new_c2)
+        for c in range(len(offspring1)):
+            # Perform one-point crossover for each chromosome
+            point = random.randint(0, num_genes - 1)
+            _swap_genes(offspring1, offspring2, (c, slice(point, None)))
 
         return offspring1, offspring2
 
+    def crossover_mask(
+        self, shape: Tuple[int, int, int], rng: np.random.Generator
+    ) -> np.ndarray:
+        points = rng.integers(0, shape[2], shape[:2])
+        return np.arange(shape[2]) >= points[..., None]
+
 
 class OnePointCrossover(CrossoverStrategy):
     """One-point crossover strategy at the gene level inside each chromosome."""
 
     def crossover(
         self, parent1: Genotype, parent2: Genotype
-    ) -> Tuple[Genotype, Genotype]:
-        offspring1 = Genotype()
-        offspring2 = Genotype()
-
-        point = random.randint(0, len(parent1.chromosomes[0].genes_list) - 1)
-
-        for c1, c2 in zip(parent1.chromosomes, parent2.chromosomes):
+    ) -> Tuple[PackedGenotype, PackedGenotype]:
+        offspring1, offspring2 = _clone_parents(parent1, parent2)
 
-            new_c1 = c1.clone()
-            new_c2 = c2.clone()
-
-            for i in range(point, len(new_c1)):
-                new_c1.set_gene_at_index(i, c2.genes_list[i].clone())
-                new_c2.set_gene_at_index(i, c1.genes_list[i].clone())
-
-            offspring1.add_chromosome(new_c1)
-            offspring2.add_chromosome(new_c2)
+        point = random.randint(0, offspring1.values.shape[1] - 1)
+        _swap_genes(offspring1, offspring2, (slice(None), slice(point, None)))
 
         return offspring1, offspring2
 
+    def crossover_mask(
+        self, shape: Tuple[int, int, int], rng: np.random.Generator
+    ) -> np.ndarray:
+        # one point per pair, shared by all chromosomes
+        points = rng.integers(0, shape[2], shape[0])
+        mask = np.arange(shape[2]) >= points[:, None, None]
+        return np.broadcast_to(mask, shape)
+
 
 class TwoPointCrossover(CrossoverStrategy):
     """Two-point crossover strategy at the gene level inside each chromosome."""
 
     def crossover(
         self, parent1: Genotype, parent2: Genotype
-    ) -> Tuple[Genotype, Genotype]:
-        offspring1 = Genotype()
-        offspring2 = Genotype()
+    ) -> Tuple[PackedGenotype, PackedGenotype]:
+        offspring1, offspring2 = _clone_parents(parent1, parent2)
+        num_genes = offspring1.values.shape[1]
 
-        for c1, c2 in zip(parent1.chromosomes, parent2.chromosomes):
+        for c in range(len(offspring1)):
             # Perform two-point crossover for each chromosome
-            point1 = random.randint(0, len(c1.genes_list) - 2)
-            point2 = random.randint(point1 + 1, len(c1.genes_list) - 1)
-            new_c1 = c1.clone()
-            new_c2 = c2.clone()
-
-            for i in range(point1, point2):
-                new_c1.set_gene_at_index(i, c2.genes_list[i].clone())
-                new_c2.set_gene_at_index(i, c1.genes_list[i].clone())
-
-            offspring1.add_chromosome(new_c1)
-            offspring2.add_chromosome(new_c2)
+            point1 = random.randint(0, num_genes - 2)
+            point2 = random.randint(point1 + 1, num_genes - 1)
+            _swap_genes(offspring1, offspring2, (c, slice(point1, point2)))
 
         return offspring1, offspring2
 
+    def crossover_mask(
+        self, shape: Tuple[int, int, int], rng: np.random.Generator
+    ) -> np.ndarray:
+        points1 = rng.integers(0, shape[2] - 1, shape[:2])
+        points2 = rng.integers(points1 + 1, shape[2])
+        genes = np.arange(shape[2])
+        return (genes >= points1[..., None]) & (genes < points2[..., None])
+
 
 class UniformCrossover(CrossoverStrategy):
     """Uniform crossover strategy at the gene level where each gene has a 50% chance to come from either parent."""
 
     def crossover(
         self, parent1: Genotype, parent2: Genotype
-    ) -> Tuple[Genotype, Genotype]:
-        offspring1 = Genotype()
-        offspring2 = Genotype()
-
-        for c1, c2 in zip(parent1.chromosomes, parent2.chromosomes):
-            new_c1 = c1.clone()
-            new_c2 = c2.clone()
-
-            for i in range(len(c1.genes_list)):
-                if random.random() < 0.5:
-                    new_c1.set_gene_at_index(i, c2.genes_list[i].clone())
-                    new_c2.set_gene_at_index(i, c1.genes_list[i].clone())
+    ) -> Tuple[PackedGenotype, PackedGenotype]:
+        offspring1, offspring2 = _clone_parents(parent1, parent2)
+        values1 = offspring1.values
 
-            offspring1.add_chromosome(new_c1)
-            offspring2.add_chromosome(new_c2)
+        swap = np.array(
+            [[random.random() < 0.5 for _ in row] for row in values1], dtype=bool
+        ).reshape(values1.shape)
+        _swap_genes(offspring1, offspring2, swap)
 
         return offspring1, offspring2
 
+    def crossover_mask(
+        self, shape: Tuple[int, int, int], rng: np.random.Generator
+    ) -> np.ndarray:
+        return rng.random(shape) < 0.5
+
 
 class NoCrossover(CrossoverStrategy):
     """No crossover strategy, returns clones of both parents."""
 
     def crossover(
         self, parent1: Genotype, parent2: Genotype
-    ) -> Tuple[Genotype, Genotype]:
-        return parent1.clone(), parent2.clone()
+    ) -> Tuple[PackedGenotype, PackedGenotype]:
+        return as_packed(parent1).clone(), as_packed(parent2).clone()
+
+    def crossover_mask(
+        self, shape: Tuple[int, int, int], rng: np.random.Generator
+    ) -> np.ndarray:
+        return np.zeros(shape, dtype=bool)
 
 
 def main():
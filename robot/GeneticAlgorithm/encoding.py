@@ -1,7 +1,10 @@
 from fuzzy_logic import CombinedMembershipFunctions, MembershipFunction
-from typing import Tuple, Callable, List, Dict, Union
+from typing import Tuple, Callable, List, Dict, Union, Mapping
 import copy
 import random
+import weakref
+
+import numpy as np
 
 
 class Gene:
@@ -206,6 +209,28 @@ class Genotype:
         """Creates a deep copy of the Genotype."""
         return copy.deepcopy(self)
 
+    def get_values(self) -> List[List[Union[int, float, str]]]:
+        """Returns the gene values of every chromosome, which unlike the genes can be pickled."""
+        return [
+            [gene.value for gene in chromosome.genes_list]
+            for chromosome in self.chromosomes
+        ]
+
+    def set_values(self, values: List[List[Union[int, float, str]]]) -> None:
+        """Loads gene values produced by get_values() of a genotype with the same layout."""
+        if len(values) != len(self.chromosomes):
+            raise ValueError(
+                f"Expected values for {len(self.chromosomes)} chromosomes, got {len(values)}."
+            )
+        for chromosome, chromosome_values in zip(self.chromosomes, values):
+            genes = chromosome.genes_list
+            if len(chromosome_values) != len(genes):
+                raise ValueError(
+                    f"Expected {len(genes)} gene values, got {len(chromosome_values)}."
+                )
+            for gene, value in zip(genes, chromosome_values):
+                gene.value = value
+
     def scamble(self):
         for chromosomes in self.chromosomes:
             for gene in chromosomes.rules_list:
@@ -213,6 +238,21 @@ class Genotype:
             for gene in chromosomes.returns_list:
                 gene.value = random.uniform(gene.variant[0], gene.variant[1])
 
+    def pack(self) -> "PackedGenotype":
+        """Returns a copy of the gene values as a PackedGenotype; the layout is built once and cached."""
+        layout = _layouts.get(self)
+        if layout is None or not layout.matches(self):
+            layout = _layouts[self] = GenotypeLayout(self)
+        packed = PackedGenotype(layout, None)
+        packed.set_values(self.get_values())
+        return packed
+
+    def compile(
+        self, fuzzifiers: Dict[Union[str, int], Callable[..., Mapping]] = None
+    ) -> "CompiledGenotype":
+        """Returns an array-backed evaluator equivalent to evaluate(), see CompiledGenotype."""
+        return CompiledGenotype(self, fuzzifiers)
+
     def evaluate(self, args: Dict[str, any]) -> Tuple[float, ...]:
         """Evaluates all chromosomes and sums their evaluation results."""
         try:
@@ -233,6 +273,286 @@ class Genotype:
             raise RuntimeError(f"Error during Genotype evaluation: {e}")
 
 
+# layouts of packed templates, dropped together with their genotype
+_layouts: "weakref.WeakKeyDictionary[Genotype, GenotypeLayout]" = weakref.WeakKeyDictionary()
+
+
+class GenotypeLayout:
+    """Gene metadata (names, mappings, funcs, variants) shared by every packed genotype of a template.
+
+    Genes are never mutated through the layout; only their metadata is read.
+    """
+
+    def __init__(self, template: Genotype) -> None:
+        if not template.chromosomes:
+            raise ValueError("The template genotype has no chromosomes.")
+        self.genes: List[List[Gene]] = [
+            list(chromosome.genes_list) for chromosome in template.chromosomes
+        ]
+        self.rule_counts: List[int] = [
+            len(chromosome.rules_list) for chromosome in template.chromosomes
+        ]
+        if len(set(map(len, self.genes))) != 1:
+            raise ValueError("All chromosomes must have the same number of genes.")
+
+        # (chromosomes, genes) tables for the batch operators
+        shape = self.shape
+        self.rule_mask = np.zeros(shape, dtype=bool)
+        self.variant_counts = np.zeros(shape, dtype=float)
+        self.return_low = np.zeros(shape, dtype=float)
+        self.return_high = np.zeros(shape, dtype=float)
+        # return genes whose template value is an int, the default of PackedGenotype.integer
+        self.return_integer = np.zeros(shape, dtype=bool)
+        self.same_variants = np.zeros(shape + (shape[1],), dtype=bool)
+        for c, genes in enumerate(self.genes):
+            rule_count = self.rule_counts[c]
+            self.rule_mask[c, :rule_count] = True
+            for i, gene in enumerate(genes):
+                if i < rule_count:
+                    self.variant_counts[c, i] = len(gene.variant)
+                    for j in range(rule_count):
+                        self.same_variants[c, i, j] = gene.variant == genes[j].variant
+                else:
+                    self.return_low[c, i], self.return_high[c, i] = gene.variant[0], gene.variant[1]
+                    self.return_integer[c, i] = self.is_integer(c, i, gene.value)
+
+    def matches(self, genotype: Genotype) -> bool:
+        """True while genotype still holds the very gene objects this layout was built from."""
+        return len(genotype.chromosomes) == len(self.genes) and all(
+            len(chromosome.rules_list) == rule_count
+            and all(a is b for a, b in zip(chromosome.genes_list, genes))
+            for chromosome, genes, rule_count in zip(
+                genotype.chromosomes, self.genes, self.rule_counts
+            )
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (len(self.genes), len(self.genes[0]))
+
+    def is_rule(self, chromosome: int, index: int) -> bool:
+        return index < self.rule_counts[chromosome]
+
+    def is_integer(self, chromosome: int, index: int, value: Union[int, float, str]) -> bool:
+        """True for a return gene value that is an int, which the mutations treat apart from floats."""
+        return not self.is_rule(chromosome, index) and isinstance(value, int)
+
+    def encode(self, chromosome: int, index: int, value: Union[int, float, str]) -> float:
+        if self.is_rule(chromosome, index):
+            return float(self.genes[chromosome][index].variant.index(value))
+        return float(value)
+
+    def decode(self, chromosome: int, index: int, value: float) -> Union[int, float, str]:
+        if self.is_rule(chromosome, index):
+            return self.genes[chromosome][index].variant[int(value)]
+        return float(value)
+
+
+class PackedGenotype:
+    """Genotype stored as a (chromosomes, genes) float array over a shared GenotypeLayout.
+
+    Rule genes hold the index of their value in `variant`, return genes hold their value.
+    `integer` marks the return genes whose value is an int rather than a float, as
+    RandomResetMutation leaves them, so the operators can tell them apart like they do
+    on Genotype values. Cloning copies the arrays only, so the GA operators never
+    deep-copy mappings or lambdas.
+    """
+
+    __slots__ = ("layout", "values", "integer")
+
+    def __init__(self, layout: GenotypeLayout, values: np.ndarray, integer: np.ndarray = None) -> None:
+        self.layout = layout
+        self.values = values
+        self.integer = layout.return_integer.copy() if integer is None else integer
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __str__(self) -> str:
+        return str(self.unpack())
+
+    def clone(self) -> "PackedGenotype":
+        """Creates a copy of the gene values; the layout is shared."""
+        return PackedGenotype(self.layout, self.values.copy(), self.integer.copy())
+
+    def scamble(self) -> None:
+        """Draws random values in the same order as Genotype.scamble()."""
+        for c, genes in enumerate(self.layout.genes):
+            for i, gene in enumerate(genes):
+                if self.layout.is_rule(c, i):
+                    self.values[c, i] = random.randrange(len(gene.variant))
+                else:
+                    self.values[c, i] = random.uniform(gene.variant[0], gene.variant[1])
+        self.integer[:] = False
+
+    def decode(self, chromosome: int, index: int, value: float) -> Union[int, float, str]:
+        if self.integer[chromosome, index]:
+            return int(value)
+        return self.layout.decode(chromosome, index, value)
+
+    def get_values(self) -> List[List[Union[int, float, str]]]:
+        """Same nested gene values as Genotype.get_values()."""
+        return [
+            [self.decode(c, i, value) for i, value in enumerate(row)]
+            for c, row in enumerate(self.values.tolist())
+        ]
+
+    def set_values(self, values: List[List[Union[int, float, str]]]) -> None:
+        self.values = np.array(
+            [
+                [self.layout.encode(c, i, value) for i, value in enumerate(row)]
+                for c, row in enumerate(values)
+            ],
+            dtype=float,
+        )
+        self.integer = np.array(
+            [
+                [self.layout.is_integer(c, i, value) for i, value in enumerate(row)]
+                for c, row in enumerate(values)
+            ],
+            dtype=bool,
+        )
+
+    def unpack(self) -> Genotype:
+        """Builds a Genotype whose genes share the layout metadata."""
+        genotype = Genotype()
+        for c, row in enumerate(self.values.tolist()):
+            genes = []
+            for i, value in enumerate(row):
+                gene = copy.copy(self.layout.genes[c][i])
+                gene.value = self.decode(c, i, value)
+                genes.append(gene)
+            split = self.layout.rule_counts[c]
+            genotype.add_chromosome(
+                Chromosome(rules_list=genes[:split], returns_list=genes[split:])
+            )
+        return genotype
+
+    def compile(
+        self, fuzzifiers: Dict[Union[str, int], Callable[..., Mapping]] = None
+    ) -> "CompiledGenotype":
+        return CompiledGenotype(self.unpack(), fuzzifiers)
+
+    def evaluate(self, args: Dict[str, any]) -> Tuple[float, ...]:
+        return self.unpack().evaluate(args)
+
+
+def as_packed(genotype: Union[Genotype, PackedGenotype]) -> PackedGenotype:
+    """Returns genotype itself when it is already packed, otherwise a packed copy."""
+    if isinstance(genotype, PackedGenotype):
+        return genotype
+    return genotype.pack()
+
+class CompiledGenotype:
+    """Array-backed form of a Genotype that gives the same results as Genotype.evaluate().
+
+    Every (rule gene name, value) pair used by any chromosome gets one slot in a membership
+    vector, which is filled once per evaluation instead of once per chromosome. A fuzzifier
+    registered for a gene name is called once and returns the membership of every value
+    (e.g. `lambda **args: dist_msf.fuzzify(args["x"])`); values it does not cover fall back
+    to the gene mapping. Firing strengths and sums keep the order of the original loops, so
+    results are bit-for-bit equal.
+
+    The genotype is compiled on first use; call compile() again after changing gene values.
+    """
+
+    def __init__(
+        self,
+        genotype: Genotype,
+        fuzzifiers: Dict[Union[str, int], Callable[..., Mapping]] = None,
+    ) -> None:
+        self.genotype = genotype
+        self.fuzzifiers = fuzzifiers if fuzzifiers else {}
+        self._compiled = False
+        self._last_key = None
+        self._last_result = None
+
+    def compile(self) -> None:
+        chromosomes = self.genotype.chromosomes
+        if not chromosomes:
+            raise ValueError("No chromosomes to evaluate.")
+
+        # slots[name] = [(value, mapping function, slot index), ...]
+        self._slots: Dict[Union[str, int], List[Tuple]] = {}
+        slot_of: Dict[Tuple, int] = {}
+        rule_index = []
+        for chromosome in chromosomes:
+            row = []
+            for rule in chromosome.rules_list:
+                key = (rule.name, rule.value)
+                if key not in slot_of:
+                    if rule.value not in rule.mapping:
+                        raise ValueError(f"Value {rule.value} not found in mapping.")
+                    slot_of[key] = len(slot_of)
+                    self._slots.setdefault(rule.name, []).append(
+                        (rule.value, rule.mapping[rule.value], slot_of[key])
+                    )
+                row.append(slot_of[key])
+            rule_index.append(row)
+        if len(set(map(len, rule_index))) != 1:
+            raise ValueError("All chromosomes must have the same number of rule genes.")
+
+        self._rule_index = np.array(rule_index, dtype=np.intp).reshape(len(chromosomes), -1)
+        self._memberships = np.empty(len(slot_of), dtype=float)
+        self._return_genes = [chromosome.returns_list for chromosome in chromosomes]
+        self._return_names = {ret.name for ret in chromosomes[0].returns_list}
+        self._returns = np.array(
+            [[ret.evaluate() for ret in returns] for returns in self._return_genes],
+            dtype=float,
+        )
+        self._compiled = True
+        self._last_key = None
+
+    def _fill_memberships(self, args: Dict[str, any]) -> np.ndarray:
+        memberships = self._memberships
+        for name, slots in self._slots.items():
+            rule_args = args.get(name, {})
+            fuzzifier = self.fuzzifiers.get(name)
+            fuzzified = fuzzifier(**rule_args) if fuzzifier is not None else {}
+            for value, function, slot in slots:
+                memberships[slot] = (
+                    fuzzified[value] if value in fuzzified else function(**rule_args)
+                )
+        return memberships
+
+    def _return_values(self, args: Dict[str, any]) -> np.ndarray:
+        if not self._return_names.intersection(args):
+            return self._returns
+        return np.array(
+            [
+                [ret.evaluate(**args.get(ret.name, {})) for ret in returns]
+                for returns in self._return_genes
+            ],
+            dtype=float,
+        )
+
+    @staticmethod
+    def _args_key(args: Dict[str, any]) -> Tuple:
+        return tuple(
+            (name, tuple(value.items()) if isinstance(value, dict) else value)
+            for name, value in args.items()
+        )
+
+    def evaluate(self, args: Dict[str, any]) -> Tuple[float, ...]:
+        """Same as Genotype.evaluate(); repeated calls with equal args reuse the last result."""
+        if not self._compiled:
+            self.compile()
+        key = self._args_key(args)
+        if key == self._last_key:
+            return self._last_result
+
+        memberships = self._fill_memberships(args)
+        firing = np.ones(len(self._rule_index))
+        for column in self._rule_index.T:
+            firing *= memberships[column]
+        # running sum over chromosomes, in the order Genotype.evaluate adds them
+        contributions = firing[:, None] * self._return_values(args)
+        result = tuple(np.cumsum(contributions, axis=0)[-1].tolist())
+
+        self._last_key = key
+        self._last_result = result
+        return result
+
 def main():
     dist_msf = CombinedMembershipFunctions()
     dist_msf.add_membership(
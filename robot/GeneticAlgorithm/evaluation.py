@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean
+from typing import Callable, List, Optional, Sequence
+import os
+import random
+
+import numpy as np
+
+from .encoding import Genotype
+
+# fitness_function(genotype, seed) -> fitness of one headless episode
+FitnessFunction = Callable[[Genotype, int], float]
+
+# per-process state, set up once by _init_worker
+_worker_template: Optional[Genotype] = None
+_worker_fitness_function: Optional[FitnessFunction] = None
+
+
+def _init_worker(
+    genotype_factory: Callable[[], Genotype], fitness_function: FitnessFunction
+) -> None:
+    global _worker_template, _worker_fitness_function
+    _worker_template = genotype_factory()
+    _worker_fitness_function = fitness_function
+
+
+def _run_episode(template: Genotype, fitness_function: FitnessFunction, values, seed: int) -> float:
+    """Load the gene values into the template and run one seeded episode."""
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    template.set_values(values)
+    return fitness_function(template, seed)
+
+
+def _run_worker_episode(values, seed: int) -> float:
+    return _run_episode(_worker_template, _worker_fitness_function, values, seed)
+
+
+class ParallelEvaluator:
+    """Evaluates a population by spreading headless episodes across worker processes.
+
+    Genes hold callables that cannot be pickled, so only gene values are sent; every
+    worker builds its own template with `genotype_factory` and loads the values into it.
+    Both `genotype_factory` and `fitness_function` must be module-level functions.
+    Each episode is seeded from (seed, generation, genotype index, episode), which makes
+    the fitness scores independent of the number of workers and of scheduling order.
+    """
+
+    def __init__(
+        self,
+        genotype_factory: Callable[[], Genotype],
+        fitness_function: FitnessFunction,
+        episodes_per_genotype: int = 1,
+        max_workers: Optional[int] = None,  # None uses every core, 0 evaluates in-process
+        seed: int = 0,
+        aggregate: Callable[[Sequence[float]], float] = mean,
+    ) -> None:
+        if episodes_per_genotype < 1:
+            raise ValueError("episodes_per_genotype must be at least 1.")
+        self.genotype_factory = genotype_factory
+        self.fitness_function = fitness_function
+        self.episodes_per_genotype = episodes_per_genotype
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self.seed = seed
+        self.aggregate = aggregate
+        self.generation = 0
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._local_template: Optional[Genotype] = None
+
+    def __enter__(self) -> "ParallelEvaluator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def episode_seed(self, generation: int, index: int, episode: int) -> int:
+        return int(
+            np.random.SeedSequence((self.seed, generation, index, episode)).generate_state(1)[0]
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.genotype_factory, self.fitness_function),
+            )
+        return self._executor
+
+    def _run_in_process(self, values_list, seeds) -> List[float]:
+        if self._local_template is None:
+            self._local_template = self.genotype_factory()
+        # keep the caller's random streams, which drive selection/crossover/mutation
+        random_state = random.getstate()
+        np_random_state = np.random.get_state()
+        try:
+            return [
+                _run_episode(self._local_template, self.fitness_function, values, seed)
+                for values, seed in zip(values_list, seeds)
+            ]
+        finally:
+            random.setstate(random_state)
+            np.random.set_state(np_random_state)
+
+    def evaluate(self, population: List[Genotype]) -> List[float]:
+        """Fitness of every genotype, aggregated over its episodes, in population order."""
+        values_list = []
+        seeds = []
+        for index, genotype in enumerate(population):
+            values = genotype.get_values()
+            for episode in range(self.episodes_per_genotype):
+                values_list.append(values)
+                seeds.append(self.episode_seed(self.generation, index, episode))
+
+        if self.max_workers == 0:
+            results = self._run_in_process(values_list, seeds)
+        else:
+            chunksize = max(1, len(seeds) // (4 * self.max_workers))
+            results = list(
+                self._get_executor().map(
+                    _run_worker_episode, values_list, seeds, chunksize=chunksize
+                )
+            )
+        self.generation += 1
+
+        n = self.episodes_per_genotype
+        return [self.aggregate(results[i : i + n]) for i in range(0, len(results), n)]
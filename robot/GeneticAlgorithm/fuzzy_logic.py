@@ -1,19 +1,37 @@
 from abc import ABC, abstractmethod
 import math
 from collections import namedtuple
-from typing import Dict, Callable
+from typing import Dict, Callable, List, Optional, Sequence, Tuple, Union
 from scipy.integrate import quad
-import json
+import numpy as np
 
 Membership = namedtuple("Membership", ["name", "function"])
 FuzzyVariable = Dict[str, float]
 
+# (input name, membership name); a None membership reads the input's crisp value
+Term = Tuple[str, Optional[str]]
+# terms joined by OR (max); a single Term is a clause of one
+Clause = Union[Term, Tuple[Term, ...]]
+
+# antecedent clauses are joined by the t-norm: "product", "min", or the "mean" average
+FuzzyRule = namedtuple("FuzzyRule", ["antecedents", "consequent", "t_norm"], defaults=("product",))
+T_NORMS = ("product", "min", "mean")
+
 
 class MembershipFunction(ABC):
+    # True when compute_many also broadcasts over array-valued parameters,
+    # so several functions of the class can be evaluated in one call
+    stackable: bool = False
+
     @abstractmethod
     def compute(self, x: float) -> float:
         pass
 
+    def compute_many(self, x: np.ndarray) -> np.ndarray:
+        """Membership degrees of an array of inputs."""
+        x = np.asarray(x, dtype=float)
+        return np.fromiter(map(self.compute, x.ravel()), dtype=float, count=x.size).reshape(x.shape)
+
     @staticmethod
     def create(function: str, **kwargs) -> "MembershipFunction":
         """
@@ -91,6 +109,8 @@ class MembershipFunction(ABC):
 
 
 class TrapezoidalMembershipFunction(MembershipFunction):
+    stackable = True
+
     def __init__(self, a: float, b: float, c: float, d: float):
         self.a = a
         self.b = b
@@ -107,6 +127,14 @@ class TrapezoidalMembershipFunction(MembershipFunction):
         elif self.c < x < self.d:
             return (self.d - x) / (self.d - self.c)
 
+    def compute_many(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rising = (x - self.a) / (self.b - self.a)
+            falling = (self.d - x) / (self.d - self.c)
+        result = np.where(x <= self.b, rising, np.where(x <= self.c, 1.0, falling))
+        return np.where((x <= self.a) | (x >= self.d), 0.0, result)
+
     def centroid(self) -> float:
         def integrand(x):
             return x * self.compute(x)
@@ -121,6 +149,8 @@ class TrapezoidalMembershipFunction(MembershipFunction):
 
 
 class GaussianMembershipFunction(MembershipFunction):
+    stackable = True
+
     def __init__(self, c: float, sigma: float):
         self.c = c
         self.sigma = sigma
@@ -128,11 +158,17 @@ class GaussianMembershipFunction(MembershipFunction):
     def compute(self, x: float) -> float:
         return math.exp(-((x - self.c) ** 2) / (2 * self.sigma**2))
 
+    def compute_many(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        return np.exp(-((x - self.c) ** 2) / (2 * self.sigma**2))
+
     def centroid(self) -> float:
         return self.c
 
 
 class TriangularMembershipFunction(MembershipFunction):
+    stackable = True
+
     def __init__(self, a: float, b: float, c: float):
         self.a = a
         self.b = b
@@ -146,11 +182,21 @@ class TriangularMembershipFunction(MembershipFunction):
         elif self.b < x < self.c:
             return (self.c - x) / (self.c - self.b)
 
+    def compute_many(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rising = (x - self.a) / (self.b - self.a)
+            falling = (self.c - x) / (self.c - self.b)
+        result = np.where(x <= self.b, rising, falling)
+        return np.where((x <= self.a) | (x >= self.c), 0.0, result)
+
     def centroid(self) -> float:
         return (self.a + self.b + self.c) / 3
 
 
 class SigmoidalMembershipFunction(MembershipFunction):
+    stackable = True
+
     def __init__(self, a: float, c: float):
         self.a = a
         self.c = c
@@ -158,12 +204,19 @@ class SigmoidalMembershipFunction(MembershipFunction):
     def compute(self, x: float) -> float:
         return 1 / (1 + math.exp(-self.a * (x - self.c)))
 
+    def compute_many(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        with np.errstate(over="ignore"):
+            return 1 / (1 + np.exp(-self.a * (x - self.c)))
+
     def centroid(self) -> float:
         # Numerical integration may be required here
         return self.c  # Approximation
 
 
 class BellMembershipFunction(MembershipFunction):
+    stackable = True
+
     def __init__(self, a: float, b: float, c: float):
         self.a = a
         self.b = b
@@ -172,6 +225,10 @@ class BellMembershipFunction(MembershipFunction):
     def compute(self, x: float) -> float:
         return 1 / (1 + abs((x - self.c) / self.a) ** (2 * self.b))
 
+    def compute_many(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        return 1 / (1 + np.abs((x - self.c) / self.a) ** (2 * self.b))
+
     def centroid(self) -> float:
         def integrand(x):
             return x * self.compute(x)
@@ -186,6 +243,8 @@ class BellMembershipFunction(MembershipFunction):
 
 
 class ZMembershipFunction(MembershipFunction):
+    stackable = True
+
     def __init__(self, a: float, b: float):
         self.a = a
         self.b = b
@@ -198,6 +257,12 @@ class ZMembershipFunction(MembershipFunction):
         else:
             return 1 - 2 * ((x - self.a) / (self.b - self.a)) ** 2
 
+    def compute_many(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = 1 - 2 * ((x - self.a) / (self.b - self.a)) ** 2
+        return np.where(x <= self.a, 1.0, np.where(x >= self.b, 0.0, slope))
+
     def centroid(self) -> float:
         def integrand(x):
             return x * self.compute(x)
@@ -212,6 +277,8 @@ class ZMembershipFunction(MembershipFunction):
 
 
 class SMembershipFunction(MembershipFunction):
+    stackable = True
+
     def __init__(self, a: float, b: float):
         self.a = a
         self.b = b
@@ -224,6 +291,12 @@ class SMembershipFunction(MembershipFunction):
         else:
             return 2 * ((x - self.a) / (self.b - self.a)) ** 2
 
+    def compute_many(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = 2 * ((x - self.a) / (self.b - self.a)) ** 2
+        return np.where(x <= self.a, 0.0, np.where(x >= self.b, 1.0, slope))
+
     def centroid(self) -> float:
         def integrand(x):
             return x * self.compute(x)
@@ -242,13 +315,16 @@ class CombinedMembershipFunctions:
         self._memberships: Dict[str, MembershipFunction] = {}
         self._value: float = None
         self._results: Dict[str, float] = {}
+        self._centroids: Dict[str, float] = None
 
     def add_membership(self, name: str, function: MembershipFunction):
         self._memberships[name] = function
+        self._centroids = None
 
     def add_memberships(self, functions: Dict[str, Membership]):
         for name, function in functions.items():
             self._memberships[name] = function
+        self._centroids = None
 
     @property
     def value(self) -> float:
@@ -273,10 +349,22 @@ class CombinedMembershipFunctions:
             results[name] = function.compute(value)
         return results
 
+    @property
+    def centroids(self) -> Dict[str, float]:
+        """Centroid of every membership, integrated once and cached until a membership is added."""
+        if self._centroids is None:
+            self._centroids = {
+                name: function.centroid() for name, function in self._memberships.items()
+            }
+        return self._centroids
+
+    def compile(
+        self, domain: Tuple[float, float] = None, resolution: float = 1.0
+    ) -> "CompiledMembershipFunctions":
+        return CompiledMembershipFunctions(self._memberships, domain, resolution)
+
     def defuzzify(self, percentages: FuzzyVariable) -> float:
-        centroids = {
-            name: function.centroid() for name, function in self._memberships.items()
-        }
+        centroids = self.centroids
 
         weighted_sum = sum(
             centroids.get(name, 0) * percentages.get(name, 0) for name in percentages
@@ -287,35 +375,296 @@ class CombinedMembershipFunctions:
         return weighted_sum / total_weight if total_weight != 0 else float("nan")
 
 
+def _stack_functions(functions: Sequence[MembershipFunction]) -> MembershipFunction:
+    """One function of the common class whose parameters are arrays over `functions`."""
+    stacked = object.__new__(type(functions[0]))
+    for name in vars(functions[0]):
+        setattr(stacked, name, np.array([getattr(function, name) for function in functions], dtype=float))
+    return stacked
+
+
+class CompiledMembershipFunctions:
+    """Frozen CombinedMembershipFunctions for fast repeated fuzzification.
+
+    Centroids are computed once. With a `domain`, memberships are tabulated every
+    `resolution` units over it: grid points are looked up and inputs between them are
+    linearly interpolated within their cell. This is exact up to rounding for
+    piecewise-linear memberships whose breakpoints lie on the grid, steps included, and
+    an approximation otherwise. Inputs outside the domain are computed.
+    """
+
+    def __init__(
+        self,
+        memberships: Dict[str, MembershipFunction],
+        domain: Tuple[float, float] = None,
+        resolution: float = 1.0,
+    ) -> None:
+        self.names: Tuple[str, ...] = tuple(memberships)
+        self.functions: Tuple[MembershipFunction, ...] = tuple(memberships.values())
+        self._computes = tuple(function.compute for function in self.functions)
+        self.centroids = np.array([function.centroid() for function in self.functions])
+        self._centroids = dict(zip(self.names, self.centroids.tolist()))
+
+        # memberships of one stackable class are evaluated together
+        kinds: Dict[type, List[int]] = {}
+        self._batches: List[Tuple[MembershipFunction, List[int]]] = []
+        for column, function in enumerate(self.functions):
+            if function.stackable:
+                kinds.setdefault(type(function), []).append(column)
+            else:
+                self._batches.append((function, [column]))
+        for columns in kinds.values():
+            self._batches.append((_stack_functions([self.functions[i] for i in columns]), columns))
+
+        self.domain = domain
+        self.table: np.ndarray = None
+        if domain is not None:
+            low, high = domain
+            steps = max(1, math.ceil((high - low) / resolution))
+            self._low = low
+            self._high = high
+            self._inverse_step = steps / (high - low)
+            self._last = steps
+            self.grid = np.linspace(low, high, steps + 1)
+            self.table = self._compute_many(self.grid)
+            # each cell is fitted from two interior points, so a jump at a grid point
+            # (e.g. triangular a == b) does not leak into the neighbouring cell
+            cell = self.grid[1] - self.grid[0]
+            quarter = self._compute_many(self.grid[:-1] + 0.25 * cell)
+            three_quarters = self._compute_many(self.grid[:-1] + 0.75 * cell)
+            self.cell_starts = 1.5 * quarter - 0.5 * three_quarters
+            self.cell_deltas = 2.0 * (three_quarters - quarter)
+            self._rows = self.table.tolist()
+            self._starts = self.cell_starts.tolist()
+            self._deltas = self.cell_deltas.tolist()
+
+    def _compute_many(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        if len(self._batches) == 1 and len(self._batches[0][1]) > 1:
+            return self._batches[0][0].compute_many(values[..., None])
+        result = np.empty(values.shape + (len(self.functions),))
+        for function, columns in self._batches:
+            if len(columns) == 1:
+                result[..., columns[0]] = function.compute_many(values)
+            else:
+                result[..., columns] = function.compute_many(values[..., None])
+        return result
+
+    def fuzzify(self, value: float) -> FuzzyVariable:
+        if self.table is not None and self._low <= value <= self._high:
+            position = (value - self._low) * self._inverse_step
+            index = int(position)
+            t = position - index
+            if t == 0:
+                return dict(zip(self.names, self._rows[index]))
+            results = {}
+            for name, start, delta in zip(self.names, self._starts[index], self._deltas[index]):
+                results[name] = start + t * delta
+            return results
+        results = {}
+        for name, compute in zip(self.names, self._computes):
+            results[name] = compute(value)
+        return results
+
+    def fuzzify_many(self, values: np.ndarray) -> np.ndarray:
+        """Membership degrees of an array of inputs, shaped (*values.shape, memberships)."""
+        values = np.asarray(values, dtype=float)
+        if self.table is None:
+            return self._compute_many(values)
+        inside = (values >= self._low) & (values <= self._high)
+        position = (np.where(inside, values, self._low) - self._low) * self._inverse_step
+        index = position.astype(np.intp)
+        t = position - index
+        cell = np.minimum(index, self._last - 1)
+        result = self.cell_starts[cell] + t[..., None] * self.cell_deltas[cell]
+        on_grid = t == 0
+        result[on_grid] = self.table[index[on_grid]]
+        if not inside.all():
+            result[~inside] = self._compute_many(values[~inside])
+        return result
+
+    def defuzzify(self, percentages: FuzzyVariable) -> float:
+        weighted_sum = sum(
+            self._centroids.get(name, 0) * percentages.get(name, 0) for name in percentages
+        )
+
+        total_weight = sum(percentages.values())
+
+        return weighted_sum / total_weight if total_weight != 0 else float("nan")
+
+
+def _clause_terms(clause: Clause) -> Tuple[Term, ...]:
+    return (clause,) if isinstance(clause[0], str) else tuple(clause)
+
+
+class CompiledRules:
+    """FuzzyRules compiled into index tables over one flat vector of membership degrees.
+
+    Every fuzzy input is fuzzified once per evaluation, in bulk with the other inputs that
+    share its membership functions; clauses, firing strengths and the weighted output are
+    then gathers and reductions over that vector.
+    """
+
+    def __init__(
+        self, rules: Sequence[FuzzyRule], input_mfs: Dict[str, CombinedMembershipFunctions]
+    ) -> None:
+        rules = list(rules)
+        clauses = [[_clause_terms(clause) for clause in rule.antecedents] for rule in rules]
+        for rule in rules:
+            if rule.t_norm not in T_NORMS:
+                raise ValueError(f"Unknown t-norm: {rule.t_norm}")
+            if not rule.antecedents:
+                raise ValueError("A fuzzy rule needs at least one antecedent.")
+
+        fuzzy_inputs = []
+        crisp_inputs = []
+        for rule_clauses in clauses:
+            for terms in rule_clauses:
+                for name, membership in terms:
+                    inputs = crisp_inputs if membership is None else fuzzy_inputs
+                    if name not in inputs:
+                        inputs.append(name)
+
+        # one block of slots per membership-function set, one row per input using it
+        slots: Dict[Term, int] = {}
+        self._groups: List[Tuple[CompiledMembershipFunctions, List[str], int, int]] = []
+        compiled_mfs: Dict[int, Tuple[CompiledMembershipFunctions, List[str]]] = {}
+        for name in fuzzy_inputs:
+            if name not in input_mfs:
+                raise KeyError(f"No membership functions for input: {name}")
+            mfs = input_mfs[name]
+            if id(mfs) not in compiled_mfs:
+                compiled_mfs[id(mfs)] = (mfs.compile(), [])
+            compiled_mfs[id(mfs)][1].append(name)
+        size = 0
+        for compiled, names in compiled_mfs.values():
+            for name in names:
+                for membership in compiled.names:
+                    slots[(name, membership)] = size
+                    size += 1
+            self._groups.append((compiled, names, size - len(names) * len(compiled.names), size))
+        self._crisp: List[Tuple[str, int]] = []
+        for name in crisp_inputs:
+            slots[(name, None)] = size
+            self._crisp.append((name, size))
+            size += 1
+        self._degrees = np.zeros(size)
+
+        # clause table padded with its own first term, which leaves the max unchanged
+        flat_clauses = [terms for rule_clauses in clauses for terms in rule_clauses]
+        for terms in flat_clauses:
+            for term in terms:
+                if term not in slots:
+                    raise KeyError(f"Unknown membership {term[1]} of input {term[0]}")
+        width = max(len(terms) for terms in flat_clauses)
+        self._clause_slots = np.array(
+            [[slots[term] for term in terms] + [slots[terms[0]]] * (width - len(terms)) for terms in flat_clauses],
+            dtype=np.intp,
+        )
+
+        # clause degrees are followed by the neutral elements used to pad the rule tables
+        n_clauses = len(flat_clauses)
+        self._clause_degrees = np.empty(n_clauses + 3)
+        self._clause_degrees[n_clauses:] = (1.0, np.inf, 0.0)
+        neutral = {"product": n_clauses, "min": n_clauses + 1, "mean": n_clauses + 2}
+
+        self._consequents = np.array([rule.consequent for rule in rules], dtype=float)
+        self._strengths = np.empty(len(rules))
+        self._rule_groups = []
+        offsets = np.cumsum([0] + [len(rule_clauses) for rule_clauses in clauses])
+        for t_norm in T_NORMS:
+            members = [i for i, rule in enumerate(rules) if rule.t_norm == t_norm]
+            if not members:
+                continue
+            width = max(len(clauses[i]) for i in members)
+            table = np.full((len(members), width), neutral[t_norm], dtype=np.intp)
+            for row, i in enumerate(members):
+                table[row, : len(clauses[i])] = np.arange(offsets[i], offsets[i + 1])
+            counts = np.array([len(clauses[i]) for i in members], dtype=float)
+            self._rule_groups.append((t_norm, np.array(members, dtype=np.intp), table, counts))
+
+    def firing_strengths(self, input_values: Dict[str, float]) -> np.ndarray:
+        degrees = self._degrees
+        for compiled, names, start, stop in self._groups:
+            degrees[start:stop] = compiled.fuzzify_many([input_values[name] for name in names]).ravel()
+        for name, slot in self._crisp:
+            degrees[slot] = input_values[name]
+
+        clause_degrees = self._clause_degrees
+        clause_degrees[: len(self._clause_slots)] = degrees[self._clause_slots].max(axis=1)
+
+        strengths = self._strengths
+        for t_norm, members, table, counts in self._rule_groups:
+            values = clause_degrees[table]
+            if t_norm == "product":
+                strengths[members] = values.prod(axis=1)
+            elif t_norm == "min":
+                strengths[members] = values.min(axis=1)
+            else:
+                strengths[members] = values.sum(axis=1) / counts
+        return strengths
+
+    def evaluate(self, input_values: Dict[str, float]) -> float:
+        """Sum of every consequent weighted by its rule's firing strength."""
+        if not len(self._consequents):
+            return 0.0
+        # cumulative sum adds in rule order, like accumulating the rules one by one
+        return float((self._consequents * self.firing_strengths(input_values)).cumsum()[-1])
+
+
 class FuzzyInterface:
     def __init__(
         self,
         input_mfs: Dict[str, CombinedMembershipFunctions] = {},
     ) -> None:
+        # rules given as callables over the fuzzified inputs, evaluated one by one
         self.rules = []
+        # rules given as data, compiled together on first evaluation
+        self.fuzzy_rules: List[FuzzyRule] = []
         self.input_mfs: Dict[str, CombinedMembershipFunctions] = input_mfs
+        self._compiled: CompiledRules = None
 
     def add_rule(
-        self, condition: Callable[[FuzzyVariable], float], output: float
+        self,
+        condition: Union[Callable[[FuzzyVariable], float], Sequence[Clause]],
+        output: float,
+        t_norm: str = "product",
     ) -> None:
-        self.rules.append((condition, output))
+        """Adds a rule given either as a callable or as its antecedent clauses."""
+        if callable(condition):
+            self.rules.append((condition, output))
+        else:
+            self.add_fuzzy_rule(FuzzyRule(tuple(condition), output, t_norm))
 
     def add_rules(self, rules: list[(Callable[[FuzzyVariable], float], float)]) -> None:
         for rule in rules:
-            self.rules.append(rule)
+            self.add_rule(*rule)
 
-    def evaluate_rules(self, input_values: Dict[str, float]) -> float:
-        # Create a dictionary to store the fuzzified input values
-        fuzzy_values = {
-            name: self.input_mfs[name].fuzzify(value)
-            for name, value in input_values.items()
-        }
+    def add_fuzzy_rule(self, rule: FuzzyRule) -> None:
+        self.fuzzy_rules.append(rule)
+        self._compiled = None
+
+    def compile(self) -> CompiledRules:
+        if self._compiled is None:
+            self._compiled = CompiledRules(self.fuzzy_rules, self.input_mfs)
+        return self._compiled
 
-        print(json.dumps(fuzzy_values, indent=4))
+    def evaluate_rules(self, input_values: Dict[str, float]) -> float:
         strength = 0
 
-        for condition, output in self.rules:
-            strength += output * condition(fuzzy_values)
+        if self.fuzzy_rules:
+            strength += self.compile().evaluate(input_values)
+
+        if self.rules:
+            # Create a dictionary to store the fuzzified input values
+            fuzzy_values = {
+                name: self.input_mfs[name].fuzzify(value)
+                for name, value in input_values.items()
+                if name in self.input_mfs
+            }
+
+            for condition, output in self.rules:
+                strength += output * condition(fuzzy_values)
 
         return strength
 
@@ -359,20 +708,19 @@ def main():
         }
     )
 
-    # Initialize the FuzzyInterface with input and output memberships
+    # Initialize the FuzzyInterface with input memberships
     fuzzy_interface = FuzzyInterface(
         input_mfs={"Temperature": temp_msf, "Weather": weather_msf},
-        output_mfs=speed_msf,
     )
 
-    # Add rules
+    # Add rules; each outputs the centroid of its speed
+    speeds = speed_msf.centroids
     fuzzy_interface.add_rule(
-        lambda values: min(values["Temperature"]["Cold"], values["Weather"]["Rainy"]),
-        "Slow",
+        (("Temperature", "Cold"), ("Weather", "Rainy")), speeds["Slow"], t_norm="min"
     )
-    fuzzy_interface.add_rule(lambda values: values["Temperature"]["Warm"], "Medium")
+    fuzzy_interface.add_rule((("Temperature", "Warm"),), speeds["Medium"])
     fuzzy_interface.add_rule(
-        lambda values: values["Temperature"]["Hot"] * values["Weather"]["Sunny"], "Fast"
+        (("Temperature", "Hot"), ("Weather", "Sunny")), speeds["Fast"]
     )
 
     # Evaluate the rules with some input
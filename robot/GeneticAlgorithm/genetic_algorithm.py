@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
 import random
 from typing import List, Dict, Tuple
-from .encoding import Genotype
+from .encoding import Genotype, PackedGenotype
 from .crossover import CrossoverStrategy
 from .selection import SelectionStrategy
 from .mutation import MutationStrategy
+from .evaluation import ParallelEvaluator
+
+import numpy as np
 
 
 class GeneticAlgorithm:
@@ -15,52 +18,63 @@ class GeneticAlgorithm:
         crossover_strategy: CrossoverStrategy,  # Accepts a CrossoverStrategy object
         mutation_strategy: MutationStrategy,  # Accepts a MutationStrategy object
         elitism_percentage: float = 0.1,  # Percentage of the population to preserve as elites
+        evaluator: ParallelEvaluator = None,  # Runs headless episodes to score the population
+        batch: bool = False,  # Breed the whole population at once as a NumPy array
+        seed: int = None,  # Seeds the Generator used by the batch operators
     ) -> None:
         self.selection_strategy = selection_strategy()
         self.crossover_strategy = crossover_strategy()
         self.mutation_strategy = mutation_strategy
         self.elitism_percentage = elitism_percentage
+        self.evaluator = evaluator
+        self.batch = batch
+        self.rng = np.random.default_rng(seed)
 
         self.population_size: int = population_size
-        self.population: List[Genotype] = []
+        self.population: List[PackedGenotype] = []
         self.fitness_scores: List[float] = []
 
     def __len__(self) -> int:
         return self.population_size
 
     def initialize_population(self, genotype_template: Genotype) -> None:
-        """Initialize the population with clones of a Genotype template."""
+        """Initialize the population with randomized packed copies of a Genotype template."""
+        packed_template = genotype_template.pack()
         for _ in range(len(self)):
-            for chromosomes in genotype_template.chromosomes:
-                for gene in chromosomes.rules_list:
-                    gene.value = random.choice(gene.variant)
-                for gene in chromosomes.returns_list:
-                    gene.value = random.uniform(gene.variant[0], gene.variant[1])
-            self.population.append(genotype_template.clone())
-
-    def evaluate_population(self, args: Dict[str, any]) -> None:
+            genotype = packed_template.clone()
+            genotype.scamble()
+            self.population.append(genotype)
+
+    def evaluate_population(self, args: Dict[str, any] = None) -> None:
         """Evaluate the population and store the fitness scores."""
+        if self.evaluator is not None:
+            self.fitness_scores = self.evaluator.evaluate(self.population)
+            return
         self.fitness_scores = [
             genotype.evaluate(args)[0] for genotype in self.population
         ]
 
-    def select(self) -> Genotype:
+    def select(self) -> PackedGenotype:
         """Select a Genotype using the selection strategy."""
         return self.selection_strategy.select(
             population=self.population, fitness_scores=self.fitness_scores
         )
 
-    def crossover(self, parent1: Genotype, parent2: Genotype) -> Tuple[Genotype]:
+    def crossover(self, parent1: PackedGenotype, parent2: PackedGenotype) -> Tuple[PackedGenotype]:
         """Perform crossover using the crossover strategy."""
         return self.crossover_strategy.crossover(parent1, parent2)
 
-    def mutate(self, genotype: Genotype) -> Genotype:
+    def mutate(self, genotype: PackedGenotype) -> PackedGenotype:
         """Mutate the genotype using the mutation strategy."""
         return self.mutation_strategy.mutate(genotype)
 
-    def elitism(self) -> List[Genotype]:
+    def elite_count(self) -> int:
+        """Number of top Genotypes carried over unchanged."""
+        return max(1, int(len(self) * self.elitism_percentage))
+
+    def elitism(self) -> List[PackedGenotype]:
         """Preserve the top N% Genotypes based on the elitism percentage."""
-        elite_count = max(1, int(len(self) * self.elitism_percentage))
+        elite_count = self.elite_count()
         elite_indexes = sorted(
             range(len(self.fitness_scores)),
             key=lambda i: self.fitness_scores[i],
@@ -70,9 +84,16 @@ class GeneticAlgorithm:
 
     def create_next_generation(self) -> None:
         """Create the next generation of genotypes."""
+        if self.batch:
+            self.create_next_generation_batch()
+            return
+
         # Get the elite genotypes
         new_population = self.elitism()
 
+        # Build the selection tables once for the whole generation
+        self.selection_strategy.prepare(self.fitness_scores)
+
         # Continue creating new genotypes until the population is full
         while len(new_population) < len(self):
             parent1 = self.select()
@@ -86,7 +107,36 @@ class GeneticAlgorithm:
         # Update the population with the new generation
         self.population = new_population
 
-    def create_new_genotype(self) -> Genotype:
+    def create_next_generation_batch(self) -> None:
+        """Create the next generation with array operations on a (population, chromosomes, genes) array.
+
+        Selection, crossover and mutation draw from `self.rng`, so a seeded run is reproducible.
+        """
+        layout = self.population[0].layout
+        values = np.stack([genotype.values for genotype in self.population])
+        integer = np.stack([genotype.integer for genotype in self.population])
+        fitness_scores = np.asarray(self.fitness_scores, dtype=float)
+
+        # stable descending order keeps the first of equal scores, as elitism() does
+        elite_indexes = np.argsort(-fitness_scores, kind="stable")[: self.elite_count()]
+        offspring_count = max(0, len(self) - len(elite_indexes))
+
+        selected1 = self.selection_strategy.select_batch(fitness_scores, offspring_count, self.rng)
+        selected2 = self.selection_strategy.select_batch(fitness_scores, offspring_count, self.rng)
+        offspring_integer, other_integer = integer[selected1], integer[selected2]
+        offspring, _ = self.crossover_strategy.crossover_batch(
+            values[selected1], values[selected2], self.rng, offspring_integer, other_integer
+        )
+        self.mutation_strategy.mutate_batch(offspring, layout, self.rng, offspring_integer)
+
+        new_values = np.concatenate([values[elite_indexes], offspring])
+        new_integer = np.concatenate([integer[elite_indexes], offspring_integer])
+        self.population = [
+            PackedGenotype(layout, genotype_values, genotype_integer)
+            for genotype_values, genotype_integer in zip(new_values, new_integer)
+        ]
+
+    def create_new_genotype(self) -> PackedGenotype:
         """Create the new genotypes."""
         parent1 = self.select()
         parent2 = self.select()
@@ -96,7 +146,7 @@ class GeneticAlgorithm:
 
         return offspring
 
-    def run(self, generations: int, args: Dict[str, any]) -> None:
+    def run(self, generations: int, args: Dict[str, any] = None) -> None:
         """Run the genetic algorithm for a specified number of generations."""
         for _ in range(generations):
             self.evaluate_population(args)
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Callable
+from typing import List, Callable, Tuple, Union
 import random
-from .encoding import Genotype, Chromosome
+from .encoding import Genotype, Chromosome, PackedGenotype, GenotypeLayout, as_packed
+
+import numpy as np
 
 from fuzzy_logic import CombinedMembershipFunctions, MembershipFunction
 
@@ -17,16 +19,53 @@ class MutationStrategy(ABC):
         self.mutation_probability = mutation_probability
         self.gene_type = gene_type
 
+    def mutate(self, genotype: Union[Genotype, PackedGenotype]) -> None:
+        """Performs mutation on a genotype in place."""
+        packed = as_packed(genotype)
+        self.mutate_packed(packed)
+        if packed is not genotype:
+            genotype.set_values(packed.get_values())
+
     @abstractmethod
-    def mutate(self, genotype: Genotype) -> None:
-        """Performs mutation on a genotype."""
+    def mutate_packed(self, genotype: PackedGenotype) -> None:
+        """Performs mutation on the value array of a packed genotype."""
         pass
 
-    def _clone_and_apply(self, genotype: Genotype, mutate_func) -> None:
-        for chromosome in genotype.chromosomes:
-            offspring = chromosome.clone()
-            mutate_func(offspring)
-            genotype.chromosomes[genotype.chromosomes.index(chromosome)] = offspring
+    def mutate_batch(
+        self,
+        values: np.ndarray,
+        layout: GenotypeLayout,
+        rng: np.random.Generator,
+        integer: np.ndarray = None,
+    ) -> None:
+        """Mutates a (population, chromosomes, genes) value array in place.
+
+        integer is the matching array of `PackedGenotype.integer` marks, updated in place;
+        without it every genotype is taken to have the integer marks of the layout.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support batch mutation."
+        )
+
+    def gene_type_mask(self, layout: GenotypeLayout) -> np.ndarray:
+        """(chromosomes, genes) mask of the genes this strategy may touch."""
+        mask = np.zeros(layout.shape, dtype=bool)
+        if self.apply_gene("RuleGene"):
+            mask |= layout.rule_mask
+        if self.apply_gene("ReturnGene"):
+            mask |= ~layout.rule_mask
+        return mask
+
+    @staticmethod
+    def integer_marks(values: np.ndarray, layout: GenotypeLayout, integer: np.ndarray = None) -> np.ndarray:
+        if integer is None:
+            return np.broadcast_to(layout.return_integer, values.shape).copy()
+        return integer
+
+    def mutation_mask(
+        self, shape: Tuple[int, ...], gene_mask: np.ndarray, rng: np.random.Generator
+    ) -> np.ndarray:
+        return (rng.random(shape) < self.mutation_probability) & gene_mask
 
     def apply_mutation_probability(self) -> bool:
         # print(self.mutation_probability)
@@ -40,71 +79,124 @@ class MutationStrategy(ABC):
 class BitFlipMutation(MutationStrategy):
     """Simple bit-flip mutation for binary-encoded chromosomes."""
 
-    def mutate(self, genotype: Genotype) -> None:
-        def mutate_func(chromosome):
+    def mutate_packed(self, genotype: PackedGenotype) -> None:
+        layout, values = genotype.layout, genotype.values
+        for c, genes in enumerate(layout.genes):
+            rule_count = layout.rule_counts[c]
             if self.apply_gene("RuleGene"):
-                for gene in chromosome.rules_list:
-                    variant = gene.variant
-                    if len(variant) == 2 and self.apply_mutation_probability():
-                        gene.value = variant[1 - variant.index(gene.value)]
+                for i in range(rule_count):
+                    if len(genes[i].variant) == 2 and self.apply_mutation_probability():
+                        values[c, i] = 1 - values[c, i]
 
             if self.apply_gene("ReturnGene"):
-                for gene in chromosome.returns_list:
+                for i in range(rule_count, len(genes)):
                     if (
-                        isinstance(gene.value, int)
+                        genotype.integer[c, i]
                         and self.apply_mutation_probability()
                     ):
-                        gene.value = 1 - gene.value
+                        values[c, i] = 1 - values[c, i]
 
-        self._clone_and_apply(genotype, mutate_func)
+    def mutate_batch(
+        self,
+        values: np.ndarray,
+        layout: GenotypeLayout,
+        rng: np.random.Generator,
+        integer: np.ndarray = None,
+    ) -> None:
+        integer = self.integer_marks(values, layout, integer)
+        binary_rules = layout.rule_mask & (layout.variant_counts == 2)
+        flippable = self.gene_type_mask(layout) & (binary_rules | ~layout.rule_mask)
+        mask = self.mutation_mask(values.shape, flippable, rng)
+        mask &= layout.rule_mask | integer
+        values[mask] = 1 - values[mask]
 
 
 class RandomResetMutation(MutationStrategy):
     """Random reset mutation where a gene value is replaced with a random value within a specified range."""
 
-    def mutate(self, genotype: Genotype) -> None:
-        def mutate_func(chromosome):
+    def mutate_packed(self, genotype: PackedGenotype) -> None:
+        layout, values = genotype.layout, genotype.values
+        for c, genes in enumerate(layout.genes):
+            rule_count = layout.rule_counts[c]
             if self.apply_gene("RuleGene"):
-                for gene in chromosome.rules_list:
+                for i in range(rule_count):
                     if self.apply_mutation_probability():
-                        gene.value = random.choice(gene.variant)
+                        values[c, i] = random.randrange(len(genes[i].variant))
 
             if self.apply_gene("ReturnGene"):
-                for gene in chromosome.returns_list:
+                for i in range(rule_count, len(genes)):
                     if self.apply_mutation_probability():
-                        gene.value = random.randrange(gene.variant[0], gene.variant[1])
+                        variant = genes[i].variant
+                        values[c, i] = random.randrange(variant[0], variant[1])
+                        genotype.integer[c, i] = True
 
-        self._clone_and_apply(genotype, mutate_func)
+    def mutate_batch(
+        self,
+        values: np.ndarray,
+        layout: GenotypeLayout,
+        rng: np.random.Generator,
+        integer: np.ndarray = None,
+    ) -> None:
+        integer = self.integer_marks(values, layout, integer)
+        mask = self.mutation_mask(values.shape, self.gene_type_mask(layout), rng)
+        # rule genes draw a variant index, return genes an integer in [low, high)
+        low = np.where(layout.rule_mask, 0, layout.return_low)
+        high = np.where(layout.rule_mask, layout.variant_counts, layout.return_high)
+        resets = np.floor(low + rng.random(values.shape) * (high - low))
+        values[mask] = resets[mask]
+        integer[mask & ~layout.rule_mask] = True
 
 
 class SwapMutation(MutationStrategy):
     """Swap mutation, swaps the values of two randomly selected genes."""
 
-    def mutate(self, genotype: Genotype) -> None:
-        def mutate_func(chromosome):
+    def mutate_packed(self, genotype: PackedGenotype) -> None:
+        layout, values = genotype.layout, genotype.values
+        for c, genes in enumerate(layout.genes):
+            rule_count = layout.rule_counts[c]
             if self.apply_gene("RuleGene"):
-                if (
-                    self.apply_mutation_probability()
-                    and len(chromosome.rules_list) >= 2
-                ):
-                    i, j = random.sample(range(len(chromosome.rules_list)), 2)
-                    chromosome.rules_list[i], chromosome.rules_list[j] = (
-                        chromosome.rules_list[j],
-                        chromosome.rules_list[i],
-                    )
+                if self.apply_mutation_probability() and rule_count >= 2:
+                    i, j = random.sample(range(rule_count), 2)
+                    # rule values are variant indexes, only meaningful between genes with the same variants
+                    if genes[i].variant == genes[j].variant:
+                        values[c, [i, j]] = values[c, [j, i]]
 
             if self.apply_gene("ReturnGene"):
-                if (
-                    self.apply_mutation_probability()
-                    and len(chromosome.returns_list) >= 2
-                ):
-                    i, j = random.sample(range(len(chromosome.returns_list)), 2)
-                    chromosome.returns_list[i], chromosome.returns_list[j] = (
-                        chromosome.returns_list[j],
-                        chromosome.returns_list[i],
-                    )
-
-        self._clone_and_apply(genotype, mutate_func)
+                return_count = len(genes) - rule_count
+                if self.apply_mutation_probability() and return_count >= 2:
+                    i, j = random.sample(range(rule_count, len(genes)), 2)
+                    values[c, [i, j]] = values[c, [j, i]]
+                    genotype.integer[c, [i, j]] = genotype.integer[c, [j, i]]
+
+    def _swap_batch(self, values, integer, start, count, allowed, rng) -> None:
+        # start/count: (chromosomes,) range of genes to pick two distinct genes from
+        population, chromosomes = values.shape[:2]
+        swap = (rng.random((population, chromosomes)) < self.mutation_probability) & (count >= 2)
+        first = start + np.floor(rng.random((population, chromosomes)) * count).astype(np.intp)
+        second = start + np.floor(rng.random((population, chromosomes)) * (count - 1)).astype(np.intp)
+        second += second >= first
+        p, c = np.nonzero(swap)
+        i, j = first[p, c], second[p, c]
+        keep = allowed[c, i, j]
+        p, c, i, j = p[keep], c[keep], i[keep], j[keep]
+        values[p, c, i], values[p, c, j] = values[p, c, j], values[p, c, i]
+        integer[p, c, i], integer[p, c, j] = integer[p, c, j], integer[p, c, i]
+
+    def mutate_batch(
+        self,
+        values: np.ndarray,
+        layout: GenotypeLayout,
+        rng: np.random.Generator,
+        integer: np.ndarray = None,
+    ) -> None:
+        integer = self.integer_marks(values, layout, integer)
+        rule_counts = np.asarray(layout.rule_counts)
+        num_genes = layout.shape[1]
+        if self.apply_gene("RuleGene"):
+            self._swap_batch(values, integer, 0, rule_counts, layout.same_variants, rng)
+        if self.apply_gene("ReturnGene"):
+            any_pair = np.ones(layout.shape + (num_genes,), dtype=bool)
+            self._swap_batch(values, integer, rule_counts, num_genes - rule_counts, any_pair, rng)
 
 
 class GaussianMutation(MutationStrategy):
@@ -117,20 +209,31 @@ class GaussianMutation(MutationStrategy):
         self.mean = mean
         self.stddev = stddev
 
-    def mutate(self, genotype: Genotype) -> None:
-        def mutate_func(chromosome):
+    def mutate_packed(self, genotype: PackedGenotype) -> None:
+        layout, values = genotype.layout, genotype.values
+        for c, genes in enumerate(layout.genes):
             if self.apply_gene("ReturnGene"):
-                for gene in chromosome.returns_list:
-                    # print(isinstance(gene.value, float))
+                for i in range(layout.rule_counts[c], len(genes)):
+                    # only float genes get noise, not the ints RandomResetMutation leaves
                     if (
-                        isinstance(gene.value, float)
+                        not genotype.integer[c, i]
                         and self.apply_mutation_probability()
                     ):
                         noise = random.gauss(self.mean, self.stddev)
                         # print(noise)
-                        gene.value += noise
+                        values[c, i] += noise
 
-        self._clone_and_apply(genotype, mutate_func)
+    def mutate_batch(
+        self,
+        values: np.ndarray,
+        layout: GenotypeLayout,
+        rng: np.random.Generator,
+        integer: np.ndarray = None,
+    ) -> None:
+        integer = self.integer_marks(values, layout, integer)
+        gene_mask = self.gene_type_mask(layout) & ~layout.rule_mask
+        mask = self.mutation_mask(values.shape, gene_mask, rng) & ~integer
+        values[mask] += rng.normal(self.mean, self.stddev, np.count_nonzero(mask))
 
 
 class CompositeMutation(MutationStrategy):
@@ -138,9 +241,20 @@ class CompositeMutation(MutationStrategy):
         super().__init__()
         self.strategies = strategies
 
-    def mutate(self, genotype: Genotype) -> None:
+    def mutate_packed(self, genotype: PackedGenotype) -> None:
+        for strategy in self.strategies:
+            strategy.mutate_packed(genotype)
+
+    def mutate_batch(
+        self,
+        values: np.ndarray,
+        layout: GenotypeLayout,
+        rng: np.random.Generator,
+        integer: np.ndarray = None,
+    ) -> None:
+        integer = self.integer_marks(values, layout, integer)
         for strategy in self.strategies:
-            strategy.mutate(genotype)
+            strategy.mutate_batch(values, layout, rng, integer)
 
 
 def main():
@@ -1,33 +1,87 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from .encoding import Genotype
-from typing import List
+from typing import List, Optional, Sequence
+import itertools
 import random
 
+import numpy as np
+
 
 class SelectionStrategy(ABC):
-    """Abstract base class for selection strategies."""
+    """Abstract base class for selection strategies.
+
+    `prepare` builds the lookup tables for one generation of fitness scores, after which
+    every draw is O(1) or O(log P). `select` prepares on its own when it is handed a
+    different list of scores; call `prepare` again after changing a list in place.
+    """
+
+    _prepared_scores: Optional[Sequence[float]] = None
+
+    def prepare(self, fitness_scores: Sequence[float]) -> None:
+        """Builds the lookup tables used by the following draws."""
+        self._prepared_scores = fitness_scores
+        self._size = len(fitness_scores)
+        self._scores = np.asarray(fitness_scores, dtype=float)
 
     @abstractmethod
+    def select_index(self) -> int:
+        """Draws the population index of one Genotype from the prepared tables."""
+        pass
+
     def select(
         self, population: List[Genotype], fitness_scores: List[float]
     ) -> Genotype:
         """Selects a Genotype from the population based on their fitness scores."""
-        pass
+        if fitness_scores is not self._prepared_scores:
+            self.prepare(fitness_scores)
+        return population[self.select_index()].clone()
+
+    def select_many(
+        self, count: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Returns the population indexes of `count` independent draws, without cloning.
+
+        Without `rng` the draws come from the random module, exactly as `count` calls to
+        `select` would; with `rng` they are drawn at once by `_select_many`.
+        """
+        if rng is None:
+            return np.fromiter(
+                (self.select_index() for _ in range(count)), dtype=np.intp, count=count
+            )
+        return self._select_many(count, rng)
+
+    def _select_many(self, count: int, rng: np.random.Generator) -> np.ndarray:
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support batch selection."
+        )
+
+    def select_batch(
+        self, fitness_scores: np.ndarray, count: int, rng: np.random.Generator
+    ) -> np.ndarray:
+        """Returns the population indexes of `count` independent selections."""
+        self.prepare(fitness_scores)
+        return self.select_many(count, rng)
 
 
 class RouletteWheelSelection(SelectionStrategy):
     """Implements roulette wheel selection (fitness-proportionate selection)."""
 
-    def select(
-        self, population: List[Genotype], fitness_scores: List[float]
-    ) -> Genotype:
-        total_fitness = sum(fitness_scores)
-        pick = random.uniform(0, total_fitness)
-        current = 0
-        for Genotype, fitness in zip(population, fitness_scores):
-            current += fitness
-            if current > pick:
-                return Genotype.clone()
+    def prepare(self, fitness_scores: Sequence[float]) -> None:
+        super().prepare(fitness_scores)
+        self._cumulative = list(itertools.accumulate(fitness_scores))
+        self._total_fitness = sum(fitness_scores)
+
+    def select_index(self) -> int:
+        pick = random.uniform(0, self._total_fitness)
+        # first Genotype whose running total passes the pick
+        return min(bisect_right(self._cumulative, pick), self._size - 1)
+
+    def _select_many(self, count: int, rng: np.random.Generator) -> np.ndarray:
+        cumulative = np.asarray(self._cumulative, dtype=float)
+        picks = rng.uniform(0, cumulative[-1], count)
+        indexes = np.searchsorted(cumulative, picks, side="right")
+        return np.minimum(indexes, self._size - 1)
 
 
 class TournamentSelection(SelectionStrategy):
@@ -36,43 +90,55 @@ class TournamentSelection(SelectionStrategy):
     def __init__(self, tournament_size: int = 3):
         self.tournament_size = tournament_size
 
-    def select(
-        self, population: List[Genotype], fitness_scores: List[float]
-    ) -> Genotype:
-        tournament_contestants = random.sample(
-            list(zip(population, fitness_scores)), self.tournament_size
-        )
-        winner = max(tournament_contestants, key=lambda pair: pair[1])
-        # print(winner)
-        return winner[0].clone()
+    def prepare(self, fitness_scores: Sequence[float]) -> None:
+        super().prepare(fitness_scores)
+        self._fitness_list = list(fitness_scores)
+
+    def select_index(self) -> int:
+        contestants = random.sample(range(self._size), self.tournament_size)
+        return max(contestants, key=self._fitness_list.__getitem__)
+
+    def _select_many(self, count: int, rng: np.random.Generator) -> np.ndarray:
+        # Floyd's sampling: distinct contestants per tournament, one column at a time
+        n = self._size
+        contestants = np.empty((count, self.tournament_size), dtype=np.intp)
+        for column, j in enumerate(range(n - self.tournament_size, n)):
+            pick = rng.integers(0, j + 1, count)
+            taken = (contestants[:, :column] == pick[:, None]).any(axis=1)
+            contestants[:, column] = np.where(taken, j, pick)
+        winners = np.argmax(self._scores[contestants], axis=1)
+        return contestants[np.arange(count), winners]
 
 
 class RankBasedSelection(SelectionStrategy):
     """Implements rank-based selection where selection probability is based on rank, not raw fitness."""
 
-    def select(
-        self, population: List[Genotype], fitness_scores: List[float]
-    ) -> Genotype:
-        sorted_population = [
-            Genotype
-            for Genotype, _ in sorted(
-                zip(population, fitness_scores), key=lambda pair: pair[1]
-            )
-        ]
-        rank_weights = list(range(1, len(sorted_population) + 1))  # Create rank weights
-        total_rank = sum(rank_weights)
-        pick = random.uniform(0, total_rank)
-        current = 0
-        for Genotype, rank_weight in zip(sorted_population, rank_weights):
-            current += rank_weight
-            if current > pick:
-                return Genotype.clone()
+    def prepare(self, fitness_scores: Sequence[float]) -> None:
+        super().prepare(fitness_scores)
+        n = self._size
+        # population indexes from worst to best; rank k (1-based) has weight k
+        self._order = np.argsort(self._scores, kind="stable")
+        self._order_list = self._order.tolist()
+        self._cumulative = [k * (k + 1) // 2 for k in range(1, n + 1)]
+        self._total_rank = n * (n + 1) // 2
+
+    def select_index(self) -> int:
+        pick = random.uniform(0, self._total_rank)
+        rank = min(bisect_right(self._cumulative, pick), self._size - 1)
+        return self._order_list[rank]
+
+    def _select_many(self, count: int, rng: np.random.Generator) -> np.ndarray:
+        cumulative = np.asarray(self._cumulative, dtype=float)
+        picks = rng.uniform(0, self._total_rank, count)
+        ranks = np.minimum(np.searchsorted(cumulative, picks, side="right"), self._size - 1)
+        return self._order[ranks]
 
 
 class RandomSelection(SelectionStrategy):
     """Implements random selection where Genotypes are selected purely by chance."""
 
-    def select(
-        self, population: List[Genotype], fitness_scores: List[float]
-    ) -> Genotype:
-        return random.choice(population).clone()
+    def select_index(self) -> int:
+        return random.randrange(self._size)
+
+    def _select_many(self, count: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.integers(0, self._size, count)
@@ -0,0 +1,139 @@
+"""NumPy inference for the dense networks built by `NeuralNetworkTrainer.build_model`.
+
+`export_weights` copies the kernels, biases and activations of a trained Keras model
+into a small .npz file; `DenseNetwork` loads that file and runs the forward pass with
+NumPy, so robots can use the network without importing TensorFlow. Only exporting
+needs TensorFlow.
+
+    python ann_numpy.py [ann_model.keras] [ann_model.npz]
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Sequence, Tuple
+import sys
+
+import numpy as np
+
+KERAS_MODEL_PATH = "ann_model.keras"
+NPZ_MODEL_PATH = "ann_model.npz"
+
+
+@dataclass
+class SensorConfig:
+    """Configuration for sensor scaling"""
+    DISTANCE_RANGE: Tuple[float, float] = (0, 100)
+    ANGLE_RANGE: Tuple[float, float] = (-180, 180)
+    TURN_RANGE: Tuple[float, float] = (-90, 90)
+    MOVE_RANGE: Tuple[float, float] = (-10, 10)
+    NORMALIZED_RANGE: Tuple[float, float] = (0, 1)
+    INPUT_FEATURES: int = 9
+
+
+class DataScaler:
+    """Handle data scaling operations"""
+    @staticmethod
+    def scale(data: np.ndarray, 
+              from_interval: Tuple[float, float], 
+              to_interval: Tuple[float, float]=(0, 1)) -> np.ndarray:
+        """Scale data from one interval to another"""
+        from_min, from_max = from_interval
+        to_min, to_max = to_interval
+        
+        # Add small epsilon to avoid division by zero
+        epsilon = 1e-10
+        denominator = (from_max - from_min + epsilon)
+        
+        return to_min + (data - from_min) * (to_max - to_min) / denominator
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-x))
+
+
+ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+}
+
+
+class DenseNetwork:
+    """Stack of dense layers, computed in float32 like the Keras model it came from.
+
+    Callable like a Keras model on an (n, input_dims) batch; `predict` is provided too,
+    so it can stand in for the model in `NNTurn` / `NNMove`.
+    """
+
+    def __init__(
+        self,
+        kernels: Sequence[np.ndarray],
+        biases: Sequence[np.ndarray],
+        activations: Sequence[str],
+    ) -> None:
+        if not len(kernels) == len(biases) == len(activations):
+            raise ValueError("Every layer needs a kernel, a bias and an activation.")
+        for name in activations:
+            if name not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {name!r}.")
+        self.kernels = [np.asarray(kernel, dtype=np.float32) for kernel in kernels]
+        self.biases = [np.asarray(bias, dtype=np.float32) for bias in biases]
+        self.activations = list(activations)
+        self._layers = [
+            (kernel, bias, ACTIVATIONS[name])
+            for kernel, bias, name in zip(self.kernels, self.biases, self.activations)
+        ]
+
+    @property
+    def input_dims(self) -> int:
+        return self.kernels[0].shape[0]
+
+    def __call__(self, x: np.ndarray, training: bool = False) -> np.ndarray:
+        output = np.asarray(x, dtype=np.float32)
+        for kernel, bias, activation in self._layers:
+            output = activation(output @ kernel + bias)
+        return output
+
+    def predict(self, x: np.ndarray, verbose: int = 0) -> np.ndarray:
+        return self(x)
+
+    def save(self, path: str = NPZ_MODEL_PATH) -> None:
+        arrays = {"activations": np.array(self.activations)}
+        for i, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str = NPZ_MODEL_PATH) -> "DenseNetwork":
+        with np.load(path) as data:
+            activations = [str(name) for name in data["activations"]]
+            return cls(
+                [data[f"kernel_{i}"] for i in range(len(activations))],
+                [data[f"bias_{i}"] for i in range(len(activations))],
+                activations,
+            )
+
+
+def export_weights(model_path: str = KERAS_MODEL_PATH, npz_path: str = NPZ_MODEL_PATH) -> DenseNetwork:
+    """Write the dense layers of a Keras model to a .npz file read by `DenseNetwork.load`."""
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path)
+    kernels, biases, activations = [], [], []
+    for layer in model.layers:
+        config = layer.get_config()
+        if "units" not in config:
+            raise ValueError(f"Layer {layer.name} is not a dense layer.")
+        kernel, bias = layer.get_weights()
+        kernels.append(kernel)
+        biases.append(bias)
+        activations.append(config["activation"])
+    network = DenseNetwork(kernels, biases, activations)
+    network.save(npz_path)
+    return network
+
+
+if __name__ == "__main__":
+    export_weights(*sys.argv[1:3])
+    print(f"Exported {sys.argv[1] if len(sys.argv) > 1 else KERAS_MODEL_PATH}")
@@ -3,72 +3,103 @@
 import os
 import random
 import numpy as np
-import tensorflow as tf
 from typing import Tuple, List
-from dataclasses import dataclass
-from tensorflow.keras.models import load_model
-from pysimbotlib.core import PySimbotApp
 from base_robot import BaseRobot
-from kivy.config import Config
 from kivy.logger import Logger
 from sensors import SensorData
 from config import REFRESH_INTERVAL
 from strategies import Move, Turn, NNTurn, NNMove
+from ann_numpy import DataScaler, DenseNetwork, SensorConfig, KERAS_MODEL_PATH, NPZ_MODEL_PATH
+
+
+def load_network(npz_path: str = NPZ_MODEL_PATH, keras_path: str = KERAS_MODEL_PATH):
+    """The exported NumPy network when there is one, otherwise the Keras model."""
+    if os.path.exists(npz_path):
+        return DenseNetwork.load(npz_path)
+
+    Logger.warning(f'Model: {npz_path} not found, running {keras_path} with TensorFlow; export it with ann_numpy.py')
+    os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'  # Suppress TF warnings
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+
+    tf.get_logger().setLevel('ERROR')
+    return load_model(keras_path)
+
+class BatchedInference:
+    """One forward pass per tick for every robot sharing the model.
+
+    The first robot to ask on a tick senses all robots of its simulation at once
+    (`Simbot.sense_all`), runs the model on the (n_robots, INPUT_FEATURES) batch and
+    keeps the outputs; every robot then reads its own (turn, move) row. All inputs are
+    taken before any robot acts on the tick.
+    """
+
+    def __init__(self, model, scaler: DataScaler, config: SensorConfig):
+        self.model = model
+        self.scaler = scaler
+        self.config = config
+        self._key = None
+        self._rows = {}
+        self._outputs = None
+
+    def sensor_inputs(self, simbot) -> np.ndarray:
+        """Scaled network inputs of every robot in the simulation, in `robots` order."""
+        readings = simbot.sense_all()
+        columns = {id(obj): i for i, obj in enumerate(simbot.objectives)}
+        nearest = [columns[id(simbot.nearest_objective(robot.pos))] for robot in simbot.robots]
+        smells = readings.smells[np.arange(len(nearest)), nearest]
+
+        inputs = np.empty((len(simbot.robots), self.config.INPUT_FEATURES))
+        inputs[:, :8] = self.scaler.scale(readings.distances, self.config.DISTANCE_RANGE, self.config.NORMALIZED_RANGE)
+        inputs[:, 8] = self.scaler.scale(smells, self.config.ANGLE_RANGE, self.config.NORMALIZED_RANGE)
+        return inputs
+
+    def outputs(self, robot) -> np.ndarray:
+        """Normalized (turn, move) of the robot on the current tick."""
+        simbot = robot._sm
+        key = (id(simbot), simbot.simulation_count, simbot.iteration)
+        if key != self._key or id(robot) not in self._rows:
+            self._rows = {id(r): i for i, r in enumerate(simbot.robots)}
+            self._outputs = np.asarray(self.model(self.sensor_inputs(simbot), training=False))
+            self._key = key
+        return self._outputs[self._rows[id(robot)]]
 
-# Configuration
-tf.get_logger().setLevel('ERROR')
-Config.set('graphics', 'maxfps', 10)
-os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'  # Suppress TF warnings
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
-
-@dataclass
-class SensorConfig:
-    """Configuration for sensor scaling"""
-    DISTANCE_RANGE: Tuple[float, float] = (0, 100)
-    ANGLE_RANGE: Tuple[float, float] = (-180, 180)
-    TURN_RANGE: Tuple[float, float] = (-90, 90)
-    MOVE_RANGE: Tuple[float, float] = (-10, 10)
-    NORMALIZED_RANGE: Tuple[float, float] = (0, 1)
-    INPUT_FEATURES: int = 9
-
-class DataScaler:
-    """Handle data scaling operations"""
-    @staticmethod
-    def scale(data: np.ndarray, 
-              from_interval: Tuple[float, float], 
-              to_interval: Tuple[float, float]=(0, 1)) -> np.ndarray:
-        """Scale data from one interval to another"""
-        from_min, from_max = from_interval
-        to_min, to_max = to_interval
-        
-        # Add small epsilon to avoid division by zero
-        epsilon = 1e-10
-        denominator = (from_max - from_min + epsilon)
-        
-        return to_min + (data - from_min) * (to_max - to_min) / denominator
 
 class NNRobot(BaseRobot):
     """Neural Network controlled robot"""
+    MODEL_PATH = NPZ_MODEL_PATH
+    KERAS_FALLBACK_PATH = KERAS_MODEL_PATH
+    # shared by every NNRobot, so the model is loaded once and run once per tick
+    inference: BatchedInference = None
+
     def __init__(self, **kwargs):
         """Initialize robot with neural network model"""
         self.config = SensorConfig()
         self.scaler = DataScaler()
-        
-        try:
-            self.model = load_model('ann_model.keras')  # Updated to .keras extension
-            Logger.info('Model: Successfully loaded neural network model')
-        except Exception as e:
-            Logger.error(f'Model: Failed to load model: {e}')
-            raise
+
+        if NNRobot.inference is None:
+            try:
+                model = load_network(self.MODEL_PATH, self.KERAS_FALLBACK_PATH)
+                Logger.info('Model: Successfully loaded neural network model')
+            except Exception as e:
+                Logger.error(f'Model: Failed to load model: {e}')
+                raise
+            NNRobot.inference = BatchedInference(model, self.scaler, self.config)
+        self.model = NNRobot.inference.model
 
         super(NNRobot, self).__init__(**kwargs)
 
+    def predict(self) -> np.ndarray:
+        return self.inference.outputs(self)
+
     def create_turn_strategy(self) -> NNTurn:
         return NNTurn(
             sensor=self.sensor_data,
             model=self.model,
             scaler=self.scaler,
             config=self.config,
+            predict=self.predict,
         )
 
     def create_move_strategy(self) -> NNMove:
@@ -77,6 +108,7 @@ class NNRobot(BaseRobot):
             model=self.model,
             scaler=self.scaler,
             config=self.config,
+            predict=self.predict,
         )
 
     def update(self):
@@ -107,6 +139,11 @@ class NNRobot(BaseRobot):
 
 def main():
     """Main application entry point"""
+    # the Kivy front end opens a window, headless workers must not import it
+    from kivy.config import Config
+    Config.set('graphics', 'maxfps', 10)
+    from pysimbotlib.core import PySimbotApp
+
     Logger.info("Starting PySimbotApp with MyRobot.")
     try:
         app = PySimbotApp(
@@ -1,11 +1,34 @@
 import os
 import numpy as np
-import pandas as pd
-from typing import Tuple, Union, List
+from typing import Tuple, List
 from keras.models import Sequential
 from keras.layers import Dense
 from keras.callbacks import EarlyStopping, ModelCheckpoint
+from keras.utils import Sequence
 import matplotlib.pyplot as plt
+from ann_numpy import export_weights
+from training_data import TrainingData
+
+class HistoryBatches(Sequence):
+    """Keras batches of a TrainingData split, reshuffled after every epoch"""
+    def __init__(self, data: TrainingData, batch_size: int, validation: bool = False, seed: int = None):
+        super().__init__()
+        self.data = data
+        self.batch_size = batch_size
+        self.indexes = data.validation_indexes if validation else data.train_indexes
+        self.shuffle = not validation
+        self.rng = np.random.default_rng(seed)
+        self.on_epoch_end()
+
+    def __len__(self) -> int:
+        return -(-len(self.indexes) // self.batch_size)
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.data.batch(self.order[index * self.batch_size:(index + 1) * self.batch_size])
+
+    def on_epoch_end(self) -> None:
+        self.order = self.rng.permutation(self.indexes) if self.shuffle else self.indexes
+
 
 class NeuralNetworkTrainer:
     def __init__(self, 
@@ -23,47 +46,6 @@ class NeuralNetworkTrainer:
         self.model = None
         self.history = None
         
-    def scale(self, 
-              data: Union[pd.DataFrame, np.ndarray], 
-              from_interval: Tuple[float, float], 
-              to_interval: Tuple[float, float]=(0, 1)) -> np.ndarray:
-        """
-        Scale data from one interval to another
-        """
-        from_min, from_max = from_interval
-        to_min, to_max = to_interval
-        
-        # Add small epsilon to avoid division by zero
-        epsilon = 1e-10
-        denominator = (from_max - from_min + epsilon)
-        
-        return to_min + (data - from_min) * (to_max - to_min) / denominator
-    
-    def prepare_data(self, 
-                    filepath: str, 
-                    input_cols: int = 9) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """
-        Load and prepare data for training
-        """
-        try:
-            # Read data
-            df = pd.read_csv(filepath)
-            
-            # Scale different columns according to their ranges
-            df.iloc[:, 0:8] = self.scale(df.iloc[:, 0:8], (0, 100))
-            df.iloc[:, 8] = self.scale(df.iloc[:, 8], (-180, 180))
-            df.iloc[:, 9:] = self.scale(df.iloc[:, 9:], (-5, 5))
-            
-            # Split into input and output
-            x = df.iloc[:, :input_cols]
-            y = df.iloc[:, input_cols:]
-            
-            return x, y
-            
-        except Exception as e:
-            print(f"Error preparing data: {e}")
-            raise
-    
     def build_model(self) -> Sequential:
         """
         Build the neural network architecture
@@ -89,17 +71,8 @@ class NeuralNetworkTrainer:
         
         return model
     
-    def train(self, 
-              x: pd.DataFrame, 
-              y: pd.DataFrame, 
-              batch_size: int = 1000,
-              epochs: int = 1000,
-              validation_split: float = 0.2) -> None:
-        """
-        Train the model with early stopping and checkpoints
-        """
-        # Define callbacks
-        callbacks = [
+    def _callbacks(self) -> list:
+        return [
             EarlyStopping(
                 monitor='val_loss',
                 patience=50,
@@ -111,21 +84,27 @@ class NeuralNetworkTrainer:
                 save_best_only=True
             )
         ]
-        
-        # Build or load model
-        self.model = self.build_model()
+
+    def _build_or_load_model(self) -> Sequential:
+        model = self.build_model()
         if os.path.isfile(self.model_path):
-            self.model.load_weights(self.model_path)
+            model.load_weights(self.model_path)
             print("Loaded existing model weights")
-        
-        # Train model
+        return model
+
+    def train(self,
+              data: TrainingData,
+              batch_size: int = 1000,
+              epochs: int = 1000) -> None:
+        """
+        Train on memory-mapped history rows, reading one batch at a time
+        """
+        self.model = self._build_or_load_model()
         self.history = self.model.fit(
-            x, y,
-            batch_size=batch_size,
+            HistoryBatches(data, batch_size),
+            validation_data=HistoryBatches(data, batch_size, validation=True),
             epochs=epochs,
-            validation_split=validation_split,
-            callbacks=callbacks,
-            shuffle=True
+            callbacks=self._callbacks()
         )
         
     def plot_training_history(self) -> None:
@@ -148,11 +127,14 @@ def main():
         # Initialize trainer
         trainer = NeuralNetworkTrainer()
         
-        # Prepare data
-        x, y = trainer.prepare_data('move_history.csv')
+        # Stream every recorded history shard through the memory-mapped cache
+        data = TrainingData.load()
         
         # Train model
-        trainer.train(x, y)
+        trainer.train(data)
+
+        # Export the weights for TensorFlow-free inference in ann_robot.py
+        export_weights(trainer.model_path)
         
         # Plot results
         trainer.plot_training_history()
@@ -45,6 +45,7 @@ class BaseRobot(Robot):
             safe_dist=self.SAFE_DIST,
             close_dist=self.CLOSE_DIST,
             hit_dist=self.HIT_DIST,
+            stamp=self.sense_stamp,
         )
 
     # Abstract methods to be implemented by subclasses
@@ -60,10 +61,7 @@ class BaseRobot(Robot):
     @property
     def food_dist(self) -> float:
         if self._sm:
-            nearest_food = min(
-                self._sm.objectives,
-                key=lambda food: self.cal_distance(self.pos, food.pos),
-            )
+            nearest_food = self._sm.nearest_objective(self.pos)
             return self.cal_distance(self.pos, nearest_food.pos)
         return 0
 
@@ -28,145 +28,130 @@ class FuzzyRobot(BaseRobot):
         )
 
     def setup_turn_rule(self, fuzzy_interface_turn: FuzzyInterface) -> None:
+        # smell_side* are the distances toward the smell and one sensor either side of it,
+        # smell_angle and smell_sign are crisp; see FuzzyTurn
         fuzzy_interface_turn.add_rule(
-            lambda values: self.smell()
-            * values[self.sensor_data.smell_side()]["far"]
-            * max(
-                values[
-                    self.sensor_data.side_with_offset(self.sensor_data.smell_side(), -1)
-                ]["medium"],
-                values[
-                    self.sensor_data.side_with_offset(self.sensor_data.smell_side(), -1)
-                ]["far"],
-            )
-            * max(
-                values[
-                    self.sensor_data.side_with_offset(self.sensor_data.smell_side(), 1)
-                ]["medium"],
-                values[
-                    self.sensor_data.side_with_offset(self.sensor_data.smell_side(), 1)
-                ]["far"],
+            (
+                ("smell_angle", None),
+                ("smell_side", "far"),
+                (("smell_side_left", "medium"), ("smell_side_left", "far")),
+                (("smell_side_right", "medium"), ("smell_side_right", "far")),
             ),
             1,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: self.sensor_data.smell_food_on_left_sign()
-            * values["front"]["close"]
-            * values["front_left"]["far"]
-            * values["front_right"]["far"],
+            (
+                ("smell_sign", None),
+                ("front", "close"),
+                ("front_left", "far"),
+                ("front_right", "far"),
+            ),
             45,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: self.sensor_data.smell_food_on_left_sign()
-            * values["front"]["close"]
-            * values["front_left"]["close"]
-            * values["front_right"]["close"],
+            (
+                ("smell_sign", None),
+                ("front", "close"),
+                ("front_left", "close"),
+                ("front_right", "close"),
+            ),
             90,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: values["front"]["close"]
-            * max(values["front_left"]["close"], values["front_left"]["medium"])
-            * max(values["left"]["close"], values["left"]["medium"]),
+            (
+                ("front", "close"),
+                (("front_left", "close"), ("front_left", "medium")),
+                (("left", "close"), ("left", "medium")),
+            ),
             135,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: values["front"]["far"]
-            * values["front_left"]["close"]
-            * values["front_right"]["close"],
+            (("front", "far"), ("front_left", "close"), ("front_right", "close")),
             180,
         )
 
         # --------------------------------------------------------------------------------------------
 
         fuzzy_interface_turn.add_rule(
-            lambda values: values["front"]["close"]
-            * max(values["front_right"]["close"], values["front_right"]["medium"]),
+            (
+                ("front", "close"),
+                (("front_right", "close"), ("front_right", "medium")),
+            ),
             -90,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: max(
-                values["front_left"]["far"], values["front_left"]["medium"]
-            )
-            * max(values["front"]["far"], values["front"]["medium"])
-            * values["front_right"]["close"]
-            * max(values["right"]["far"], values["right"]["medium"]),
+            (
+                (("front_left", "far"), ("front_left", "medium")),
+                (("front", "far"), ("front", "medium")),
+                ("front_right", "close"),
+                (("right", "far"), ("right", "medium")),
+            ),
             -45,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: max(
-                values["front_left"]["far"], values["front_left"]["medium"]
-            )
-            * values["front"]["far"]
-            * values["front_right"]["close"]
-            * values["right"]["close"],
+            (
+                (("front_left", "far"), ("front_left", "medium")),
+                ("front", "far"),
+                ("front_right", "close"),
+                ("right", "close"),
+            ),
             -45,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: values["front"]["close"]
-            * max(values["right"]["close"], values["right"]["medium"])
-            * max(values["front_right"]["close"], values["front_right"]["medium"]),
+            (
+                ("front", "close"),
+                (("right", "close"), ("right", "medium")),
+                (("front_right", "close"), ("front_right", "medium")),
+            ),
             -135,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: values["front"]["close"]
-            * max(values["front_left"]["close"], values["front_left"]["medium"]),
+            (
+                ("front", "close"),
+                (("front_left", "close"), ("front_left", "medium")),
+            ),
             90,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: max(
-                values["front_right"]["far"], values["front_right"]["medium"]
-            )
-            * max(values["front"]["far"], values["front"]["medium"])
-            * values["front_left"]["close"]
-            * max(values["left"]["far"], values["left"]["medium"]),
+            (
+                (("front_right", "far"), ("front_right", "medium")),
+                (("front", "far"), ("front", "medium")),
+                ("front_left", "close"),
+                (("left", "far"), ("left", "medium")),
+            ),
             45,
         )
 
         fuzzy_interface_turn.add_rule(
-            lambda values: max(
-                values["front_right"]["far"], values["front_right"]["medium"]
-            )
-            * values["front"]["far"]
-            * values["front_left"]["close"]
-            * values["left"]["close"],
+            (
+                (("front_right", "far"), ("front_right", "medium")),
+                ("front", "far"),
+                ("front_left", "close"),
+                ("left", "close"),
+            ),
             45,
         )
 
     def setup_move_rule(self, fuzzy_interface_move: FuzzyInterface) -> None:
-        fuzzy_interface_move.add_rule(
-            lambda values: values["front"]["far"],
-            30,
-        )
+        fuzzy_interface_move.add_rule((("front", "far"),), 30)
 
-        fuzzy_interface_move.add_rule(
-            lambda values: values["front_left"]["medium"],
-            10,
-        )
+        fuzzy_interface_move.add_rule((("front_left", "medium"),), 10)
 
-        fuzzy_interface_move.add_rule(
-            lambda values: values["front_right"]["medium"],
-            10,
-        )
+        fuzzy_interface_move.add_rule((("front_right", "medium"),), 10)
 
         fuzzy_interface_move.add_rule(
-            lambda values: sum(
-                [
-                    values["front"]["close"],
-                    values["front_left"]["close"],
-                    values["front_right"]["close"],
-                ]
-            )
-            / 3,
+            (("front", "close"), ("front_left", "close"), ("front_right", "close")),
             -20,
+            t_norm="mean",
         )
 
     def setup_interface(self) -> Tuple[FuzzyInterface, FuzzyInterface]:
@@ -208,6 +193,9 @@ class FuzzyRobot(BaseRobot):
                 "left": distance_msf,
                 "front_left": distance_msf,
                 "smell": smell_direction_msf,
+                "smell_side": distance_msf,
+                "smell_side_left": distance_msf,
+                "smell_side_right": distance_msf,
             },
         )
 
@@ -1,6 +1,6 @@
-from typing import Callable, List
+from typing import Callable, List, Optional
 from kivy.logger import Logger
-from pysimbotlib.core import Robot, PySimbotApp, Simbot
+from pysimbotlib.core import Robot, Simbot
 from pysimbotlib.core.Util import Util
 from collections import deque
 import numpy as np
@@ -10,6 +10,7 @@ from fuzzy_logic import CombinedMembershipFunctions, MembershipFunction
 
 from GeneticAlgorithm import (
     GeneticAlgorithm,
+    ParallelEvaluator,
     Chromosome,
     Genotype,
     TournamentSelection,
@@ -22,9 +23,9 @@ from GeneticAlgorithm import (
 )
 
 from config import REFRESH_INTERVAL
+from metrics import MetricSeries
 import random
-import os, platform
-import matplotlib.pyplot as plt
+import os, platform, sys
 
 
 if platform.system() == "Linux" or platform.system() == "Darwin":
@@ -63,6 +64,17 @@ smell_msf.add_membership(
     MembershipFunction.create(function="triangular", a=0, b=45, c=45),
 )
 
+DISTANCE_RANGE = (0, 100)
+ANGLE_RANGE = (-180, 180)
+
+# tabulated over the sensor ranges; the breakpoints are whole numbers, so lookups are exact
+dist_fuzzy = dist_msf.compile(domain=DISTANCE_RANGE)
+smell_fuzzy = smell_msf.compile(domain=ANGLE_RANGE)
+
+# fuzzify each sensor once per evaluation, see CompiledGenotype
+FUZZIFIERS = {side: lambda **args: dist_fuzzy.fuzzify(args["x"]) for side in SIDE}
+FUZZIFIERS["smell_direction"] = lambda **args: smell_fuzzy.fuzzify(args["x"])
+
 chromosome = Chromosome()
 
 for side in SIDE:
@@ -121,7 +133,9 @@ genetic_algorithm = GeneticAlgorithm(
     ),
 )
 
-death_counts = []
+# deaths per TICK_INTERVAL window, read back by plot_death_counts()
+DEATHS_PATH = "genetic_deaths.bin"
+death_metrics: Optional[MetricSeries] = None
 avg_fitness_value_list = []
 max_fitness_value_list = []
 current_tick = 0
@@ -170,11 +184,16 @@ class GeneticRobot(Robot):
     MAX_ENERGY: int = 500
     WINDOW: int = 20
 
-    def __init__(self, **kwarg) -> None:
+    def __init__(self, assigned_genotype: Genotype = None, evolve: bool = True, **kwarg) -> None:
         super(GeneticRobot, self).__init__(**kwarg)
         self.sensor_data = self.sensor()
-        self.genotype = genotype
-        genotype.scamble()
+        if assigned_genotype is None:
+            assigned_genotype = genotype
+            genotype.scamble()
+        self.genotype = assigned_genotype
+        self.compiled_genotype = self.genotype.compile(FUZZIFIERS)
+        # when False the robot keeps its genotype for the whole episode, see episode_fitness
+        self.evolve = evolve
         self.move_strategy: Move = self.create_move_strategy()
         self.turn_strategy: Turn = self.create_turn_strategy()
 
@@ -230,10 +249,10 @@ class GeneticRobot(Robot):
         self.start_dist = 0
 
     def create_move_strategy(self) -> Move:
-        return GeneticMove(sensor=self.sensor_data, genotype=self.genotype)
+        return GeneticMove(sensor=self.sensor_data, genotype=self.compiled_genotype)
 
     def create_turn_strategy(self) -> Turn:
-        return GeneticTurn(sensor=self.sensor_data, genotype=self.genotype)
+        return GeneticTurn(sensor=self.sensor_data, genotype=self.compiled_genotype)
 
     def change_color(self) -> None:
         if self.energy < 100:
@@ -263,7 +282,7 @@ class GeneticRobot(Robot):
         return not (sum_turn_delta / len(history) > turn_tolerance)
 
     def update(self):
-        global death_counts, current_tick
+        global death_metrics, current_tick
         fitness: List[float] = []
         try:
 
@@ -322,9 +341,15 @@ class GeneticRobot(Robot):
             if self.just_eat:
                 self.energy += self.MAX_ENERGY
 
-            if self.is_dead():
+            if self.is_dead() and not self.evolve:
+                self.death_count += 1
+                self.energy = 400
+
+            elif self.is_dead():
                 self.death_count += 1
-                death_counts.append(current_tick)
+                if death_metrics is None:
+                    death_metrics = MetricSeries(("deaths",), TICK_INTERVAL, path=DEATHS_PATH)
+                death_metrics.add(current_tick, deaths=1)
 
                 genetic_algorithm.population = [
                     robot.genotype for robot in self._sm.robots
@@ -333,6 +358,7 @@ class GeneticRobot(Robot):
                     robot.calculate_fitness() for robot in self._sm.robots
                 ]
                 self.genotype = genetic_algorithm.create_new_genotype()
+                self.compiled_genotype = self.genotype.compile(FUZZIFIERS)
                 self.move_strategy: Move = self.create_move_strategy()
                 self.turn_strategy: Turn = self.create_turn_strategy()
                 self.clear_stat()
@@ -356,29 +382,86 @@ class GeneticRobot(Robot):
             safe_dist=self.SAFE_DIST,
             close_dist=self.CLOSE_DIST,
             hit_dist=self.HIT_DIST,
+            stamp=self.sense_stamp,
         )
 
 
+EPISODE_TICKS = 2000
+EPISODES_PER_GENOTYPE = 2
+GENERATIONS = 50
+
+
+def genotype_template() -> Genotype:
+    return genotype.clone()
+
+
+def episode_fitness(episode_genotype: Genotype, seed: int) -> float:
+    """Fitness of a genotype driving a single robot through one headless episode."""
+    simbot = Simbot(
+        customfn_create_robots=lambda: [
+            GeneticRobot(assigned_genotype=episode_genotype, evolve=False)
+        ],
+        num_objectives=6,
+        max_tick=EPISODE_TICKS,
+        map="default_map2",
+        food_move_after_eat=True,
+    )
+    simbot.run()
+    return simbot.robots[0].calculate_fitness()
+
+
+def evolve_headless(generations: int = GENERATIONS, max_workers: int = None, seed: int = 0) -> None:
+    random.seed(seed)
+    evaluator = ParallelEvaluator(
+        genotype_factory=genotype_template,
+        fitness_function=episode_fitness,
+        episodes_per_genotype=EPISODES_PER_GENOTYPE,
+        max_workers=max_workers,
+        seed=seed,
+    )
+    with evaluator:
+        genetic_algorithm.evaluator = evaluator
+        genetic_algorithm.batch = True
+        genetic_algorithm.rng = np.random.default_rng(seed)
+        # initialize_population appends, start from an empty population on every run
+        genetic_algorithm.population = []
+        genetic_algorithm.fitness_scores = []
+        genetic_algorithm.initialize_population(genotype)
+        for generation in range(generations):
+            genetic_algorithm.evaluate_population()
+            fitness = genetic_algorithm.fitness_scores
+            avg_fitness_value_list.append(sum(fitness) / len(fitness))
+            max_fitness_value_list.append(max(fitness))
+            Logger.info(
+                f"GA: generation {generation} avg {avg_fitness_value_list[-1]:.1f} max {max_fitness_value_list[-1]:.1f}"
+            )
+            genetic_algorithm.create_next_generation()
+
+
 def plot_death_counts():
+    import matplotlib.pyplot as plt
+
     global current_tick
 
     last_tick = current_tick
     num_intervals = (last_tick // TICK_INTERVAL) + 1
-    aggregated_counts = [0] * num_intervals
+    aggregated_counts = np.zeros(num_intervals, dtype=int)
 
-    for death_tick in death_counts:
-        interval_index = death_tick // TICK_INTERVAL
-        if interval_index < num_intervals:
-            aggregated_counts[interval_index] += 1
+    if death_metrics is not None:
+        death_metrics.close()
+        series = death_metrics.read()
+        windows = series["window"].astype(int)
+        recorded = windows < num_intervals
+        aggregated_counts[windows[recorded]] = series["samples"][recorded]
 
     plt.figure(figsize=(12, 6))
     plt.bar(range(num_intervals), aggregated_counts, align="center")
-    plt.title(f"Death Counts per 2000Ticks")
+    plt.title(f"Death Counts per {TICK_INTERVAL} Ticks")
     plt.xlabel(f"Tick Interval")
     plt.ylabel("Number of Deaths")
 
     x_ticks = range(0, num_intervals, max(1, num_intervals // 10))
-    plt.xticks(x_ticks, [f"{i*2000}" for i in x_ticks], rotation=45)
+    plt.xticks(x_ticks, [f"{i*TICK_INTERVAL}" for i in x_ticks], rotation=45)
 
     plt.tight_layout()
     plt.show()
@@ -389,6 +472,13 @@ def plot_death_counts():
 
 
 if __name__ == "__main__":
+    if "--headless" in sys.argv:
+        evolve_headless()
+        sys.exit()
+
+    # the Kivy front end opens a window, headless runs must not import it
+    from pysimbotlib.core import PySimbotApp
+
     app = PySimbotApp(
         robot_cls=GeneticRobot,
         num_robots=20,
@@ -39,7 +39,7 @@ class ManualRobot(Robot):
     def __init__(self) -> None:
         super().__init__()
         self.prev_direction = self._direction
-        self.prev_position = list(self.pos)
+        self.prev_position = tuple(self.pos)
 
 
     def is_change(self) -> bool:
@@ -47,7 +47,7 @@ class ManualRobot(Robot):
 
     def update_pos_dir(self) -> None:
         self.prev_direction = self._direction
-        self.prev_position = list(self.pos)
+        self.prev_position = tuple(self.pos)
 
     def update(self):
         try:
@@ -0,0 +1,132 @@
+"""How the headless simulation scales with obstacles, robots and arena size.
+
+Every case of `BENCHMARK_SUITE` generates its map with `MapGenerator.generate_map`
+from a fixed seed, spawns `BenchmarkRobot`s, which read all distance sensors and the
+nearest food and move on every tick, and times `Simbot.run`. Results are printed and
+optionally written as CSV, so runs before and after a change can be compared.
+
+    python map_benchmark.py [ticks] [results.csv]
+"""
+
+from dataclasses import asdict, dataclass, fields
+from typing import List, Optional, Sequence, Tuple
+import csv
+import os
+import random
+import sys
+import time
+
+from pysimbotlib.core import Robot, Simbot
+from pysimbotlib.core.MapGenerator import generate_map
+
+BENCHMARK_MAP_DIR = "benchmark_maps"
+BENCHMARK_TICKS = 200
+BENCHMARK_SEED = 0
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    axis: str
+    num_obstacles: int
+    num_robots: int
+    arena_size: Tuple[int, int]
+
+
+# one sweep per axis, the other two held at a middle value
+BENCHMARK_SUITE: Tuple[BenchmarkCase, ...] = (
+    *(BenchmarkCase("obstacles", n, 10, (7000, 6000)) for n in (10, 100, 1000, 10000)),
+    *(BenchmarkCase("robots", 100, n, (700, 600)) for n in (1, 10, 100)),
+    *(BenchmarkCase("arena", 100, 10, size) for size in ((700, 600), (1400, 1200), (2800, 2400), (5600, 4800))),
+)
+
+
+@dataclass
+class BenchmarkResult:
+    axis: str
+    num_obstacles: int
+    num_robots: int
+    arena_width: int
+    arena_height: int
+    ticks: int
+    setup_seconds: float
+    run_seconds: float
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.run_seconds if self.run_seconds else float("inf")
+
+
+class BenchmarkRobot(Robot):
+    """Wanders towards the nearest food, turning away from whatever is in front."""
+
+    def update(self) -> None:
+        distances = self.distance()
+        if distances[0] < 20:
+            left, right = distances[6] + distances[7], distances[1] + distances[2]
+            self.turn(45 if right >= left else -45)
+        else:
+            self.turn(max(-15, min(15, self.smell_nearest())))
+        self.move(5)
+
+
+def map_path(case: BenchmarkCase, seed: int, map_dir: str = BENCHMARK_MAP_DIR) -> str:
+    width, height = case.arena_size
+    return os.path.join(map_dir, f"bench-{case.num_obstacles}-{width}x{height}-s{seed}.kv")
+
+
+def run_case(case: BenchmarkCase, ticks: int = BENCHMARK_TICKS, seed: int = BENCHMARK_SEED, map_dir: str = BENCHMARK_MAP_DIR) -> BenchmarkResult:
+    path = generate_map(map_path(case, seed, map_dir), case.num_obstacles, case.arena_size, seed)
+    random.seed(seed)
+    start = time.perf_counter()
+    simbot = Simbot(
+        robot_cls=BenchmarkRobot,
+        num_robots=case.num_robots,
+        map=path,
+        arena_size=case.arena_size,
+        # the first tick spawns the robots, the episode must not end within the timed ticks
+        max_tick=ticks + 2,
+    )
+    simbot.step()
+    setup = time.perf_counter() - start
+    start = time.perf_counter()
+    simbot.run(ticks=ticks)
+    return BenchmarkResult(
+        case.axis, case.num_obstacles, case.num_robots, *case.arena_size, ticks, setup, time.perf_counter() - start
+    )
+
+
+def run_suite(
+    suite: Sequence[BenchmarkCase] = BENCHMARK_SUITE,
+    ticks: int = BENCHMARK_TICKS,
+    seed: int = BENCHMARK_SEED,
+    map_dir: str = BENCHMARK_MAP_DIR,
+) -> List[BenchmarkResult]:
+    results = []
+    for case in suite:
+        result = run_case(case, ticks, seed, map_dir)
+        print(
+            f"[{result.axis:>9}]  obstacles {result.num_obstacles:>5}  robots {result.num_robots:>3}  "
+            f"arena {result.arena_width:>4}x{result.arena_height:<4}  "
+            f"setup {result.setup_seconds * 1000:8.1f} ms  {result.ticks_per_second:9.1f} ticks/s"
+        )
+        results.append(result)
+    return results
+
+
+def write_results(results: Sequence[BenchmarkResult], path: str) -> None:
+    columns = [field.name for field in fields(BenchmarkResult)] + ["ticks_per_second"]
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for result in results:
+            writer.writerow([*asdict(result).values(), result.ticks_per_second])
+
+
+def main(ticks: int = BENCHMARK_TICKS, output: Optional[str] = None) -> None:
+    results = run_suite(ticks=ticks)
+    if output is not None:
+        write_results(results, output)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else BENCHMARK_TICKS, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,187 @@
+"""Fixed-memory training metrics.
+
+`MetricSeries` folds per-tick values into fixed-size tick windows, keeping one row per
+window (sample count, sum, min and max of every metric, plus optional histogram bin
+counts) and appending closed windows to a compact binary file, so a run of any length
+uses the same memory.
+
+Series file layout, little-endian:
+    magic b"PSMS" | version uint16 | header length uint32 | JSON header | padding | rows
+
+The JSON header records the window size and the column names; rows are float64, one
+per window, in window order, aligned to 64 bytes.
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"PSMS"
+VERSION = 1
+DTYPE = np.dtype("<f8")
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct("<4sHI")
+
+
+def _encode_header(header: Dict) -> bytes:
+    body = json.dumps(header).encode("utf-8")
+    offset = _PREFIX.size + len(body)
+    padding = -offset % ALIGNMENT
+    return _PREFIX.pack(MAGIC, VERSION, len(body) + padding) + body + b" " * padding
+
+
+def read_series(path: str) -> Dict[str, np.ndarray]:
+    """Every column of a series file, plus "window_size" as a 0-d array."""
+    with open(path, "rb") as file:
+        prefix = file.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path} is not a metric series file")
+        magic, version, length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a metric series file")
+        if version != VERSION:
+            raise ValueError(f"{path} has metric series format version {version}, expected {VERSION}")
+        header = json.loads(file.read(length).decode("utf-8"))
+        rows = np.fromfile(file, dtype=DTYPE).reshape(-1, len(header["columns"]))
+    series = {name: rows[:, i] for i, name in enumerate(header["columns"])}
+    series["window_size"] = np.array(header["window"])
+    return series
+
+
+class MetricSeries:
+    """Per-window aggregates of named metrics.
+
+    `add(tick, **values)` folds one sample into the window holding `tick`; a metric left
+    out of a sample counts as 0. Ticks must not go backwards. When a tick falls past the
+    open window, it is closed, and so is every skipped window, as an empty row. Closed
+    rows are kept in a buffer of `buffer_size` rows and appended to `path` whenever it
+    fills up or on `flush`; without a path only the last `buffer_size` windows are kept.
+    The open window is only written by `close`, which ends the series.
+
+    The columns are "window" (index of the window, tick // window_size), "samples", and
+    for every metric "<name>_sum", "<name>_min", "<name>_max". A metric with histogram
+    edges also gets "<name>_bin<i>" counts: bin 0 holds values below edges[0], bin i
+    values in [edges[i-1], edges[i]), the last bin values from edges[-1] on.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        window_size: int,
+        path: Optional[str] = None,
+        histograms: Optional[Dict[str, Sequence[float]]] = None,
+        buffer_size: int = 256,
+    ) -> None:
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1.")
+        self.names = tuple(names)
+        self.window_size = window_size
+        self.path = path
+        self.histograms = {name: [float(edge) for edge in edges] for name, edges in (histograms or {}).items()}
+        unknown = set(self.histograms) - set(self.names)
+        if unknown:
+            raise ValueError(f"Histograms for unknown metrics: {sorted(unknown)}")
+
+        self.columns: List[str] = ["window", "samples"]
+        for name in self.names:
+            self.columns += [f"{name}_sum", f"{name}_min", f"{name}_max"]
+        for name, edges in self.histograms.items():
+            self.columns += [f"{name}_bin{i}" for i in range(len(edges) + 1)]
+
+        self._buffer = np.zeros((buffer_size, len(self.columns)), dtype=DTYPE)
+        self._buffered = 0
+        self._window: Optional[int] = None
+        self._closed = False
+        self._reset_window()
+        if path is not None:
+            # a new series replaces the file of an earlier run
+            with open(path, "wb") as file:
+                file.write(_encode_header({"window": window_size, "columns": self.columns}))
+
+    def _reset_window(self) -> None:
+        self._samples = 0
+        self._sums = [0.0] * len(self.names)
+        self._mins = [float("inf")] * len(self.names)
+        self._maxs = [float("-inf")] * len(self.names)
+        self._bins = {name: [0] * (len(edges) + 1) for name, edges in self.histograms.items()}
+
+    def add(self, tick: int, **values: float) -> None:
+        if self._closed:
+            raise ValueError("The series is closed.")
+        window = tick // self.window_size
+        if window != self._window:
+            if self._window is not None:
+                if window < self._window:
+                    raise ValueError(f"Tick {tick} is before the open window {self._window}.")
+                self._close_window()
+                for skipped in range(self._window + 1, window):
+                    self._window = skipped
+                    self._close_window()
+            self._window = window
+
+        self._samples += 1
+        for i, name in enumerate(self.names):
+            value = values.get(name, 0)
+            self._sums[i] += value
+            if value < self._mins[i]:
+                self._mins[i] = value
+            if value > self._maxs[i]:
+                self._maxs[i] = value
+        for name, edges in self.histograms.items():
+            self._bins[name][bisect_right(edges, values.get(name, 0))] += 1
+
+    def _window_row(self) -> List[float]:
+        row = [self._window, self._samples]
+        for total, low, high in zip(self._sums, self._mins, self._maxs):
+            row += [total, low, high] if self._samples else [0.0, 0.0, 0.0]
+        for counts in self._bins.values():
+            row += counts
+        return row
+
+    def _close_window(self) -> None:
+        row = self._window_row()
+        if self._buffered == len(self._buffer):
+            self._flush_buffer()
+        self._buffer[self._buffered] = row
+        self._buffered += 1
+        self._reset_window()
+
+    def _flush_buffer(self) -> None:
+        if self.path is not None:
+            with open(self.path, "ab") as file:
+                file.write(self._buffer[: self._buffered].tobytes())
+            self._buffered = 0
+        else:
+            # keep the newest windows
+            self._buffer = np.roll(self._buffer, -1, axis=0)
+            self._buffered -= 1
+
+    def flush(self) -> None:
+        """Write every closed row to the file; the open window keeps taking samples."""
+        if self.path is not None:
+            self._flush_buffer()
+
+    def close(self) -> None:
+        """Close the open window and write every row to the file. No samples can be added afterwards."""
+        if self._window is not None and self._samples and not self._closed:
+            self._close_window()
+        self._closed = True
+        self.flush()
+
+    def read(self) -> Dict[str, np.ndarray]:
+        """Every window by column, from the file and the buffer, the open window last."""
+        if self.path is not None:
+            self._flush_buffer()
+            series = read_series(self.path)
+        else:
+            rows = self._buffer[: self._buffered]
+            series = {name: rows[:, i].copy() for i, name in enumerate(self.columns)}
+            series["window_size"] = np.array(self.window_size)
+        if self._window is not None and self._samples and not self._closed:
+            for name, value in zip(self.columns, self._window_row()):
+                series[name] = np.append(series[name], value)
+        return series
@@ -13,11 +13,12 @@ from kivy.uix.widget import Widget
 from kivy.properties import ObjectProperty
 from kivy.metrics import Metrics
 
-from .Simbot import Simbot, PySimbotMap
+from .Simbot import Simbot
+from .View import SimbotView, PySimbotMap
 from .Scaler import Scaler
 from .Robot import Robot
 
-from .Global import ROBOT_DEFAULT_START_POS, OBJECTIVE_DEFAULT_START_POS
+from .Global import ROBOT_DEFAULT_START_POS, OBJECTIVE_DEFAULT_START_POS, THEMES_DIR
 
 class PySimbotApp(App):
 
@@ -47,17 +48,14 @@ class PySimbotApp(App):
         self.interval = interval
         Window.size = (900 / Metrics.dp, 600 / Metrics.dp)
 
-        map_file_name = "pysimbotlib/maps/%s.kv" % map
-        theme_file_name = "pysimbotlib/themes/%s.kv" % theme
-        if not os.path.exists(map_file_name):
-            raise FileNotFoundError("File [%s] is not found." % map_file_name)
+        theme_file_name = os.path.join(THEMES_DIR, "%s.kv" % theme)
         if not os.path.exists(theme_file_name):
             raise FileNotFoundError("File [%s] is not found." % theme_file_name)
         
-        Builder.load_file(map_file_name)
         Builder.load_file(theme_file_name)
 
         self.simbot = Simbot(max_tick=max_tick,
+                            map = map,
                             robot_cls = robot_cls,
                             num_robots = num_robots,
                             num_objectives = num_objectives,
@@ -71,19 +69,24 @@ class PySimbotApp(App):
                             save_wasd_history = save_wasd_history,
                             robot_see_each_other = robot_see_each_other)
 
-        self.simbotMap = PySimbotMap(self.simbot,
+        self.simbotView = SimbotView(self.simbot)
+        self.simbotMap = PySimbotMap(self.simbotView,
                             enable_wasd_control = enable_wasd_control,
                             save_wasd_history = save_wasd_history)
 
-        self.simbot.add_widget(self.simbotMap, index=1)
+        self.simbotView.add_widget(self.simbotMap, index=1)
 
     def build(self):
         if platform.system() == 'Darwin':
             self._scaler = Scaler(size=Window.size, scale=2)
             Window.add_widget(self._scaler)
             parent = self._scaler or Window
-            parent.add_widget(self.simbot)
+            parent.add_widget(self.simbotView)
         else:
-            Window.add_widget(self.simbot)
+            Window.add_widget(self.simbotView)
 
-        Clock.schedule_interval(self.simbot.process, self.interval)
\ No newline at end of file
+        Clock.schedule_interval(self.process, self.interval)
+
+    def process(self, dt):
+        self.simbot.process(dt)
+        self.simbotView.refresh()
\ No newline at end of file
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+from typing import Tuple
+
+class Body:
+    """Axis-aligned box with the geometry accessors of a Kivy Widget, minus the property dispatch."""
+
+    default_size: Tuple[float, float] = (100, 100)
+
+    def __init__(self, pos: Tuple[float, float] = (0, 0), size: Tuple[float, float] = None):
+        self._x, self._y = pos
+        self._width, self._height = size if size is not None else self.default_size
+
+    @property
+    def pos(self) -> Tuple[float, float]:
+        return (self._x, self._y)
+
+    @pos.setter
+    def pos(self, value: Tuple[float, float]) -> None:
+        self._x, self._y = value
+        self._on_geometry_changed()
+
+    @property
+    def x(self) -> float:
+        return self._x
+
+    @x.setter
+    def x(self, value: float) -> None:
+        self.pos = (value, self._y)
+
+    @property
+    def y(self) -> float:
+        return self._y
+
+    @y.setter
+    def y(self, value: float) -> None:
+        self.pos = (self._x, value)
+
+    @property
+    def size(self) -> Tuple[float, float]:
+        return (self._width, self._height)
+
+    @size.setter
+    def size(self, value: Tuple[float, float]) -> None:
+        self._width, self._height = value
+        self._on_geometry_changed()
+
+    def _on_geometry_changed(self) -> None:
+        pass
+
+    @property
+    def width(self) -> float:
+        return self._width
+
+    @property
+    def height(self) -> float:
+        return self._height
+
+    @property
+    def right(self) -> float:
+        return self._x + self._width
+
+    @property
+    def top(self) -> float:
+        return self._y + self._height
+
+    @property
+    def center_x(self) -> float:
+        return self._x + 0.5 * self._width
+
+    @property
+    def center_y(self) -> float:
+        return self._y + 0.5 * self._height
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        return (self._x + 0.5 * self._width, self._y + 0.5 * self._height)
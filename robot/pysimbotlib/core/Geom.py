@@ -1,6 +1,7 @@
 from typing import Generator, Iterable, Tuple, Union
 
 import math
+import numpy as np
 
 class Geom:
     
@@ -31,6 +32,70 @@ class Geom:
             yield (top_right, top_left)
             yield (top_left, buttom_left)
 
+    @staticmethod
+    def segments_array(lines: Iterable[Line]) -> np.ndarray:
+        # (N, 4) array of (x1, y1, x2, y2) rows
+        return np.array([(p1[0], p1[1], p2[0], p2[1]) for p1, p2 in lines], dtype=float).reshape(-1, 4)
+
+    @staticmethod
+    def rays_segments_min_distance(origins: np.ndarray, ends: np.ndarray, segments: np.ndarray, max_distance: float) -> np.ndarray:
+        """Vectorized `line_segment_intersect` of every ray against every segment.
+
+        origins and ends are (R, 2) arrays, segments is (S, 4). Returns for each ray the distance
+        from its origin to the nearest intersection, or max_distance when it hits nothing.
+        """
+        x1 = origins[:, 0, None]
+        y1 = origins[:, 1, None]
+        x2 = ends[:, 0, None]
+        y2 = ends[:, 1, None]
+        x3, y3, x4, y4 = segments.T
+        denominator = (x4 - x3) * (y1 - y2) - (x1 - x2) * (y4 - y3)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ta = ((y3 - y4) * (x1 - x3) + (x4 - x3) * (y1 - y3)) / denominator
+            tb = ((y1 - y2) * (x1 - x3) + (x2 - x1) * (y1 - y3)) / denominator
+        # parallel lines give inf/nan, which fail every comparison below
+        hit = (denominator != 0) & (0 <= ta) & (ta <= 1) & (0 <= tb) & (tb <= 1)
+        ray_length = np.hypot(x2 - x1, y2 - y1)
+        distances = np.where(hit, ta * ray_length, max_distance)
+        return np.min(distances, axis=1, initial=max_distance)
+
+    @staticmethod
+    def rays_circles_min_distance(origins: np.ndarray, ends: np.ndarray, centers: np.ndarray, radii: np.ndarray, max_distance: float, candidates: np.ndarray = None) -> np.ndarray:
+        """Vectorized `line_segment_circle_intersect` of every ray against every circle.
+
+        Like the scalar version the ray is treated as an infinite line and the near intersection
+        is kept, so callers narrow the pairs down with the optional (R, C) `candidates` mask.
+        Returns for each ray the distance to the nearest such intersection, or max_distance.
+        """
+        x1 = origins[:, 0, None]
+        y1 = origins[:, 1, None]
+        dx = ends[:, 0, None] - x1
+        dy = ends[:, 1, None] - y1
+        xc = centers[:, 0]
+        yc = centers[:, 1]
+        a = dx ** 2 + dy ** 2
+        b = 2 * (dx * (x1 - xc) + dy * (y1 - yc))
+        c = (x1 - xc) ** 2 + (y1 - yc) ** 2 - radii ** 2
+        discriminant = b ** 2 - 4 * a * c
+        hit = discriminant >= 0
+        if candidates is not None:
+            hit &= candidates
+        with np.errstate(invalid='ignore'):
+            t = (-b - np.sqrt(discriminant)) / (2 * a)
+        distances = np.where(hit, np.abs(t) * np.sqrt(a), max_distance)
+        return np.min(distances, axis=1, initial=max_distance)
+
+    @staticmethod
+    def rays_bboxes_overlap(origins: np.ndarray, ends: np.ndarray, bboxes: np.ndarray) -> np.ndarray:
+        """(R, B) mask of `is_bbox_overlap` between the bounding box of each ray and each (x, y, w, h) bbox."""
+        ray_min = np.minimum(origins, ends)
+        ray_max = np.maximum(origins, ends)
+        x, y, w, h = bboxes.T
+        return ~(
+            (ray_max[:, 0, None] < x) | (x + w < ray_min[:, 0, None])
+            | (ray_max[:, 1, None] < y) | (y + h < ray_min[:, 1, None])
+        )
+
     @staticmethod
     def line_segment_intersect(p1: Point2D, p2: Point2D, p3: Point2D, p4: Point2D) -> Union[None, Point2D]:
         # ref: http://www.cs.swan.ac.uk/~cssimon/line_intersection.html
@@ -90,4 +155,64 @@ class Geom:
 
         # check corner
         corner_distance_sq = (dx - rect_half_width) ** 2 + (dy - rect_half_height) ** 2
-        return corner_distance_sq <= circle_radius ** 2
\ No newline at end of file
+        return corner_distance_sq <= circle_radius ** 2
+
+    @staticmethod
+    def line_slab_interval(p: float, u: float, lo: float, hi: float) -> Union[None, Tuple[float, float]]:
+        # values of s for which lo <= p + s * u <= hi
+        if u == 0:
+            return (-math.inf, math.inf) if lo <= p <= hi else None
+        s1 = (lo - p) / u
+        s2 = (hi - p) / u
+        return (s1, s2) if s1 <= s2 else (s2, s1)
+
+    @staticmethod
+    def line_box_interval(p: Point2D, u: Point2D, lo: Point2D, hi: Point2D) -> Union[None, Tuple[float, float]]:
+        # values of s for which p + s * u lies inside the closed box [lo, hi]
+        x_interval = Geom.line_slab_interval(p[0], u[0], lo[0], hi[0])
+        y_interval = Geom.line_slab_interval(p[1], u[1], lo[1], hi[1])
+        if x_interval is None or y_interval is None:
+            return None
+        s_in = max(x_interval[0], y_interval[0])
+        s_out = min(x_interval[1], y_interval[1])
+        return (s_in, s_out) if s_in <= s_out else None
+
+    @staticmethod
+    def line_circle_interval(p: Point2D, u: Point2D, center: Point2D, radius: float) -> Union[None, Tuple[float, float]]:
+        # values of s for which p + s * u lies inside the closed circle
+        ox = p[0] - center[0]
+        oy = p[1] - center[1]
+        a = u[0] * u[0] + u[1] * u[1]
+        if a == 0:
+            return (-math.inf, math.inf) if ox * ox + oy * oy <= radius * radius else None
+        b = ox * u[0] + oy * u[1]
+        c = ox * ox + oy * oy - radius * radius
+        disc = b * b - a * c
+        if disc < 0:
+            return None
+        sq = math.sqrt(disc)
+        return ((-b - sq) / a, (-b + sq) / a)
+
+    @staticmethod
+    def moving_circle_rect_interval(circle_center: Point2D, circle_radius: float, direction: Point2D, rect_center: Point2D, rect_width: float, rect_height: float) -> Union[None, Tuple[float, float]]:
+        """Values of s for which the circle moved to circle_center + s * direction intersects the rect.
+
+        Same closed test as `is_circle_rect_intersect`: the rect grown by the radius is the union of
+        two boxes and four corner circles, and the line meets that convex shape in a single interval.
+        """
+        hw = 0.5 * rect_width
+        hh = 0.5 * rect_height
+        r = circle_radius
+        cx, cy = rect_center
+        if Geom.line_box_interval(circle_center, direction, (cx - hw - r, cy - hh - r), (cx + hw + r, cy + hh + r)) is None:
+            return None
+        pieces = [
+            Geom.line_box_interval(circle_center, direction, (cx - hw - r, cy - hh), (cx + hw + r, cy + hh)),
+            Geom.line_box_interval(circle_center, direction, (cx - hw, cy - hh - r), (cx + hw, cy + hh + r)),
+        ]
+        for corner in ((cx - hw, cy - hh), (cx + hw, cy - hh), (cx + hw, cy + hh), (cx - hw, cy + hh)):
+            pieces.append(Geom.line_circle_interval(circle_center, direction, corner, r))
+        pieces = [piece for piece in pieces if piece is not None]
+        if not pieces:
+            return None
+        return (min(piece[0] for piece in pieces), max(piece[1] for piece in pieces))
@@ -1,10 +1,23 @@
 import os
 
+PYSIMBOTLIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAPS_DIR = os.path.join(PYSIMBOTLIB_DIR, 'maps')
+# compiled map geometry, see Map.load_compiled_map; kept in the user's cache, not in the package
+MAP_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'pysimbot', 'maps'
+)
+THEMES_DIR = os.path.join(PYSIMBOTLIB_DIR, 'themes')
+
 ROBOT_DISTANCE_ANGLES = list(range(0, 360, 45))
 ROBOT_MAX_SENSOR_DISTANCE = 100
 ROBOT_DEFAULT_START_POS = (20, 560)
+ROBOT_SIZE = (20, 20)
+
+SENSOR_CACHE_SIZE = 4096
+SPATIAL_GRID_CELL_SIZE = 50
 
 OBJECTIVE_DEFAULT_START_POS = (500, 50)
+OBJECTIVE_SIZE = (20, 20)
 
 SIMBOTMAP_SIZE = (700, 600)
 SIMBOTMAP_BOUNDING_LINES = (
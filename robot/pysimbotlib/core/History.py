@@ -0,0 +1,154 @@
+#!/usr/bin/python3
+import json
+import os
+import struct
+
+import numpy as np
+
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# file layout, little-endian:
+#   magic b"PSHI" | version uint16 | header length uint32 | JSON header | blocks
+# every block is a uint32 row count followed by each column's raw values, in column order
+MAGIC = b"PSHI"
+VERSION = 1
+HISTORY_BUFFER_ROWS = 4096
+
+_PREFIX = struct.Struct("<4sHI")
+_BLOCK_ROWS = struct.Struct("<I")
+
+DISTANCE_COLUMNS = tuple(f"ir{i}" for i in range(8))
+COLUMNS = (
+    ("tick", "<i4"),
+    ("robot", "<i4"),
+    *((name, "<f4") for name in DISTANCE_COLUMNS),
+    ("angle", "<f4"),
+    ("turn", "<f4"),
+    ("move", "<f4"),
+)
+
+
+class HistoryRecorder:
+    """Appends history rows into preallocated column buffers and writes them as blocks.
+
+    A row is (tick, robot index, ir0..ir7, angle, turn, move). Rows are flushed to the
+    shard every `buffer_rows` rows and on `close`, so memory stays bounded however long
+    the recording runs. Read a shard back with `iter_history_blocks` or `read_history`.
+    """
+
+    def __init__(self, path: str, buffer_rows: int = HISTORY_BUFFER_ROWS):
+        self.path = path
+        self.rows_written = 0
+        self._columns = {
+            name: np.empty(buffer_rows, dtype=dtype) for name, dtype in COLUMNS if name not in DISTANCE_COLUMNS
+        }
+        # ir0..ir7 are kept as the columns of one (buffer_rows, 8) array
+        self._distances = np.empty((buffer_rows, len(DISTANCE_COLUMNS)), dtype=np.float32)
+        self._size = 0
+        self._file = open(path, "wb")
+        body = json.dumps({"columns": [list(column) for column in COLUMNS]}).encode("utf-8")
+        self._file.write(_PREFIX.pack(MAGIC, VERSION, len(body)) + body)
+
+    def __len__(self) -> int:
+        return self.rows_written + self._size
+
+    def append(self, tick: int, robot: int, distances: Sequence[float], angle: float, turn: float, move: float) -> None:
+        if self._size == len(self._distances):
+            self.flush()
+        i = self._size
+        columns = self._columns
+        columns["tick"][i] = tick
+        columns["robot"][i] = robot
+        self._distances[i] = distances
+        columns["angle"][i] = angle
+        columns["turn"][i] = turn
+        columns["move"][i] = move
+        self._size += 1
+
+    def extend(self, ticks, robots, distances: np.ndarray, angles, turns, moves) -> None:
+        """Append many rows at once; distances is (n, 8), the others are (n,) or scalars."""
+        n = len(distances)
+        columns = [
+            (self._columns[name], np.asarray(values))
+            for name, values in (("tick", ticks), ("robot", robots), ("angle", angles), ("turn", turns), ("move", moves))
+        ]
+        start = 0
+        while start < n:
+            if self._size == len(self._distances):
+                self.flush()
+            count = min(n - start, len(self._distances) - self._size)
+            rows = slice(self._size, self._size + count)
+            part = slice(start, start + count)
+            for column, values in columns:
+                column[rows] = values if values.ndim == 0 else values[part]
+            self._distances[rows] = distances[part]
+            self._size += count
+            start += count
+
+    def flush(self) -> None:
+        if not self._size:
+            return
+        n = self._size
+        self._file.write(_BLOCK_ROWS.pack(n))
+        for name, _ in COLUMNS:
+            if name in DISTANCE_COLUMNS:
+                values = self._distances[:n, DISTANCE_COLUMNS.index(name)]
+            else:
+                values = self._columns[name][:n]
+            self._file.write(values.tobytes())
+        self._file.flush()
+        self.rows_written += n
+        self._size = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def _read_header(file, path: str) -> List[Tuple[str, np.dtype]]:
+    prefix = file.read(_PREFIX.size)
+    if len(prefix) < _PREFIX.size:
+        raise ValueError(f"{path} is not a history shard")
+    magic, version, length = _PREFIX.unpack(prefix)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a history shard")
+    if version != VERSION:
+        raise ValueError(f"{path} has history format version {version}, expected {VERSION}")
+    return [(name, np.dtype(dtype)) for name, dtype in json.loads(file.read(length).decode("utf-8"))["columns"]]
+
+
+def count_history_rows(path: str) -> int:
+    """Rows in a history shard, skipping over the column data."""
+    rows = 0
+    with open(path, "rb") as file:
+        row_size = sum(dtype.itemsize for _, dtype in _read_header(file, path))
+        while True:
+            count = file.read(_BLOCK_ROWS.size)
+            if not count:
+                return rows
+            (n,) = _BLOCK_ROWS.unpack(count)
+            rows += n
+            file.seek(n * row_size, os.SEEK_CUR)
+
+
+def iter_history_blocks(path: str) -> Iterator[Dict[str, np.ndarray]]:
+    """The columns of a history shard, one written block at a time."""
+    with open(path, "rb") as file:
+        columns = _read_header(file, path)
+        while True:
+            count = file.read(_BLOCK_ROWS.size)
+            if not count:
+                return
+            (n,) = _BLOCK_ROWS.unpack(count)
+            yield {name: np.frombuffer(file.read(n * dtype.itemsize), dtype=dtype) for name, dtype in columns}
+
+
+def read_history(path: str) -> Dict[str, np.ndarray]:
+    """Every row of a history shard, by column."""
+    blocks = list(iter_history_blocks(path))
+    return {
+        name: np.concatenate([block[name] for block in blocks]) if blocks else np.empty(0, dtype=dtype)
+        for name, dtype in COLUMNS
+    }
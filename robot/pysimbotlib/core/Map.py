@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+import hashlib
+import logging
+import os
+import json
+import re
+import struct
+
+import numpy as np
+
+from dataclasses import dataclass
+from itertools import chain
+from typing import List, Optional, Sequence, Tuple
+
+from .Geom import Geom
+from .Obstacle import Obstacle
+from .Global import MAPS_DIR, MAP_CACHE_DIR, SIMBOTMAP_SIZE, SPATIAL_GRID_CELL_SIZE
+
+Logger = logging.getLogger('kivy')
+
+# compiled map layout, little-endian:
+#   magic b"PSMC" | version uint16 | header length uint32 | JSON header | arrays
+# the JSON header holds the source hash, the arena and cell sizes and the row count of each array;
+# bboxes and segments follow as float64 (n, 4), then cell_ranges as int64 (n, 4)
+COMPILED_MAP_MAGIC = b"PSMC"
+COMPILED_MAP_VERSION = 2
+
+_PREFIX = struct.Struct("<4sHI")
+_ARRAYS = (("bboxes", np.dtype("<f8")), ("segments", np.dtype("<f8")), ("cell_ranges", np.dtype("<i8")))
+
+_RULE_RE = re.compile(r'^<(\w+)>\s*:')
+_VALUE_RE = re.compile(r'^(pos|size)\s*:\s*([-\d.]+)\s*,\s*([-\d.]+)$')
+
+def map_file_path(map_name: str) -> str:
+    """Path of a map in MAPS_DIR, or map_name itself when it is the path of a .kv file."""
+    if map_name.endswith('.kv'):
+        map_file_name = map_name
+    else:
+        map_file_name = os.path.join(MAPS_DIR, "%s.kv" % map_name)
+    if not os.path.exists(map_file_name):
+        raise FileNotFoundError("File [%s] is not found." % map_file_name)
+    return map_file_name
+
+def parse_obstacle_bboxes(kv_source: str) -> List[Tuple[float, float, float, float]]:
+    """Read the (x, y, w, h) of every `Obstacle:` under the `<ObstacleWrapper>` rule of a map file.
+
+    Only the subset of the kv language used by the map files is understood, which keeps
+    map loading independent of Kivy's Builder.
+    """
+    bboxes = []
+    in_wrapper = False
+    current = None
+    for raw_line in kv_source.splitlines():
+        line = raw_line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        rule = _RULE_RE.match(line)
+        if rule:
+            in_wrapper = rule.group(1) == 'ObstacleWrapper'
+            continue
+        if not in_wrapper:
+            continue
+        if line == 'Obstacle:':
+            current = {'pos': (0, 0), 'size': (100, 100)}
+            bboxes.append(current)
+            continue
+        value = _VALUE_RE.match(line)
+        if value and current is not None:
+            current[value.group(1)] = (float(value.group(2)), float(value.group(3)))
+    return [(*b['pos'], *b['size']) for b in bboxes]
+
+def arena_bounding_lines(arena_size: Sequence[float]) -> Tuple[Geom.Line, ...]:
+    """The four walls of an arena, in the order of SIMBOTMAP_BOUNDING_LINES."""
+    return tuple(Geom.all_bounding_lines_generator(((0, 0, arena_size[0], arena_size[1]),)))
+
+@dataclass
+class CompiledMap:
+    """Obstacle geometry of a map file, precomputed for the simulation core.
+
+    bboxes is (n, 4) (x, y, w, h) per obstacle, segments the (m, 4) map walls and obstacle
+    edges as `Simbot.obstacle_segments` builds them for arena_size, and cell_ranges the
+    (n, 4) `SpatialGrid` cell range of every obstacle for cell_size.
+    """
+    source_hash: str
+    arena_size: Tuple[float, float]
+    cell_size: float
+    bboxes: np.ndarray
+    segments: np.ndarray
+    cell_ranges: np.ndarray
+
+    def obstacles(self) -> List[Obstacle]:
+        return [Obstacle(pos=(x, y), size=(w, h)) for x, y, w, h in self.bboxes.tolist()]
+
+def compile_map(
+    kv_source: str,
+    cell_size: float = SPATIAL_GRID_CELL_SIZE,
+    arena_size: Tuple[float, float] = SIMBOTMAP_SIZE,
+) -> CompiledMap:
+    bbox_list = parse_obstacle_bboxes(kv_source)
+    bboxes = np.array(bbox_list, dtype=float).reshape(-1, 4)
+    segments = Geom.segments_array(chain(arena_bounding_lines(arena_size), Geom.all_bounding_lines_generator(bbox_list)))
+    cell_ranges = np.floor(
+        np.column_stack((bboxes[:, :2], bboxes[:, :2] + bboxes[:, 2:])) / cell_size
+    ).astype(np.int64)
+    return CompiledMap(
+        source_hash=hashlib.sha256(kv_source.encode('utf-8')).hexdigest(),
+        arena_size=tuple(arena_size),
+        cell_size=cell_size,
+        bboxes=bboxes,
+        segments=segments,
+        cell_ranges=cell_ranges,
+    )
+
+def write_compiled_map(compiled: CompiledMap, path: str) -> None:
+    header = {"source_hash": compiled.source_hash, "arena_size": list(compiled.arena_size), "cell_size": compiled.cell_size}
+    header.update({name: len(getattr(compiled, name)) for name, _ in _ARRAYS})
+    body = json.dumps(header).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(_PREFIX.pack(COMPILED_MAP_MAGIC, COMPILED_MAP_VERSION, len(body)) + body)
+        for name, dtype in _ARRAYS:
+            f.write(np.ascontiguousarray(getattr(compiled, name), dtype=dtype).tobytes())
+
+def read_compiled_map(path: str) -> CompiledMap:
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _PREFIX.size:
+        raise ValueError("%s is not a compiled map" % path)
+    magic, version, length = _PREFIX.unpack_from(data)
+    if magic != COMPILED_MAP_MAGIC:
+        raise ValueError("%s is not a compiled map" % path)
+    if version != COMPILED_MAP_VERSION:
+        raise ValueError("%s has compiled map version %d, expected %d" % (path, version, COMPILED_MAP_VERSION))
+    offset = _PREFIX.size + length
+    header = json.loads(data[_PREFIX.size:offset].decode("utf-8"))
+    arrays = {}
+    for name, dtype in _ARRAYS:
+        count = header[name] * 4
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(-1, 4)
+        offset += count * dtype.itemsize
+    return CompiledMap(header["source_hash"], tuple(header["arena_size"]), header["cell_size"], **arrays)
+
+def compiled_map_path(
+    map_file: str,
+    cell_size: float,
+    arena_size: Tuple[float, float],
+    cache_dir: str = MAP_CACHE_DIR,
+) -> str:
+    """Cache file of a map file, one per map file, arena size and cell size.
+
+    A changed map overwrites its own cache file, so the cache grows only with new maps.
+    """
+    name = os.path.splitext(os.path.basename(map_file))[0]
+    path_hash = hashlib.sha256(os.path.abspath(map_file).encode('utf-8')).hexdigest()
+    return os.path.join(
+        cache_dir, "%s-%s-%gx%g-%g.psmc" % (name, path_hash[:16], arena_size[0], arena_size[1], cell_size)
+    )
+
+def load_compiled_map(
+    map_name: str,
+    cell_size: float = SPATIAL_GRID_CELL_SIZE,
+    arena_size: Tuple[float, float] = SIMBOTMAP_SIZE,
+    cache_dir: Optional[str] = MAP_CACHE_DIR,
+) -> CompiledMap:
+    """The compiled geometry of a map, read from cache_dir when the map file is unchanged.
+
+    Cache files hold the hash of the map file, so editing a map recompiles it. A cache_dir
+    of None always compiles, and a cache file that cannot be read or written only costs a
+    compile.
+    """
+    map_file = map_file_path(map_name)
+    with open(map_file, 'rb') as f:
+        kv_bytes = f.read()
+    if cache_dir is None:
+        return compile_map(kv_bytes.decode('utf-8'), cell_size, arena_size)
+    source_hash = hashlib.sha256(kv_bytes).hexdigest()
+    path = compiled_map_path(map_file, cell_size, arena_size, cache_dir)
+    try:
+        compiled = read_compiled_map(path)
+        if compiled.source_hash == source_hash:
+            return compiled
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        Logger.debug('Map: ignoring compiled map %s: %s', path, e)
+
+    compiled = compile_map(kv_bytes.decode('utf-8'), cell_size, arena_size)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary = "%s.%d.tmp" % (path, os.getpid())
+        write_compiled_map(compiled, temporary)
+        os.replace(temporary, path)
+    except OSError as e:
+        Logger.debug('Map: cannot cache compiled map %s: %s', map_name, e)
+    return compiled
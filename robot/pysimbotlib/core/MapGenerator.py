@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+import math
+import os
+
+import numpy as np
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .Geom import Geom
+from .Global import OBJECTIVE_DEFAULT_START_POS, OBJECTIVE_SIZE, ROBOT_DEFAULT_START_POS, ROBOT_SIZE, SIMBOTMAP_SIZE
+
+# free space kept between two obstacles, and half of it between an obstacle and a wall
+GENERATED_MAP_GAP = 2 * ROBOT_SIZE[0]
+GENERATED_MAP_FILL = 0.5
+GENERATED_OBSTACLE_SIZE = (2, 200)
+GENERATED_WALL_FRACTION = 0.5
+
+def _cell_pitch(num_obstacles: int, arena_size: Sequence[float], fill: float) -> int:
+    return math.floor(math.sqrt(arena_size[0] * arena_size[1] * fill / num_obstacles))
+
+def _overlaps(cells: np.ndarray, pitch: int, boxes: Sequence[Geom.BBox]) -> np.ndarray:
+    overlap = np.zeros(len(cells), dtype=bool)
+    for x, y, w, h in boxes:
+        overlap |= (
+            (cells[:, 0] < x + w) & (cells[:, 0] + pitch > x)
+            & (cells[:, 1] < y + h) & (cells[:, 1] + pitch > y)
+        )
+    return overlap
+
+def generate_obstacles(
+    num_obstacles: int,
+    arena_size: Tuple[float, float] = SIMBOTMAP_SIZE,
+    seed: Optional[int] = None,
+    gap: int = GENERATED_MAP_GAP,
+    fill: float = GENERATED_MAP_FILL,
+    obstacle_size: Tuple[int, int] = GENERATED_OBSTACLE_SIZE,
+    wall_fraction: float = GENERATED_WALL_FRACTION,
+    keep_clear: Iterable[Geom.BBox] = (
+        (*ROBOT_DEFAULT_START_POS, *ROBOT_SIZE),
+        (*OBJECTIVE_DEFAULT_START_POS, *OBJECTIVE_SIZE),
+    ),
+) -> List[Geom.BBox]:
+    """The (x, y, w, h) of num_obstacles obstacles scattered over the arena, the same for the same seed.
+
+    The arena is cut into square cells and about a `fill` share of them get one obstacle
+    each, placed inside the cell with gap / 2 to spare on every side, so any two
+    obstacles are at least gap apart and robots can always pass between them. Cells
+    within gap of a keep_clear box, the default robot and objective spawn points, stay
+    empty. A `wall_fraction` of the obstacles are 1 unit thick walls like those of the
+    hand-made maps, the others solid blocks. Obstacle sizes run from obstacle_size[0]
+    up to obstacle_size[1] or the space left in a cell, whichever is smaller.
+    """
+    if num_obstacles < 0:
+        raise ValueError("num_obstacles must not be negative.")
+    if not 0 < fill <= 1:
+        raise ValueError("fill must be in (0, 1].")
+    if num_obstacles == 0:
+        return []
+    min_size, max_size = obstacle_size
+    clear_boxes = [(x - gap, y - gap, w + 2 * gap, h + 2 * gap) for x, y, w, h in keep_clear]
+
+    # the largest cells, starting from the fill share, that still leave room for every obstacle
+    pitch = _cell_pitch(num_obstacles, arena_size, fill)
+    while True:
+        if pitch - gap < min_size:
+            raise ValueError(
+                "Arena %g x %g is too small for %d obstacles %d apart."
+                % (arena_size[0], arena_size[1], num_obstacles, gap)
+            )
+        columns, rows = int(arena_size[0] // pitch), int(arena_size[1] // pitch)
+        origin = ((arena_size[0] - columns * pitch) // 2, (arena_size[1] - rows * pitch) // 2)
+        iy, ix = np.divmod(np.arange(columns * rows), columns)
+        cells = np.column_stack((origin[0] + ix * pitch, origin[1] + iy * pitch))
+        cells = cells[~_overlaps(cells, pitch, clear_boxes)]
+        if len(cells) >= num_obstacles:
+            break
+        pitch -= 1
+
+    rng = np.random.default_rng(seed)
+    cells = cells[np.sort(rng.choice(len(cells), num_obstacles, replace=False))]
+    extent = min(pitch - gap, max_size)
+
+    sizes = rng.integers(min_size, extent + 1, size=(num_obstacles, 2))
+    walls = rng.random(num_obstacles) < wall_fraction
+    lengths = rng.integers(math.ceil(extent / 2), extent + 1, size=num_obstacles)
+    horizontal = rng.random(num_obstacles) < 0.5
+    sizes[walls & horizontal] = np.column_stack((lengths, np.ones_like(lengths)))[walls & horizontal]
+    sizes[walls & ~horizontal] = np.column_stack((np.ones_like(lengths), lengths))[walls & ~horizontal]
+
+    offsets = (rng.random((num_obstacles, 2)) * (extent - sizes + 1)).astype(np.int64)
+    positions = cells + gap // 2 + offsets
+    return [tuple(bbox) for bbox in np.column_stack((positions, sizes)).tolist()]
+
+def map_source(bboxes: Iterable[Geom.BBox], arena_size: Tuple[float, float] = SIMBOTMAP_SIZE, note: str = '') -> str:
+    """A map file holding the obstacles, in the subset of the kv language `parse_obstacle_bboxes` reads."""
+    lines = [
+        '#:kivy 1.0.9',
+        '',
+        '<ObstacleWrapper>:',
+        '    # Playground size is %g, %g; load it with Simbot(arena_size=(%g, %g))' % (*arena_size, *arena_size),
+    ]
+    if note:
+        lines.append('    # %s' % note)
+    for x, y, w, h in bboxes:
+        lines += ['', '    Obstacle:', '        pos: %g, %g' % (x, y), '        size: %g, %g' % (w, h)]
+    lines += ['', '<ObjectiveWrapper>:', '']
+    return '\n'.join(lines)
+
+def generate_map(
+    path: str,
+    num_obstacles: int,
+    arena_size: Tuple[float, float] = SIMBOTMAP_SIZE,
+    seed: Optional[int] = None,
+    **kwargs,
+) -> str:
+    """Write a generated map to path, a .kv file that `Simbot(map=path)` loads. Returns path.
+
+    Keyword arguments are passed on to `generate_obstacles`.
+    """
+    if not path.endswith('.kv'):
+        raise ValueError("Map files must end with .kv, got %s" % path)
+    bboxes = generate_obstacles(num_obstacles, arena_size, seed, **kwargs)
+    source = map_source(bboxes, arena_size, 'Generated: %d obstacles, seed %s' % (num_obstacles, seed))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(source)
+    return path
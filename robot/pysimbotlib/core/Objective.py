@@ -1,12 +1,12 @@
 #!/usr/bin/python3
-from kivy.uix.widget import Widget
-from kivy.logger import Logger
-from typing import Sequence
+from .Body import Body
+from .Global import OBJECTIVE_SIZE
 
-class Objective(Widget):
-    pass
+class Objective(Body):
+    default_size = OBJECTIVE_SIZE
 
-class ObjectiveWrapper(Widget):
+    _sm = None
 
-    def get_objectives(self) -> Sequence[Objective]:
-        return [obj for obj in self.children if isinstance(obj, Objective)]
\ No newline at end of file
+    def _on_geometry_changed(self) -> None:
+        if self._sm is not None:
+            self._sm.on_objective_moved(self)
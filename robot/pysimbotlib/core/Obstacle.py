@@ -1,11 +1,10 @@
 #!/usr/bin/python3
-from kivy.uix.widget import Widget
-from typing import Generator
+from .Body import Body
 
-class Obstacle(Widget):
-    pass
+class Obstacle(Body):
 
-class ObstacleWrapper(Widget):
+    _sm = None
 
-    def get_obstacles(self) -> Generator[Obstacle, None, None]:
-        return (obstacle for obstacle in self.children if isinstance(obstacle, Obstacle))
\ No newline at end of file
+    def _on_geometry_changed(self) -> None:
+        if self._sm is not None:
+            self._sm.on_obstacles_changed()
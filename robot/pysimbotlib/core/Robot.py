@@ -1,96 +1,89 @@
 #!/usr/bin/python3
 
 import math
+import logging
+import numpy as np
 
-from itertools import chain
-from functools import cache
-from typing import Generator, Iterable, Sequence, Union
-
-from kivy.uix.widget import Widget
-from kivy.properties import NumericProperty, ReferenceListProperty
-from kivy.logger import Logger
+from typing import Iterable, Sequence, Tuple, Union
 
+from .Body import Body
 from .Obstacle import Obstacle
 from .Objective import Objective
 from .Geom import Geom
-from .Global import SIMBOTMAP_SIZE, SIMBOTMAP_BOUNDING_LINES, ROBOT_DISTANCE_ANGLES, ROBOT_MAX_SENSOR_DISTANCE
+from .Global import SIMBOTMAP_SIZE, ROBOT_DISTANCE_ANGLES, ROBOT_MAX_SENSOR_DISTANCE, ROBOT_SIZE
+
+Logger = logging.getLogger('kivy')
+
+class Robot(Body):
 
-class Robot(Widget):
+    default_size = ROBOT_SIZE
 
     # Facing 0 degree direction
     _sm = None
-    _direction = NumericProperty(0)
-    
-    _color_r = NumericProperty(0)
-    _color_g = NumericProperty(0)
-    _color_b = NumericProperty(0)
-    _color_a = NumericProperty(0)
-
-    color = ReferenceListProperty(_color_r, _color_g, _color_b, _color_a)
-    
+    _direction: float = 0
+
+    # None keeps the color given by the theme when a front end is attached
+    color: Tuple[float, float, float, float] = None
+
     eat_count: int = 0
     collision_count: int = 0
     just_eat: bool = False
     stuck: bool = False
     just_hit: bool = False
     collision: bool = False
-
-    @cache
-    def get_obstacles_bboxes(self) -> Generator[Geom.BBox, None, None]:
-        return tuple((obs.x, obs.y, obs.width, obs.height) for obs in self._sm.obstacles)
-
-    @staticmethod
-    def distance_to_line_generators(sensor_coor: Geom.Point2D, sensor_coverage_coor: Geom.Point2D, bounding_lines) -> Generator[float, None, None]:
-        for line in bounding_lines:
-            intersection = Geom.line_segment_intersect(sensor_coor, sensor_coverage_coor, line[0], line[1])
-            yield (Geom.distance(sensor_coor, intersection) if intersection else ROBOT_MAX_SENSOR_DISTANCE)
-
-    @staticmethod
-    def distance_to_robot_generators(sensor_coor: Geom.Point2D, sensor_coverage_coor: Geom.Point2D, robots) -> Generator[float, None, None]:
-        for r in robots:
-            intersection = Geom.line_segment_circle_intersect(sensor_coor, sensor_coverage_coor, r.center, 0.5 * r.width)
-            near_intersection = intersection[0]
-            yield (Geom.distance(sensor_coor, near_intersection) if near_intersection else ROBOT_MAX_SENSOR_DISTANCE)
-        yield ROBOT_MAX_SENSOR_DISTANCE
-
-    @staticmethod
-    @cache
-    def _min_distance_to_wall_or_obstacle(obstacle_bboxes: Iterable[Geom.BBox], sensor_coor: Geom.Point2D, sensor_coverage_coor: Geom.Point2D) -> float:
-        obstacle_bounding_lines: Generator[Geom.Line] = (line for line in Geom.all_bounding_lines_generator(obstacle_bboxes))
-        min_distance_to_wall_or_obs = min(Robot.distance_to_line_generators(sensor_coor, sensor_coverage_coor, chain(SIMBOTMAP_BOUNDING_LINES, obstacle_bounding_lines)))
-        return min_distance_to_wall_or_obs
-
-    def _distance(self, angle: float) -> float:
-        rad_angle = math.radians(-(self._direction+angle))
-        unit_x = math.cos(rad_angle)
-        unit_y = math.sin(rad_angle)
-
-        # Point2D that represents sensor coordinate. It must be located at the robot edge.
-        sensor_coor = (
-            self.center_x + 0.5 * self.width * unit_x, 
-            self.center_y + 0.5 * self.height * unit_y,
-        )
-
-        # Point2D that represents coordinates that sensor can be reached. It is outside the robot.
-        sensor_coverage_coor = (
-            sensor_coor[0] + unit_x * ROBOT_MAX_SENSOR_DISTANCE, 
-            sensor_coor[1] + unit_y * ROBOT_MAX_SENSOR_DISTANCE,
-        )
-
-        obstacle_bboxes = self.get_obstacles_bboxes()
-        min_distance_to_wall_and_obs = Robot._min_distance_to_wall_or_obstacle(obstacle_bboxes, sensor_coor, sensor_coverage_coor)
-        
+    # degrees turned and steps moved in the current tick's update
+    tick_turn: float = 0
+    tick_move: float = 0
+
+    # counts moves and turns, see sense_stamp
+    _pose_version: int = 0
+    # position in the Simbot's robots, -1 until it is spawned
+    _index: int = -1
+    # (stamp, distances, smell) of the last sensor_snapshot
+    _snapshot = None
+
+    def _on_geometry_changed(self) -> None:
+        self._pose_version += 1
+        if self._sm is not None:
+            self._sm.on_robot_moved(self)
+
+    def _sensor_rays(self, angles: Sequence[float], pose: Tuple[float, float, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        x, y, direction = pose if pose is not None else (self._x, self._y, self._direction)
+        rad_angles = np.radians(-(direction + np.asarray(angles, dtype=float)))
+        unit = np.stack((np.cos(rad_angles), np.sin(rad_angles)), axis=1)
+
+        # Points that represent sensor coordinates. They must be located at the robot edge.
+        half_size = 0.5 * np.array(self.size)
+        sensor_coors = (x, y) + half_size + half_size * unit
+
+        # Points that represent coordinates that sensors can reach. They are outside the robot.
+        sensor_coverage_coors = sensor_coors + unit * ROBOT_MAX_SENSOR_DISTANCE
+        return sensor_coors, sensor_coverage_coors
+
+    def _wall_and_obstacle_distances(self) -> np.ndarray:
+        # read-only, it may be shared through the sensor cache
+        cache = self._sm.sensor_cache
+        pose = cache.snap_pose(self._x, self._y, self._direction)
+        distances = cache.get(pose)
+        if distances is None:
+            sensor_coors, sensor_coverage_coors = self._sensor_rays(ROBOT_DISTANCE_ANGLES, pose)
+            distances = Geom.rays_segments_min_distance(sensor_coors, sensor_coverage_coors, self._sm.obstacle_segments, ROBOT_MAX_SENSOR_DISTANCE)
+            cache.put(pose, distances)
+        return distances
+
+    def _robot_distances(self, sensor_coors: np.ndarray, sensor_coverage_coors: np.ndarray) -> np.ndarray:
+        owners = np.full(len(sensor_coors), self._index)
+        return self._sm.rays_min_distance_to_robots(sensor_coors, sensor_coverage_coors, owners)
+
+    def _distances(self) -> np.ndarray:
+        distances = self._wall_and_obstacle_distances()
         if self._sm.robot_see_each_other:
-            x = min(sensor_coor[0], sensor_coverage_coor[0])
-            y = min(sensor_coor[1], sensor_coverage_coor[1])
-            w = abs(sensor_coor[0] - sensor_coverage_coor[0])
-            h = abs(sensor_coor[1] - sensor_coverage_coor[1])
-            ROI = (x, y, w, h)
-            other_robots_in_ROI = (r for r in self._sm._robot_list if r != self and Geom.is_bbox_overlap(ROI, (r.x, r.y, r.width, r.height)))
-            min_distance_to_other_robot = min(Robot.distance_to_robot_generators(sensor_coor, sensor_coverage_coor, other_robots_in_ROI))
-            return min(min_distance_to_wall_and_obs, min_distance_to_other_robot)
-        else:
-            return min_distance_to_wall_and_obs
+            distances = np.minimum(distances, self._robot_distances(*self._sensor_rays(ROBOT_DISTANCE_ANGLES)))
+        return distances
+
+    @property
+    def _arena_size(self) -> Tuple[float, float]:
+        return self._sm.arena_size if self._sm is not None else SIMBOTMAP_SIZE
 
     def _is_robot_inside_map(self, p: Geom.Point2D = None) -> bool:
         if p is None:
@@ -99,10 +92,10 @@ class Robot(Widget):
         robot_radius = 0.5 * self.width
         robot_center = (p[0] + robot_radius, p[1] + robot_radius)
         
-        map_pos = self._sm.pos
-        map_half_width = 0.5 * SIMBOTMAP_SIZE[0]
-        map_half_height = 0.5 * SIMBOTMAP_SIZE[1]
-        map_center = (map_pos[0] + map_half_width, map_pos[1] + map_half_height)
+        arena_size = self._arena_size
+        map_half_width = 0.5 * arena_size[0]
+        map_half_height = 0.5 * arena_size[1]
+        map_center = (map_half_width, map_half_height)
 
         dx = abs(robot_center[0] - map_center[0])
         dy = abs(robot_center[1] - map_center[1])
@@ -112,12 +105,12 @@ class Robot(Widget):
         return True
 
     def _is_robot_collide_obstacles(self, p: Geom.Point2D, obstacles_included: Iterable[Obstacle] = None) -> bool:
-        if obstacles_included is None:
-            obstacles_included = self._sm.obstacles
-
         if p is None:
             p = self.pos
 
+        if obstacles_included is None:
+            obstacles_included = self._sm.obstacles_in((p[0], p[1], self.width, self.height))
+
         robot_radius = 0.5 * self.width
         robot_center = (p[0] + robot_radius, p[1] + robot_radius)
 
@@ -139,7 +132,9 @@ class Robot(Widget):
         robot_radius = 0.5 * self.width
         robot_center = (p[0] + robot_radius, p[1] + robot_radius)
 
-        for r in self._sm._robot_list:
+        reach = 2 * robot_radius
+        nearby = self._sm.robots_in((robot_center[0] - reach, robot_center[1] - reach, 2 * reach, 2 * reach))
+        for r in nearby:
             if r != self and Geom.distance(r.center, robot_center) <= 2 * robot_radius:
                 return True
         
@@ -158,10 +153,72 @@ class Robot(Widget):
         
         return True
 
+    @staticmethod
+    def _travel_before(interval: Tuple[float, float], travel: int) -> int:
+        # shorten travel so that no whole pixel falls inside the closed blocked interval
+        if interval is None:
+            return travel
+        pixel = max(1, math.ceil(interval[0]))
+        return min(travel, pixel - 1) if pixel <= interval[1] else travel
+
+    def _swept_bbox(self, travel: int, dx: float, dy: float, margin: float = 0) -> Geom.BBox:
+        end_x = self.pos[0] + travel * dx
+        end_y = self.pos[1] + travel * dy
+        return (
+            min(self.pos[0], end_x) - margin,
+            min(self.pos[1], end_y) - margin,
+            abs(end_x - self.pos[0]) + self.width + 2 * margin,
+            abs(end_y - self.pos[1]) + self.height + 2 * margin,
+        )
+
+    def _free_travel(self, step: int, dx: float, dy: float) -> int:
+        """Pixels the robot can move along (dx, dy), up to step, before its first invalid position.
+
+        Equivalent to validating every whole-pixel position in turn, but solved analytically:
+        the map bounds allow one closed interval of the path and each obstacle or robot blocks one.
+        """
+        # a robot pressed against something is the common case, one point test settles it
+        if not self._is_valid_position((self.pos[0] + dx, self.pos[1] + dy)):
+            return 0
+
+        robot_radius = 0.5 * self.width
+        center = (self.pos[0] + robot_radius, self.pos[1] + robot_radius)
+        direction = (dx, dy)
+
+        # map bounds, same test as _is_robot_inside_map
+        inside = Geom.line_box_interval(
+            center, direction,
+            (robot_radius, robot_radius),
+            (self._arena_size[0] - robot_radius, self._arena_size[1] - robot_radius),
+        )
+        if inside is None or inside[0] > 1 or inside[1] < 1:
+            return 0
+        travel = min(step, math.floor(inside[1]))
+
+        for obs in self._sm.obstacles_in(self._swept_bbox(travel, dx, dy)):
+            interval = Geom.moving_circle_rect_interval(center, robot_radius, direction, obs.center, obs.width, obs.height)
+            travel = self._travel_before(interval, travel)
+            if travel == 0:
+                return 0
+
+        if self._sm.robot_see_each_other:
+            for r in self._sm.robots_in(self._swept_bbox(travel, dx, dy, robot_radius)):
+                if r != self:
+                    travel = self._travel_before(Geom.line_circle_interval(center, direction, r.center, 2 * robot_radius), travel)
+                    if travel == 0:
+                        return 0
+
+        # settle floating-point ties at the contact boundary with the point test itself
+        while travel > 0 and not self._is_valid_position((self.pos[0] + travel * dx, self.pos[1] + travel * dy)):
+            travel -= 1
+        while travel < step and self._is_valid_position((self.pos[0] + (travel + 1) * dx, self.pos[1] + (travel + 1) * dy)):
+            travel += 1
+        return travel
+
     def _get_overlap_objective(self) -> Union[None, Objective]:
         robot_center = self.center
         robot_radius = 0.5 * self.size[0]
-        for obj in self._sm.objectives:
+        for obj in self._sm.objectives_in((self.x, self.y, self.width, self.height)):
             obj_width, obj_height = obj.size
             obj_center = (obj.pos[0] + 0.5 * obj_width, obj.pos[1] + 0.5 * obj_height)
             if Geom.is_circle_rect_intersect(robot_center, robot_radius, obj_center, obj_width, obj_height):
@@ -169,21 +226,18 @@ class Robot(Widget):
         return None
         
     def set_color(self, r: float, g: float, b: float, a: float=1) -> None:
-        self._color_r = r
-        self._color_g = g
-        self._color_b = b
-        self._color_a = a
+        self.color = (r, g, b, a)
 
     def distance(self, index: int = None) -> Union[Sequence[float], float]:
         if index is None:
-            return tuple(self._distance(angle) for angle in ROBOT_DISTANCE_ANGLES)
+            return tuple(self._distances().tolist())
         if isinstance(index, int):
             if index < 0 or index >= len(ROBOT_DISTANCE_ANGLES):
                 raise ValueError(F"Invalid distance sensor index: {index}. The valid values are between 0 and {len(ROBOT_DISTANCE_ANGLES) - 1}")
             else:
-                return self._distance(ROBOT_DISTANCE_ANGLES[index])
+                return float(self._distances()[index])
 
-    def calc_angle_to_objective(self, obj: Widget) -> float:
+    def calc_angle_to_objective(self, obj: Body) -> float:
         dx = obj.center_x - self.center_x
         dy = obj.center_y - self.center_y
         rad = math.atan2(dy, dx)
@@ -196,14 +250,35 @@ class Robot(Widget):
         return self.calc_angle_to_objective(self._sm.objectives[index])
 
     def smell_nearest(self) -> float:
-        nearest_food = min(self._sm.objectives, key=lambda food: Geom.distance(self.pos, food.pos))
+        nearest_food = self._sm.nearest_objective(self.pos)
         return self.calc_angle_to_objective(nearest_food)
 
+    def sense_stamp(self) -> Tuple[int, int]:
+        """Changes on every simulation tick and whenever the robot moves or turns.
+
+        Sensor readings taken under the same stamp are the same, so they can be reused.
+        """
+        return (self._sm.iteration if self._sm is not None else 0, self._pose_version)
+
+    def sensor_snapshot(self) -> Tuple[Tuple[float, ...], float]:
+        """(distances, smell) as the robot senses them now.
+
+        Read again only when the tick changes, the robot turns or anything in the world moves.
+        """
+        stamp = (self.sense_stamp(), self._sm.world_version)
+        if self._snapshot is None or self._snapshot[0] != stamp:
+            smell = self.smell() if self._sm.objectives else 0.0
+            self._snapshot = (stamp, self.distance(), smell)
+        return self._snapshot[1], self._snapshot[2]
+
     def turn(self, degree: float = 1.0) -> None:
+        self._pose_version += 1
+        self.tick_turn += degree
         self._direction = (self._direction + degree) % 360
         self.stuck = False
 
     def move(self, step: int = 1) -> None:
+        self.tick_move += step
         if step >= 0:
             rad_angle = math.radians(-self._direction)
             step = int(step)
@@ -218,18 +293,14 @@ class Robot(Widget):
         next_position = (self.pos[0] + step * dx, self.pos[1] + step * dy)
         # check if the robot cannot go by longest distance.
         if not self._is_valid_position(next_position):
-            # start from robot position, find the longest distance possible for robot to go.
-            next_position = self.pos
-            for distance in range(0, step, 1):
-                next_position_to_validate = (next_position[0] + dx, next_position[1] + dy)
-                # If can move
-                if not self._is_valid_position(next_position_to_validate):
-                    self.collision_count += 1
-                    self.collision = True
-                    if distance == 0:
-                        self.stuck = True
-                    break
-                next_position = next_position_to_validate
+            # find the longest whole-pixel distance possible for robot to go.
+            distance = self._free_travel(step, dx, dy)
+            next_position = (self.pos[0] + distance * dx, self.pos[1] + distance * dy)
+            if distance < step:
+                self.collision_count += 1
+                self.collision = True
+                if distance == 0:
+                    self.stuck = True
         self.pos = next_position
 
         obj = self._get_overlap_objective()
@@ -243,7 +314,3 @@ class Robot(Widget):
         
     def update(self) -> None:
         pass
-
-class RobotWrapper(Widget):
-    def get_robots(self) -> Generator[Robot, None, None]:
-        return (robot for robot in self.children if isinstance(robot, Robot))
\ No newline at end of file
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+import numpy as np
+
+from .Global import SENSOR_CACHE_SIZE
+
+Pose = Tuple[float, float, float] # (x, y, direction)
+
+class SensorCache:
+    """Size-bounded LRU of wall/obstacle sensor readings keyed by quantized robot pose.
+
+    A resolution of 0 keeps exact keys, so cached readings are identical to fresh ones;
+    a coarser resolution trades accuracy for hits by sensing from the snapped pose.
+    The owner must call `clear()` whenever the obstacle set or the map changes.
+    """
+
+    def __init__(self, maxsize: int = SENSOR_CACHE_SIZE, position_resolution: float = 0, angle_resolution: float = 0):
+        self.maxsize = maxsize
+        self.position_resolution = position_resolution
+        self.angle_resolution = angle_resolution
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _snap(value, resolution):
+        return np.round(value / resolution) * resolution if resolution else value
+
+    def snap_pose(self, x: float, y: float, direction: float) -> Pose:
+        return (
+            float(self._snap(x, self.position_resolution)),
+            float(self._snap(y, self.position_resolution)),
+            float(self._snap(direction, self.angle_resolution)),
+        )
+
+    def snap_poses(self, xs: np.ndarray, ys: np.ndarray, directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            self._snap(xs, self.position_resolution),
+            self._snap(ys, self.position_resolution),
+            self._snap(directions, self.angle_resolution),
+        )
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        value.flags.writeable = False
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
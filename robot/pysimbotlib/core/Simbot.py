@@ -1,58 +1,104 @@
 #!/usr/bin/python3
 
-from kivy.uix.widget import Widget
-from kivy.properties import NumericProperty, ObjectProperty, StringProperty
-from kivy.logger import Logger
-from kivy.core.window import Window
-from kivy.uix.boxlayout import BoxLayout
-
+import logging
 import random
-import csv
-
-from .Obstacle import ObstacleWrapper
-from .Objective import ObjectiveWrapper, Objective
-from .Robot import RobotWrapper
-from .Global import SIMBOTMAP_SIZE
-
-
-class Simbot(BoxLayout):
-
-    _robots = ObjectProperty(None)
-    _obstacles = ObjectProperty(None)
-    _objectives = ObjectProperty(None)
 
-    iteration = NumericProperty(0)
-    max_tick = NumericProperty(0)
-    simulation_count = NumericProperty(0)
-
-    # stats
-    eat_count = NumericProperty(0)
-    food_move_count = NumericProperty(0)
-    score = NumericProperty(0)
-    scoreStr = StringProperty("")
+import numpy as np
+
+from dataclasses import dataclass
+from itertools import chain
+from typing import List, Optional, Tuple
+
+from .Geom import Geom
+from .History import HistoryRecorder, HISTORY_BUFFER_ROWS
+from .Map import CompiledMap, arena_bounding_lines, load_compiled_map
+from .SensorCache import SensorCache
+from .SpatialIndex import SpatialGrid
+from .Obstacle import Obstacle
+from .Objective import Objective
+from .Robot import Robot
+from .Global import (
+    MAP_CACHE_DIR,
+    SIMBOTMAP_SIZE,
+    ROBOT_DEFAULT_START_POS,
+    ROBOT_DISTANCE_ANGLES,
+    ROBOT_MAX_SENSOR_DISTANCE,
+    OBJECTIVE_DEFAULT_START_POS,
+    SENSOR_CACHE_SIZE,
+    SPATIAL_GRID_CELL_SIZE,
+)
+
+Logger = logging.getLogger("kivy")
+
+
+@dataclass
+class EpisodeStats:
+    simulation_count: int
+    ticks: int
+    eat_count: int
+    food_move_count: int
+    score: int
+    robot_eat_counts: Tuple[int, ...]
+    robot_collision_counts: Tuple[int, ...]
+
+
+@dataclass
+class SensorReadings:
+    distances: np.ndarray  # (n_robots, len(ROBOT_DISTANCE_ANGLES))
+    smells: np.ndarray  # (n_robots, n_objectives)
+
+
+class Simbot:
+    """Kivy-free simulation engine. A front end only reads its state, see `View.SimbotView`."""
 
     def __init__(
         self,
-        robot_cls,
-        num_robots,
-        num_objectives,
-        robot_default_start_pos,
-        obj_default_start_pos,
+        robot_cls=Robot,
+        num_robots=1,
+        num_objectives=1,
+        robot_default_start_pos=ROBOT_DEFAULT_START_POS,
+        obj_default_start_pos=OBJECTIVE_DEFAULT_START_POS,
         customfn_create_robots=None,
         customfn_before_simulation=None,
         customfn_after_simulation=None,
         simulation_forever=False,
         food_move_after_eat=True,
         save_wasd_history=False,
+        record_history=False,
+        history_buffer_rows=HISTORY_BUFFER_ROWS,
         robot_see_each_other=False,
-        **kwargs
+        max_tick=4000,
+        map="default",
+        arena_size=SIMBOTMAP_SIZE,
+        sensor_cache_size=SENSOR_CACHE_SIZE,
+        sensor_cache_resolution=(0, 0),
+        spatial_grid_cell_size=SPATIAL_GRID_CELL_SIZE,
+        map_cache_dir=MAP_CACHE_DIR,
     ):
-        super(Simbot, self).__init__(**kwargs)
+        self.iteration = 0
+        self.max_tick = max_tick
+        self.simulation_count = 0
 
-        # initialize obstacles, objectives, and robot wrapper
-        self._obstacles = ObstacleWrapper()
-        self._objectives = ObjectiveWrapper()
-        self._robots = RobotWrapper()
+        # stats
+        self.eat_count = 0
+        self.food_move_count = 0
+        self.score = 0
+        self.scoreStr = ""
+
+        # initialize obstacles, objectives, and robot lists
+        self.sensor_cache = SensorCache(sensor_cache_size, *sensor_cache_resolution)
+        # the walls enclose (0, 0) - arena_size, the map file only holds the obstacles
+        self.arena_size = tuple(arena_size)
+        self.arena_bounding_lines = arena_bounding_lines(self.arena_size)
+        self._obstacle_grid = SpatialGrid(spatial_grid_cell_size, self.arena_size)
+        self._objective_grid = SpatialGrid(spatial_grid_cell_size, self.arena_size)
+        self._robot_grid = SpatialGrid(spatial_grid_cell_size, self.arena_size)
+        self._obstacle_list = []
+        # compiled maps are cached here, None compiles the map on every load
+        self.map_cache_dir = map_cache_dir
+        # bumped whenever a robot, objective or obstacle moves, see Robot.sensor_snapshot
+        self.world_version = 0
+        self.load_map(map)
         self._objective_list = []
         self._robot_list = []
 
@@ -82,6 +128,10 @@ class Simbot(BoxLayout):
         self.simulation_forever = simulation_forever
         self.food_move_after_eat = food_move_after_eat
         self.save_wasd_history = save_wasd_history
+        # record every robot's sensors and its turn/move on every tick, not only WASD key presses
+        self.record_history = record_history
+        self.history_buffer_rows = history_buffer_rows
+        self.history: Optional[HistoryRecorder] = None
         self.robot_see_each_other = robot_see_each_other
 
     @property
@@ -90,11 +140,132 @@ class Simbot(BoxLayout):
 
     @property
     def obstacles(self):
-        return self._obstacles.get_obstacles()
+        return self._obstacle_list
 
     @property
     def objectives(self):
-        return self._objectives.get_objectives()
+        return self._objective_list
+
+    @property
+    def obstacle_bboxes(self) -> Tuple[Geom.BBox, ...]:
+        if self._obstacle_bboxes is None:
+            self._obstacle_bboxes = tuple((obs.x, obs.y, obs.width, obs.height) for obs in self._obstacle_list)
+        return self._obstacle_bboxes
+
+    @property
+    def obstacle_segments(self) -> np.ndarray:
+        """Map walls and obstacle edges as the (N_edges, 4) array consumed by the ray-caster."""
+        if self._obstacle_segments is None:
+            self._obstacle_segments = Geom.segments_array(
+                chain(self.arena_bounding_lines, Geom.all_bounding_lines_generator(self.obstacle_bboxes))
+            )
+        return self._obstacle_segments
+
+    def load_map(self, map):
+        self.map = map
+        self.set_obstacles(compiled=load_compiled_map(map, self._obstacle_grid.cell_size, self.arena_size, self.map_cache_dir))
+
+    def set_obstacles(self, obstacles=None, compiled: Optional[CompiledMap] = None):
+        """Replace the obstacles, or create them from a compiled map and reuse its geometry."""
+        for obs in self._obstacle_list:
+            obs._sm = None
+        self._obstacle_list = list(obstacles) if compiled is None else compiled.obstacles()
+        for obs in self._obstacle_list:
+            obs._sm = self
+        self.on_obstacles_changed(compiled)
+
+    def on_obstacles_changed(self, compiled: Optional[CompiledMap] = None):
+        """Drop everything derived from the obstacle geometry. Called when any obstacle moves or the set changes.
+
+        A compiled map of the current obstacles supplies that geometry instead of it being recomputed.
+        """
+        self.world_version += 1
+        self._obstacle_bboxes = None
+        self._obstacle_segments = None
+        self.sensor_cache.clear()
+        self._obstacle_grid.clear()
+        if (
+            compiled is not None
+            and compiled.cell_size == self._obstacle_grid.cell_size
+            and compiled.arena_size == self.arena_size
+        ):
+            self._obstacle_bboxes = tuple(tuple(bbox) for bbox in compiled.bboxes.tolist())
+            self._obstacle_segments = compiled.segments
+            for obs, bbox, cell_range in zip(self._obstacle_list, self._obstacle_bboxes, compiled.cell_ranges.tolist()):
+                self._obstacle_grid.insert(obs, bbox, tuple(cell_range))
+            return
+        for obs in self._obstacle_list:
+            self._obstacle_grid.insert(obs, (obs.x, obs.y, obs.width, obs.height))
+
+    def on_robot_moved(self, robot):
+        self.world_version += 1
+        self._robot_grid.update(robot, (robot.x, robot.y, robot.width, robot.height))
+
+    def on_objective_moved(self, obj):
+        self.world_version += 1
+        self._objective_grid.update(obj, (obj.x, obj.y, obj.width, obj.height))
+
+    def obstacles_in(self, bbox: Geom.BBox) -> List[Obstacle]:
+        """Obstacles that may overlap the (x, y, w, h) bbox, in list order."""
+        return self._obstacle_grid.query(bbox)
+
+    def objectives_in(self, bbox: Geom.BBox) -> List[Objective]:
+        """Objectives that may overlap the (x, y, w, h) bbox, in list order."""
+        return self._objective_grid.query(bbox)
+
+    def robots_in(self, bbox: Geom.BBox) -> List[Robot]:
+        """Placed robots that may overlap the (x, y, w, h) bbox, in list order."""
+        return self._robot_grid.query(bbox)
+
+    def nearest_objective(self, point: Geom.Point2D) -> Optional[Objective]:
+        """Objective whose `pos` is closest to point; ties go to the first in `objectives`."""
+        return self._objective_grid.nearest(point)
+
+    def _robot_bboxes(self) -> np.ndarray:
+        return np.array([(r.x, r.y, r.width, r.height) for r in self._robot_list], dtype=float).reshape(-1, 4)
+
+    def rays_min_distance_to_robots(self, origins: np.ndarray, ends: np.ndarray, owners: np.ndarray, robot_bboxes: np.ndarray = None) -> np.ndarray:
+        """Distance along each ray to the nearest robot other than its owner (index into `robots`)."""
+        if robot_bboxes is None:
+            robot_bboxes = self._robot_bboxes()
+        centers = robot_bboxes[:, :2] + 0.5 * robot_bboxes[:, 2:]
+        radii = 0.5 * robot_bboxes[:, 2]
+        candidates = Geom.rays_bboxes_overlap(origins, ends, robot_bboxes)
+        candidates &= owners[:, None] != np.arange(len(robot_bboxes))
+        return Geom.rays_circles_min_distance(origins, ends, centers, radii, ROBOT_MAX_SENSOR_DISTANCE, candidates)
+
+    @staticmethod
+    def _sensor_rays(centers: np.ndarray, sizes: np.ndarray, directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rad_angles = np.radians(-(directions[:, None] + np.asarray(ROBOT_DISTANCE_ANGLES, dtype=float)))
+        unit = np.stack((np.cos(rad_angles), np.sin(rad_angles)), axis=2)
+        origins = (centers[:, None, :] + 0.5 * sizes[:, None, :] * unit).reshape(-1, 2)
+        ends = origins + unit.reshape(-1, 2) * ROBOT_MAX_SENSOR_DISTANCE
+        return origins, ends
+
+    def sense_all(self) -> SensorReadings:
+        """Distance and smell sensors of every robot, computed in one vectorized pass."""
+        n_robots = len(self._robot_list)
+        n_angles = len(ROBOT_DISTANCE_ANGLES)
+        robot_bboxes = self._robot_bboxes()
+        directions = np.array([r._direction for r in self._robot_list], dtype=float)
+        centers = robot_bboxes[:, :2] + 0.5 * robot_bboxes[:, 2:]
+
+        # sense walls and obstacles from the same snapped pose as the per-robot cache
+        xs, ys, sensed_directions = self.sensor_cache.snap_poses(robot_bboxes[:, 0], robot_bboxes[:, 1], directions)
+        sensed_centers = np.stack((xs, ys), axis=1) + 0.5 * robot_bboxes[:, 2:]
+        origins, ends = self._sensor_rays(sensed_centers, robot_bboxes[:, 2:], sensed_directions)
+        distances = Geom.rays_segments_min_distance(origins, ends, self.obstacle_segments, ROBOT_MAX_SENSOR_DISTANCE)
+        if self.robot_see_each_other and n_robots > 1:
+            origins, ends = self._sensor_rays(centers, robot_bboxes[:, 2:], directions)
+            owners = np.repeat(np.arange(n_robots), n_angles)
+            distances = np.minimum(distances, self.rays_min_distance_to_robots(origins, ends, owners, robot_bboxes))
+
+        objective_centers = np.array([obj.center for obj in self._objective_list], dtype=float).reshape(-1, 2)
+        delta = objective_centers[None, :, :] - centers[:, None, :]
+        degrees = np.mod(-(np.degrees(np.arctan2(delta[..., 1], delta[..., 0])) + directions[:, None]), 360)
+        smells = np.where(degrees <= 180, degrees, degrees - 360)
+
+        return SensorReadings(distances=distances.reshape(n_robots, n_angles), smells=smells)
 
     def _create_robots(self):
         self._robot_list = (
@@ -102,43 +273,47 @@ class Simbot(BoxLayout):
             if hasattr(self, "customfn_create_robots")
             else [self.robot_cls() for _ in range(self.num_robots)]
         )
-        for r in self._robot_list:
+        self._robot_grid.clear()
+        for index, r in enumerate(self._robot_list):
+            r._index = index
             r.pos = self.robot_default_start_pos
             trial_count = 0
             while not self.is_robot_pos_valid(r):
                 r.pos = (
-                    random.randrange(SIMBOTMAP_SIZE[0] - r.size[0]),
-                    random.randrange(SIMBOTMAP_SIZE[1] - r.size[1]),
+                    random.randrange(self.arena_size[0] - r.size[0]),
+                    random.randrange(self.arena_size[1] - r.size[1]),
                 )
                 r._direction = random.randrange(360)
                 trial_count += 1
                 if trial_count == 500:
                     raise Exception("Can't find the place for spawning robots")
             r._sm = self
-            self._robots.add_widget(r)
+            self._robot_grid.insert(r, (r.x, r.y, r.width, r.height))
 
     def _create_objectives(self):
         self._objective_list = [Objective() for _ in range(self.num_objectives)]
+        self._objective_grid.clear()
         for obj in self._objective_list:
             obj.pos = self.obj_default_start_pos
             trial_count = 0
             while not self.is_objective_pos_valid(obj):
                 obj.pos = (
-                    random.randrange(SIMBOTMAP_SIZE[0] - obj.size[0]),
-                    random.randrange(SIMBOTMAP_SIZE[1] - obj.size[1]),
+                    random.randrange(self.arena_size[0] - obj.size[0]),
+                    random.randrange(self.arena_size[1] - obj.size[1]),
                 )
                 trial_count += 1
                 if trial_count == 500:
                     raise Exception("Can't find the place for spawning objective")
-            self._objectives.add_widget(obj)
+            obj._sm = self
+            self._objective_grid.insert(obj, (obj.x, obj.y, obj.width, obj.height))
 
     def _remove_all_robots_from_map(self):
-        self._robots.clear_widgets()
         self._robot_list.clear()
+        self._robot_grid.clear()
 
     def _remove_all_objectives_from_map(self):
-        self._objectives.clear_widgets()
         self._objective_list.clear()
+        self._objective_grid.clear()
 
     def _reset_stats(self):
         self.eat_count = 0
@@ -150,61 +325,105 @@ class Simbot(BoxLayout):
             self.scoreStr = str(self.score)
 
     def add_history(self, robot, turn, move):
-        distance = robot.distance()
-        angle = robot.smell()
-        if not self.history:
-            self.history.append(
-                (
-                    "ir0",
-                    "ir1",
-                    "ir2",
-                    "ir3",
-                    "ir4",
-                    "ir5",
-                    "ir6",
-                    "ir7",
-                    "angle",
-                    "turn",
-                    "move",
-                )
-            )
-        self.history.append(list(distance) + [angle, turn, move])
+        """Record one (sensors, turn, move) row for the robot, when a history is being saved."""
+        if self.history is None:
+            return
+        distances, angle = robot.sensor_snapshot()
+        self.history.append(self.iteration, robot._index, distances, angle, turn, move)
 
     def process(self, dt):
+        self.step()
+
+    @property
+    def is_running(self) -> bool:
+        return self.iteration < self.max_tick
+
+    def step(self) -> Optional[EpisodeStats]:
+        """Advance the simulation by one tick.
+
+        Returns the stats of the episode when this tick ends it, otherwise None.
+        """
         if self.iteration == 0:
             self._reset_stats()
             self._create_objectives()
             self._create_robots()
             self._before_simulation(self)
-            self.history = []
             self.simulation_count += 1
+            if self.save_wasd_history or self.record_history:
+                self.history = HistoryRecorder("history{0}.psh".format(self.simulation_count), self.history_buffer_rows)
             Logger.debug("Map: Start Simulation")
             self.iteration += 1
 
         elif self.iteration < self.max_tick:
             self.iteration += 1
+            n_robots = len(self._robot_list)
+            if self.record_history:
+                distances = np.empty((n_robots, len(ROBOT_DISTANCE_ANGLES)))
+                angles = np.empty(n_robots)
             # Logger.debug('Map: Start Iteration')
-            for robot in self._robots.get_robots():
+            for index, robot in enumerate(self._robot_list):
+                robot.tick_turn = robot.tick_move = 0
+                if self.record_history:
+                    # what the robot senses as its update starts, after the robots before it have moved
+                    distances[index], angles[index] = robot.sensor_snapshot()
                 robot.update()
+            if self.record_history:
+                self.history.extend(
+                    self.iteration,
+                    np.arange(n_robots),
+                    distances,
+                    angles,
+                    np.array([r.tick_turn for r in self._robot_list], dtype=float),
+                    np.array([r.tick_move for r in self._robot_list], dtype=float),
+                )
             # Logger.debug('Map: End Iteration: {}'.format(self.iteration))
 
             if self.iteration == self.max_tick:
                 self._after_simulation(self)
-                if self.save_wasd_history:
+                stats = self._episode_stats()
+                if self.history is not None:
                     Logger.debug("History: Saving History")
-                    with open(
-                        "history{0}.csv".format(self.simulation_count), "w", newline=""
-                    ) as out_file:
-                        csv_writer = csv.writer(out_file)
-                        csv_writer.writerows(
-                            self.history if self.history else [["No history"]]
-                        )
+                    self.history.close()
+                    self.history = None
 
                 Logger.debug("Map: End Simulation: {}".format(self.simulation_count))
                 if self.simulation_forever:
                     self._remove_all_robots_from_map()
                     self._remove_all_objectives_from_map()
                     self.iteration = 0
+                return stats
+        return None
+
+    def run(self, ticks: int = None, episodes: int = None) -> List[EpisodeStats]:
+        """Step the simulation in a tight loop, without any frame clock.
+
+        Stops after `ticks` ticks, after `episodes` finished episodes, or when the
+        simulation ends, whichever comes first. Returns the stats of every episode
+        that finished during the call.
+        """
+        if ticks is None and episodes is None and self.simulation_forever:
+            raise ValueError("ticks or episodes must be given when simulation_forever is set")
+        finished = []
+        tick = 0
+        while self.is_running and (ticks is None or tick < ticks):
+            stats = self.step()
+            tick += 1
+            if stats is not None:
+                finished.append(stats)
+                if episodes is not None and len(finished) >= episodes:
+                    break
+        return finished
+
+    def _episode_stats(self) -> EpisodeStats:
+        return EpisodeStats(
+            simulation_count=self.simulation_count,
+            ticks=self.iteration,
+            eat_count=self.eat_count,
+            food_move_count=self.food_move_count,
+            score=self.score,
+            robot_eat_counts=tuple(r.eat_count for r in self._robot_list),
+            robot_collision_counts=tuple(r.collision_count for r in self._robot_list),
+        )
 
     def on_robot_eat(self, robot, obj):
         self.eat_count += 1
@@ -222,14 +441,14 @@ class Simbot(BoxLayout):
             obj.pos = pos
         else:
             obj.pos = (
-                random.randrange(SIMBOTMAP_SIZE[0] - obj.size[0]),
-                random.randrange(SIMBOTMAP_SIZE[1] - obj.size[1]),
+                random.randrange(self.arena_size[0] - obj.size[0]),
+                random.randrange(self.arena_size[1] - obj.size[1]),
             )
             trial_count = 0
             while not self.is_objective_pos_valid(obj):
                 obj.pos = (
-                    random.randrange(SIMBOTMAP_SIZE[0] - obj.size[0]),
-                    random.randrange(SIMBOTMAP_SIZE[1] - obj.size[1]),
+                    random.randrange(self.arena_size[0] - obj.size[0]),
+                    random.randrange(self.arena_size[1] - obj.size[1]),
                 )
                 trial_count += 1
                 if trial_count == 500:
@@ -238,13 +457,14 @@ class Simbot(BoxLayout):
     def is_objective_pos_valid(self, obj):
         pos = obj.pos
         # check wall
-        if pos[0] <= 0 or pos[0] >= SIMBOTMAP_SIZE[0] - obj.size[0]:
+        if pos[0] <= 0 or pos[0] >= self.arena_size[0] - obj.size[0]:
             return False
-        if pos[1] <= 0 or pos[1] >= SIMBOTMAP_SIZE[1] - obj.size[1]:
+        if pos[1] <= 0 or pos[1] >= self.arena_size[1] - obj.size[1]:
             return False
 
         # check obstacles
-        for obs in self.obstacles:
+        bbox = (pos[0], pos[1], obj.size[0], obj.size[1])
+        for obs in self.obstacles_in(bbox):
             if (
                 obs.pos[0] <= pos[0] <= obs.pos[0] + obs.size[0]
                 or obs.pos[0] <= pos[0] + obj.size[0] <= obs.pos[0] + obs.size[0]
@@ -255,7 +475,7 @@ class Simbot(BoxLayout):
                 return False
 
         # check robots
-        for r in self._robot_list:
+        for r in self.robots_in(bbox):
             if (
                 r.pos[0] <= pos[0] <= r.pos[0] + r.size[0]
                 or r.pos[0] <= pos[0] + obj.size[0] <= r.pos[0] + r.size[0]
@@ -266,7 +486,7 @@ class Simbot(BoxLayout):
                 return False
 
         # check other objectives
-        for o in self._objective_list:
+        for o in self.objectives_in(bbox):
             if obj == o:
                 continue
             if (
@@ -282,13 +502,14 @@ class Simbot(BoxLayout):
 
     def is_robot_pos_valid(self, robot):
         pos = robot.pos
-        if pos[0] <= 0 or pos[0] >= SIMBOTMAP_SIZE[0] - robot.size[0]:
+        if pos[0] <= 0 or pos[0] >= self.arena_size[0] - robot.size[0]:
             return False
-        if pos[1] <= 0 or pos[1] >= SIMBOTMAP_SIZE[1] - robot.size[1]:
+        if pos[1] <= 0 or pos[1] >= self.arena_size[1] - robot.size[1]:
             return False
 
         # check obstacles
-        for obs in self.obstacles:
+        bbox = (pos[0], pos[1], robot.size[0], robot.size[1])
+        for obs in self.obstacles_in(bbox):
             if (
                 obs.pos[0] <= pos[0] <= obs.pos[0] + obs.size[0]
                 or obs.pos[0] <= pos[0] + robot.size[0] <= obs.pos[0] + obs.size[0]
@@ -300,7 +521,7 @@ class Simbot(BoxLayout):
 
         # check other robots
         if self.robot_see_each_other:
-            for r in self._robot_list:
+            for r in self.robots_in(bbox):
                 if robot == r:
                     continue
                 if (
@@ -313,64 +534,3 @@ class Simbot(BoxLayout):
                     return False
 
         return True
-
-
-class PySimbotMap(Widget):
-    def __init__(
-        self, simbot, enable_wasd_control=False, save_wasd_history=False, **kwargs
-    ):
-        super(PySimbotMap, self).__init__(**kwargs)
-        self._keyboard = Window.request_keyboard(self._keyboard_closed, self)
-        self._keyboard.bind(on_key_down=self._on_keyboard_down)
-        self.enable_wasd_control = enable_wasd_control
-        self.save_wasd_history = save_wasd_history
-
-        self.add_widget(simbot._obstacles)
-        self.add_widget(simbot._objectives)
-        self.add_widget(simbot._robots)
-
-        self.simbot = simbot
-        self.size = SIMBOTMAP_SIZE
-
-    def _keyboard_closed(self):
-        self._keyboard.unbind(on_key_down=self._on_keyboard_down)
-        self._keyboard = None
-
-    def _on_keyboard_down(self, keyboard, keycode, text, modifiers):
-        if not self.simbot.robots:
-            return
-        if self.simbot.iteration >= self.simbot.max_tick:
-            return
-        if keycode[1] == "n":
-            for obj in self.simbot.objectives:
-                self.simbot.change_objective_pos(obj)
-                self.simbot.food_move_count += 1
-                self.simbot.score = int(
-                    self.simbot.eat_count * 100 / self.simbot.food_move_count
-                )
-        elif keycode[1] == "w" and self.enable_wasd_control:
-            r = self.simbot.robots[0]
-            self.simbot.add_history(r, 0, 5)
-            r.move(5)
-        elif keycode[1] == "a" and self.enable_wasd_control:
-            r = self.simbot.robots[0]
-            self.simbot.add_history(r, -5, 0)
-            r.turn(-5)
-        elif keycode[1] == "d" and self.enable_wasd_control:
-            r = self.simbot.robots[0]
-            self.simbot.add_history(r, 5, 0)
-            r.turn(5)
-        elif keycode[1] == "s" and self.enable_wasd_control:
-            r = self.simbot.robots[0]
-            self.simbot.add_history(r, 0, -5)
-            r.move(-5)
-        elif keycode[1] == "q" and self.enable_wasd_control:
-            r = self.simbot.robots[0]
-            self.simbot.add_history(r, -5, 5)
-            r.turn(-5)
-            r.move(5)
-        elif keycode[1] == "e" and self.enable_wasd_control:
-            r = self.simbot.robots[0]
-            self.simbot.add_history(r, 5, 5)
-            r.turn(5)
-            r.move(5)
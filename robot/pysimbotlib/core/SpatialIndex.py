@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+import math
+
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .Geom import Geom
+from .Global import SIMBOTMAP_SIZE, SPATIAL_GRID_CELL_SIZE
+
+# below this many items `nearest` scans linearly instead of searching rings
+NEAREST_LINEAR_SCAN_LIMIT = 16
+
+CellRange = Tuple[int, int, int, int] # (ix_min, iy_min, ix_max, iy_max)
+
+class SpatialGrid:
+    """Uniform grid of buckets holding items by their (x, y, w, h) bbox.
+
+    Queries return candidates only; callers still run their exact overlap test.
+    Candidates come back in insertion order so results match a scan of the original list.
+    """
+
+    def __init__(self, cell_size: float = SPATIAL_GRID_CELL_SIZE, extent: Tuple[float, float] = SIMBOTMAP_SIZE):
+        self.cell_size = cell_size
+        # size of the area the items live in, it bounds the `nearest` search
+        self.extent = extent
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, None]] = {}
+        # item -> [bbox, cell range, insertion sequence]
+        self._items: Dict[Hashable, list] = {}
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._items
+
+    def _cell_range(self, bbox: Geom.BBox) -> CellRange:
+        x, y, w, h = bbox
+        cs = self.cell_size
+        return (math.floor(x / cs), math.floor(y / cs), math.floor((x + w) / cs), math.floor((y + h) / cs))
+
+    def _add_to_cells(self, item: Hashable, cell_range: CellRange) -> None:
+        ix_min, iy_min, ix_max, iy_max = cell_range
+        for ix in range(ix_min, ix_max + 1):
+            for iy in range(iy_min, iy_max + 1):
+                self._cells.setdefault((ix, iy), {})[item] = None
+
+    def _remove_from_cells(self, item: Hashable, cell_range: CellRange) -> None:
+        ix_min, iy_min, ix_max, iy_max = cell_range
+        for ix in range(ix_min, ix_max + 1):
+            for iy in range(iy_min, iy_max + 1):
+                cell = self._cells[(ix, iy)]
+                del cell[item]
+                if not cell:
+                    del self._cells[(ix, iy)]
+
+    def insert(self, item: Hashable, bbox: Geom.BBox, cell_range: Optional[CellRange] = None) -> None:
+        """Add an item; a precomputed cell_range must be the one `_cell_range(bbox)` gives."""
+        if item in self._items:
+            self.update(item, bbox)
+            return
+        if cell_range is None:
+            cell_range = self._cell_range(bbox)
+        self._items[item] = [bbox, cell_range, self._sequence]
+        self._sequence += 1
+        self._add_to_cells(item, cell_range)
+
+    def update(self, item: Hashable, bbox: Geom.BBox) -> None:
+        """Move an item, touching buckets only when it crosses a cell border. Unknown items are ignored."""
+        entry = self._items.get(item)
+        if entry is None:
+            return
+        entry[0] = bbox
+        cell_range = self._cell_range(bbox)
+        if cell_range != entry[1]:
+            self._remove_from_cells(item, entry[1])
+            self._add_to_cells(item, cell_range)
+            entry[1] = cell_range
+
+    def remove(self, item: Hashable) -> None:
+        entry = self._items.pop(item, None)
+        if entry is not None:
+            self._remove_from_cells(item, entry[1])
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._items.clear()
+        self._sequence = 0
+
+    def _ordered(self, candidates) -> List[Hashable]:
+        return sorted(candidates, key=lambda item: self._items[item][2])
+
+    def query(self, bbox: Geom.BBox) -> List[Hashable]:
+        """Items whose cells overlap the closed bbox, in insertion order."""
+        ix_min, iy_min, ix_max, iy_max = self._cell_range(bbox)
+        candidates = {}
+        for ix in range(ix_min, ix_max + 1):
+            for iy in range(iy_min, iy_max + 1):
+                cell = self._cells.get((ix, iy))
+                if cell:
+                    candidates.update(cell)
+        return self._ordered(candidates)
+
+    def _ring_cells(self, cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for ix in range(cx - ring, cx + ring + 1):
+            yield (ix, cy - ring)
+            yield (ix, cy + ring)
+        for iy in range(cy - ring + 1, cy + ring):
+            yield (cx - ring, iy)
+            yield (cx + ring, iy)
+
+    def _nearest_key(self, point: Geom.Point2D, item: Hashable) -> Tuple[float, int]:
+        bbox, _, sequence = self._items[item]
+        return (Geom.distance(point, bbox[:2]), sequence)
+
+    def nearest(self, point: Geom.Point2D) -> Optional[Hashable]:
+        """Item whose bbox origin (its `pos`) is closest to point; ties go to the earliest inserted."""
+        if len(self._items) <= NEAREST_LINEAR_SCAN_LIMIT:
+            # a handful of items is cheaper to scan than to search ring by ring
+            return min(self._items, key=lambda item: self._nearest_key(point, item), default=None)
+        cs = self.cell_size
+        cx, cy = math.floor(point[0] / cs), math.floor(point[1] / cs)
+        max_ring = math.ceil(max(self.extent) / cs) + 1
+        best = None
+        best_key = None
+        seen = set()
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(cx, cy, ring):
+                for item in self._cells.get(cell, ()):
+                    if item in seen:
+                        continue
+                    seen.add(item)
+                    key = self._nearest_key(point, item)
+                    if best_key is None or key < best_key:
+                        best, best_key = item, key
+            # anything not seen yet lies outside this ring, so at least ring * cs away
+            if best_key is not None and best_key[0] < ring * cs:
+                return best
+        if len(seen) < len(self._items):
+            # items far outside the map
+            return min(self._items, key=lambda item: self._nearest_key(point, item))
+        return best
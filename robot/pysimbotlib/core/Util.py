@@ -1,4 +1,4 @@
-from kivy.uix.widget import WidgetBase
+from .Body import Body
 from typing import Sequence, Tuple, Optional, Union
 
 import math
@@ -20,13 +20,13 @@ class Util:
         return True
 
     @staticmethod
-    def all_bounding_lines_generator(widgets: Sequence[WidgetBase]):
+    def all_bounding_lines_generator(widgets: Sequence[Body]):
         for w in widgets:
             for x in Util.bounding_lines_generator(w):
                 yield x
 
     @staticmethod
-    def bounding_lines_generator(widget: WidgetBase):
+    def bounding_lines_generator(widget: Body):
         buttom_left = (widget.x, widget.y)
         buttom_right = (widget.x + widget.width, widget.y)
         top_left = (widget.x, widget.y + widget.height)
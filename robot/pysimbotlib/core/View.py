@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+
+from kivy.uix.widget import Widget
+from kivy.properties import NumericProperty, ReferenceListProperty, StringProperty
+from kivy.core.window import Window
+from kivy.uix.boxlayout import BoxLayout
+
+
+class ObstacleView(Widget):
+    pass
+
+
+class ObjectiveView(Widget):
+    pass
+
+
+class RobotView(Widget):
+
+    _direction = NumericProperty(0)
+
+    _color_r = NumericProperty(0)
+    _color_g = NumericProperty(0)
+    _color_b = NumericProperty(0)
+    _color_a = NumericProperty(0)
+
+    color = ReferenceListProperty(_color_r, _color_g, _color_b, _color_a)
+
+
+class SimbotView(BoxLayout):
+    """Kivy front end that mirrors the state of a headless `Simbot` once per frame."""
+
+    iteration = NumericProperty(0)
+    max_tick = NumericProperty(0)
+    simulation_count = NumericProperty(0)
+
+    # stats
+    eat_count = NumericProperty(0)
+    food_move_count = NumericProperty(0)
+    score = NumericProperty(0)
+    scoreStr = StringProperty("")
+
+    def __init__(self, simbot, **kwargs):
+        super(SimbotView, self).__init__(**kwargs)
+        self.simbot = simbot
+
+        self._obstacles = Widget()
+        self._objectives = Widget()
+        self._robots = Widget()
+        self._obstacle_views = []
+        self._objective_views = []
+        self._robot_views = []
+        self.refresh()
+
+    @staticmethod
+    def _sync_views(wrapper, views, models, view_cls):
+        if len(views) != len(models) or any(v.model is not m for v, m in zip(views, models)):
+            wrapper.clear_widgets()
+            views.clear()
+            for m in models:
+                v = view_cls(size=m.size)
+                v.model = m
+                wrapper.add_widget(v)
+                views.append(v)
+        for v in views:
+            v.pos = v.model.pos
+            v.size = v.model.size
+
+    def refresh(self, *args):
+        simbot = self.simbot
+        self._sync_views(self._obstacles, self._obstacle_views, simbot.obstacles, ObstacleView)
+        self._sync_views(self._objectives, self._objective_views, simbot.objectives, ObjectiveView)
+        self._sync_views(self._robots, self._robot_views, simbot.robots, RobotView)
+        for v in self._robot_views:
+            v._direction = v.model._direction
+            if v.model.color is not None:
+                v.color = v.model.color
+
+        self.iteration = simbot.iteration
+        self.max_tick = simbot.max_tick
+        self.simulation_count = simbot.simulation_count
+        self.eat_count = simbot.eat_count
+        self.food_move_count = simbot.food_move_count
+        self.score = simbot.score
+        self.scoreStr = simbot.scoreStr
+
+
+class PySimbotMap(Widget):
+    def __init__(
+        self, simbot_view, enable_wasd_control=False, save_wasd_history=False, **kwargs
+    ):
+        super(PySimbotMap, self).__init__(**kwargs)
+        self._keyboard = Window.request_keyboard(self._keyboard_closed, self)
+        self._keyboard.bind(on_key_down=self._on_keyboard_down)
+        self.enable_wasd_control = enable_wasd_control
+        self.save_wasd_history = save_wasd_history
+
+        self.add_widget(simbot_view._obstacles)
+        self.add_widget(simbot_view._objectives)
+        self.add_widget(simbot_view._robots)
+
+        self.simbot = simbot_view.simbot
+        self.size = self.simbot.arena_size
+
+    def _keyboard_closed(self):
+        self._keyboard.unbind(on_key_down=self._on_keyboard_down)
+        self._keyboard = None
+
+    def _on_keyboard_down(self, keyboard, keycode, text, modifiers):
+        if not self.simbot.robots:
+            return
+        if self.simbot.iteration >= self.simbot.max_tick:
+            return
+        if keycode[1] == "n":
+            for obj in self.simbot.objectives:
+                self.simbot.change_objective_pos(obj)
+                self.simbot.food_move_count += 1
+                self.simbot.score = int(
+                    self.simbot.eat_count * 100 / self.simbot.food_move_count
+                )
+        elif keycode[1] == "w" and self.enable_wasd_control:
+            r = self.simbot.robots[0]
+            self.simbot.add_history(r, 0, 5)
+            r.move(5)
+        elif keycode[1] == "a" and self.enable_wasd_control:
+            r = self.simbot.robots[0]
+            self.simbot.add_history(r, -5, 0)
+            r.turn(-5)
+        elif keycode[1] == "d" and self.enable_wasd_control:
+            r = self.simbot.robots[0]
+            self.simbot.add_history(r, 5, 0)
+            r.turn(5)
+        elif keycode[1] == "s" and self.enable_wasd_control:
+            r = self.simbot.robots[0]
+            self.simbot.add_history(r, 0, -5)
+            r.move(-5)
+        elif keycode[1] == "q" and self.enable_wasd_control:
+            r = self.simbot.robots[0]
+            self.simbot.add_history(r, -5, 5)
+            r.turn(-5)
+            r.move(5)
+        elif keycode[1] == "e" and self.enable_wasd_control:
+            r = self.simbot.robots[0]
+            self.simbot.add_history(r, 5, 5)
+            r.turn(5)
+            r.move(5)
@@ -1,6 +1,12 @@
 from .Robot import Robot
 # from .Objective import Objective
 # from .Obstacle import Obstacle
-from .Simbot import Simbot
-from .App import PySimbotApp
-# from .Geom import Geom
\ No newline at end of file
+from .Simbot import Simbot, EpisodeStats, SensorReadings
+# from .Geom import Geom
+
+def __getattr__(name):
+    # The Kivy front end is only imported when asked for, so headless runs never open a Window.
+    if name == 'PySimbotApp':
+        from .App import PySimbotApp
+        return PySimbotApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,19 @@
-from typing import Tuple, List
+from typing import Dict, Optional, Sequence, Tuple, List
 from venv import logger
-from pysimbotlib.core import Robot, PySimbotApp, Simbot
+from pysimbotlib.core import Robot, Simbot
 from base_robot import BaseRobot
 from enum import Enum
 from sensors import DirectionalDistances
 from dataclasses import dataclass, fields
 from itertools import product
 import random
-import json
+import os
+import sys
 from config import REFRESH_INTERVAL
 from kivy.logger import Logger
-import matplotlib.pyplot as plt
 import numpy as np
+import qtable_file
+from metrics import MetricSeries, read_series
 
 
 class Action(Enum):
@@ -48,12 +50,52 @@ EXPLORATION_RATE: float = 0.1
 # MIN_EXPLORATION_RATE: float = 0.1
 # DECAY_RATE: float = 0.95
 
-eat_counts = []
-collision_counts = []
-time_steps = []
+# sensor readings up to the first threshold are NEAR, up to the second MEDIUM, beyond it FAR
+DISTANCE_THRESHOLDS: Tuple[float, float] = (15, 30)
+# food closer than the first threshold is NEAR, from the second one on FAR
+FOOD_DISTANCE_THRESHOLDS: Tuple[float, float] = (100, 200)
+# food further than this many degrees off the heading is LEFT or RIGHT
+ANGLE_THRESHOLD: float = 30
 
+# main() resumes the Q-table from this file and checkpoints it there every CHECKPOINT_INTERVAL
+# ticks; the file belongs to a single learner, so only main()'s one robot is given it
+QTABLE_PATH: str = "qtable.qtb"
+CHECKPOINT_INTERVAL: int = 1000
 
-@dataclass
+# per-window training metrics, read back by graph()
+METRICS_PATH: str = "qlearn_metrics.bin"
+METRICS_WINDOW: int = 2000
+REWARD_BIN_EDGES: Tuple[float, ...] = (-20, -5, 0, 5, 10, 100)
+training_metrics: Optional[MetricSeries] = None
+
+
+class StateEncoder:
+    """Mixed-radix encoding of discretized sensor readings into a Q-table row.
+
+    A state is a tuple of digits, digit i being in range(radices[i]); the last digit
+    varies fastest, matching the order of itertools.product over the digit ranges.
+    """
+
+    def __init__(self, radices: Sequence[int]) -> None:
+        self.radices: Tuple[int, ...] = tuple(radices)
+        self.strides: Tuple[int, ...] = tuple(
+            int(np.prod(self.radices[i + 1 :], dtype=np.int64)) for i in range(len(self.radices))
+        )
+        self.n_states: int = int(np.prod(self.radices, dtype=np.int64))
+        self._strides = np.array(self.strides, dtype=np.int64)
+
+    def encode(self, digits: Sequence[int]) -> int:
+        return sum(digit * stride for digit, stride in zip(digits, self.strides))
+
+    def decode(self, index: int) -> Tuple[int, ...]:
+        return tuple((index // stride) % radix for stride, radix in zip(self.strides, self.radices))
+
+    def encode_many(self, digits: np.ndarray) -> np.ndarray:
+        """Rows of an (..., len(radices)) digit array to state indexes."""
+        return np.asarray(digits, dtype=np.int64) @ self._strides
+
+
+@dataclass(frozen=True)
 class State:
     left_sensor: Distance
     front_left_sensor: Distance
@@ -104,6 +146,83 @@ class State:
             "food_angle": self.food_angle.value,
         }
 
+    @property
+    def index(self) -> int:
+        """Row of this state in the Q-table."""
+        return STATE_ENCODER.encode(
+            [_STATE_DIGITS[field.name][getattr(self, field.name)] for field in fields(self)]
+        )
+
+
+ACTIONS: Tuple[Action, ...] = tuple(Action)
+ACTION_INDEX: Dict[Action, int] = {action: i for i, action in enumerate(ACTIONS)}
+
+# possible values of each State field, in field order
+STATE_VALUES: Tuple[Tuple[Enum, ...], ...] = (
+    tuple(Distance),
+    tuple(Distance),
+    tuple(Distance),
+    tuple(Distance),
+    tuple(Distance),
+    tuple(FoodDistance),
+    tuple(Angle),
+)
+_STATE_DIGITS: Dict[str, Dict[Enum, int]] = {
+    field.name: {value: digit for digit, value in enumerate(values)}
+    for field, values in zip(fields(State), STATE_VALUES)
+}
+STATE_ENCODER = StateEncoder(len(values) for values in STATE_VALUES)
+# every State, indexed by its Q-table row
+ALL_STATES: Tuple[State, ...] = tuple(State(*values) for values in product(*STATE_VALUES))
+
+# written into Q-table files, which only load into a table with the same layout
+QTABLE_SCHEMA = tuple(
+    (field.name, tuple(value.value for value in values))
+    for field, values in zip(fields(State), STATE_VALUES)
+)
+QTABLE_ACTIONS = tuple(action.name for action in ACTIONS)
+
+# (move step, turn degrees) of every action; a move comes before the turn
+ACTION_MOTIONS: Dict[Action, Tuple[int, float]] = {
+    Action.FORWARD: (10, 0),
+    Action.LEFT: (0, -20),
+    Action.RIGHT: (0, 20),
+    Action.MOVE_LEFT: (5, -20),
+    Action.MOVE_RIGHT: (5, 20),
+    Action.EX_LEFT: (0, -90),
+    Action.EX_RIGHT: (0, 90),
+}
+
+# DirectionalDistances columns of the State distance fields, in field order
+_STATE_SENSOR_COLUMNS = [6, 7, 0, 1, 2]
+
+
+def apply_action(robot: Robot, action: Action) -> None:
+    step, degree = ACTION_MOTIONS[action]
+    if step:
+        robot.move(step)
+    if degree:
+        robot.turn(degree)
+
+
+def encode_states(distances: np.ndarray, food_distances: np.ndarray, food_angles: np.ndarray) -> np.ndarray:
+    """Q-table rows of many robots at once, discretized like `QLearnRobot.update_state`.
+
+    distances is (n, 8) in DirectionalDistances order, food_distances and food_angles are (n,).
+    """
+    near, medium = DISTANCE_THRESHOLDS
+    sensors = np.asarray(distances, dtype=float)[:, _STATE_SENSOR_COLUMNS]
+    food_distances = np.asarray(food_distances, dtype=float)
+    food_angles = np.asarray(food_angles, dtype=float)
+    digits = np.empty((len(sensors), len(STATE_VALUES)), dtype=np.int64)
+    # the digits follow the value order of Distance, FoodDistance and Angle
+    digits[:, :5] = (sensors > near).astype(np.int64) + (sensors > medium)
+    digits[:, 5] = (food_distances >= FOOD_DISTANCE_THRESHOLDS[0]).astype(np.int64) + (
+        food_distances >= FOOD_DISTANCE_THRESHOLDS[1]
+    )
+    digits[:, 6] = (food_angles >= -ANGLE_THRESHOLD).astype(np.int64) + (food_angles > ANGLE_THRESHOLD)
+    return STATE_ENCODER.encode_many(digits)
+
 
 def after_simulation(simbot: Simbot):
     Logger.info("GA: Start GA Process ...")
@@ -111,29 +230,36 @@ def after_simulation(simbot: Simbot):
     robot.export_qtable()
 
 
-def graph():
-    # Constants
-    WINDOW_SIZE = 2000  # จำนวน ticks ต่อช่วง
-    num_windows = len(time_steps) // WINDOW_SIZE  # จำนวนช่วงทั้งหมด
+def open_training_metrics(path: str = METRICS_PATH) -> MetricSeries:
+    """The series every QLearnRobot records into; the first call starts a new file."""
+    global training_metrics
+    if training_metrics is None:
+        training_metrics = MetricSeries(
+            ("time_step", "eat", "collision", "reward"),
+            METRICS_WINDOW,
+            path=path,
+            histograms={"reward": REWARD_BIN_EDGES},
+        )
+    return training_metrics
 
-    # Calculate average rates per 1000 ticks
-    avg_time_steps = []
-    avg_eat_rates = []
-    avg_collision_rates = []
 
-    for i in range(num_windows):
-        # Slice the data for the current window
-        start_idx = i * WINDOW_SIZE
-        end_idx = start_idx + WINDOW_SIZE
+def graph(path: str = METRICS_PATH):
+    if training_metrics is not None:
+        training_metrics.close()
+    if not os.path.exists(path):
+        Logger.info(f"QLearn: no training metrics in {path}")
+        return
+    import matplotlib.pyplot as plt
 
-        # Calculate the averages
-        avg_time_steps.append(sum(time_steps[start_idx:end_idx]) / WINDOW_SIZE)
-        avg_eat_rates.append(
-            sum(eat_counts[start_idx:end_idx]) / (WINDOW_SIZE * REFRESH_INTERVAL)
-        )
-        avg_collision_rates.append(
-            sum(collision_counts[start_idx:end_idx]) / (WINDOW_SIZE * REFRESH_INTERVAL)
-        )
+    series = read_series(path)
+    samples = series["samples"]
+    recorded = samples > 0
+
+    # Calculate average rates per window
+    avg_time_steps = series["time_step_sum"][recorded] / samples[recorded]
+    avg_eat_rates = series["eat_sum"][recorded] / (samples[recorded] * REFRESH_INTERVAL)
+    avg_collision_rates = series["collision_sum"][recorded] / (samples[recorded] * REFRESH_INTERVAL)
+    window = int(series["window_size"])
 
     # Create the figure
     plt.figure(figsize=(14, 6))
@@ -149,7 +275,7 @@ def graph():
     )
     plt.xlabel("Time Steps (Average)")
     plt.ylabel("Eat Rate (per unit time)")
-    plt.title("Average Eat Rate Over Time (1000 Ticks Window)")
+    plt.title(f"Average Eat Rate Over Time ({window} Ticks Window)")
     plt.legend()
     plt.grid(True)
 
@@ -164,7 +290,7 @@ def graph():
     )
     plt.xlabel("Time Steps (Average)")
     plt.ylabel("Collision Rate (per unit time)")
-    plt.title("Average Collision Rate Over Time (1000 Ticks Window)")
+    plt.title(f"Average Collision Rate Over Time ({window} Ticks Window)")
     plt.legend()
     plt.grid(True)
 
@@ -174,9 +300,16 @@ def graph():
 
 
 class QLearnRobot(BaseRobot):
-    def __init__(self) -> None:
+    # ticks between checkpoints; 0 disables checkpointing
+    checkpoint_interval: int = CHECKPOINT_INTERVAL
+
+    def __init__(
+        self,
+        qtable_path: Optional[str] = None,  # warm-start from and checkpoint to this file
+    ) -> None:
         super().__init__()
-        self.cur_state = State(
+        # Q-table row of the current state, see ALL_STATES
+        self.cur_state: int = State(
             front_sensor=Distance.FAR,
             front_left_sensor=Distance.FAR,
             front_right_sensor=Distance.FAR,
@@ -184,10 +317,19 @@ class QLearnRobot(BaseRobot):
             right_sensor=Distance.FAR,
             food_distance=FoodDistance.FAR,
             food_angle=Angle.FRONT,
-        )
+        ).index
         self.cur_action = Action.FORWARD
         self.qtable = self.create_qtable()
         self.exploration_rate = EXPLORATION_RATE
+        self.qtable_path = qtable_path
+        if qtable_path is not None and os.path.exists(qtable_path):
+            self.load_qtable(qtable_path)
+        self.checkpoint = (
+            qtable_file.QTableCheckpoint(qtable_path, QTABLE_SCHEMA, QTABLE_ACTIONS)
+            if qtable_path is not None
+            else None
+        )
+        self.metrics = open_training_metrics()
 
     def dist_threshold(
         self, distance: float, threshold_1: float, threshold_2: float
@@ -227,73 +369,31 @@ class QLearnRobot(BaseRobot):
 
     def update_state(self) -> State:
         dist: DirectionalDistances = self.sensor_data.distances
-        self.cur_state = State(
-            left_sensor=self.dist_threshold(dist.left, 15, 30),
-            front_left_sensor=self.dist_threshold(dist.front_left, 15, 30),
-            front_sensor=self.dist_threshold(dist.front, 15, 30),
-            front_right_sensor=self.dist_threshold(dist.front_right, 15, 30),
-            right_sensor=self.dist_threshold(dist.right, 15, 30),
-            food_distance=self.get_enum_for_threshold(
-                FoodDistance, [100, 200], self.food_dist
-            ),
-            food_angle=self.angle_threshold(self.sensor_data.smell_nearest(), 30),
-        )
-        return self.cur_state
-
-    def generate_all_possible_states(self):
-        # Manually create all possible combinations of enum values
-        all_states = []
-
-        # Define the possible values for each field in State
-        left_sensors = [Distance.NEAR, Distance.MEDIUM, Distance.FAR]
-        front_left_sensors = [Distance.NEAR, Distance.MEDIUM, Distance.FAR]
-        front_sensors = [Distance.NEAR, Distance.MEDIUM, Distance.FAR]
-        front_right_sensors = [Distance.NEAR, Distance.MEDIUM, Distance.FAR]
-        right_sensors = [Distance.NEAR, Distance.MEDIUM, Distance.FAR]
-        food_distances = [FoodDistance.NEAR, FoodDistance.MIDDLE, FoodDistance.FAR]
-        food_angles = [Angle.LEFT, Angle.FRONT, Angle.RIGHT]
-
-        # Create combinations of the above values
-        for (
-            left_sensor,
-            front_left_sensor,
-            front_sensor,
-            front_right_sensor,
-            right_sensor,
-            food_distance,
-            food_angle,
-        ) in product(
-            left_sensors,
-            front_left_sensors,
-            front_sensors,
-            front_right_sensors,
-            right_sensors,
-            food_distances,
-            food_angles,
-        ):
-            state = State(
-                left_sensor=left_sensor,
-                front_left_sensor=front_left_sensor,
-                front_sensor=front_sensor,
-                front_right_sensor=front_right_sensor,
-                right_sensor=right_sensor,
-                food_distance=food_distance,
-                food_angle=food_angle,
+        digits = _STATE_DIGITS
+        near, medium = DISTANCE_THRESHOLDS
+        self.cur_state = STATE_ENCODER.encode(
+            (
+                digits["left_sensor"][self.dist_threshold(dist.left, near, medium)],
+                digits["front_left_sensor"][self.dist_threshold(dist.front_left, near, medium)],
+                digits["front_sensor"][self.dist_threshold(dist.front, near, medium)],
+                digits["front_right_sensor"][self.dist_threshold(dist.front_right, near, medium)],
+                digits["right_sensor"][self.dist_threshold(dist.right, near, medium)],
+                digits["food_distance"][
+                    self.get_enum_for_threshold(
+                        FoodDistance, list(FOOD_DISTANCE_THRESHOLDS), self.food_dist
+                    )
+                ],
+                digits["food_angle"][self.angle_threshold(self.sensor_data.smell_nearest(), ANGLE_THRESHOLD)],
             )
-            all_states.append(state)
-
-        return all_states
-
-    def create_qtable(self):
-        all_possible_states = self.generate_all_possible_states()
-
-        qtable = {}
+        )
+        return ALL_STATES[self.cur_state]
 
-        for state in all_possible_states:
-            for action in Action:
-                qtable[(state, action)] = 0
+    def generate_all_possible_states(self) -> List[State]:
+        return list(ALL_STATES)
 
-        return qtable
+    def create_qtable(self) -> np.ndarray:
+        """Q-values indexed by (state row, action index), see ALL_STATES and ACTIONS."""
+        return np.zeros((STATE_ENCODER.n_states, len(ACTIONS)))
 
     def update_qtable(
         self, reward: int, learning_rate: float = 0.5, discount_fac: float = 0.9
@@ -301,32 +401,37 @@ class QLearnRobot(BaseRobot):
         """
         Update the Q-value for the state-action pair based on the Q-learning rule.
         """
-        current_q_value = self.qtable.get((self.cur_state, self.cur_action), 0)
+        q_values = self.qtable[self.cur_state]
+        action = ACTION_INDEX[self.cur_action]
+        current_q_value = float(q_values[action])
 
-        max_next_q_value = max(
-            self.qtable.get((self.cur_state, next_action), 0) for next_action in Action
-        )
+        max_next_q_value = float(q_values.max())
 
         # Q-learning update rule
         new_q_value = current_q_value + learning_rate * (
             reward + discount_fac * max_next_q_value - current_q_value
         )
 
-        self.qtable[(self.cur_state, self.cur_action)] = new_q_value
+        q_values[action] = new_q_value
+        if self.checkpoint is not None:
+            self.checkpoint.mark((self.cur_state,))
+
+    def snapshot_qtable(self) -> np.ndarray:
+        return self.qtable.copy()
 
     def print_qtable(self):
-        qtable = self.qtable
+        entries = [
+            (str(state), str(action), float(self.qtable[row, column]))
+            for row, state in enumerate(ALL_STATES)
+            for column, action in enumerate(ACTIONS)
+        ]
         # Define the headers
         headers = ["State", "Action", "Q-value"]
 
         # Find the maximum width for each column for pretty printing
-        state_width = (
-            max(len(str(state)) for state, _ in qtable.keys()) + 2
-        )  # Corrected unpacking of keys
-        action_width = (
-            max(len(str(action)) for _, action in qtable.keys()) + 2
-        )  # Corrected unpacking of keys
-        qvalue_width = max(len(f"{qvalue:.2f}") for _, qvalue in qtable.items()) + 2
+        state_width = max(len(state) for state, _, _ in entries) + 2
+        action_width = max(len(action) for _, action, _ in entries) + 2
+        qvalue_width = max(len(f"{qvalue:.2f}") for _, _, qvalue in entries) + 2
 
         # Print headers with appropriate spacing
         print(
@@ -337,51 +442,44 @@ class QLearnRobot(BaseRobot):
         )  # Print a separator line
 
         # Print each state, action, and Q-value
-        for (state, action), qvalue in qtable.items():
+        for state, action, qvalue in entries:
             print(
-                f"{str(state):<{state_width}}{str(action):<{action_width}}{qvalue:<{qvalue_width}.2f}"
+                f"{state:<{state_width}}{action:<{action_width}}{qvalue:<{qvalue_width}.2f}"
             )
 
-    def load_qtable(self, filename="qtable.json"):
-        with open(filename, "r") as file:
-            serializable_qtable = json.load(file)
-
-        # Convert back to the original format with State objects
-        for state_dict_str, action in serializable_qtable.keys():
-            state_dict = json.loads(state_dict_str)
-            state = State(
-                left_sensor=Sensor(state_dict["left_sensor"]),
-                front_left_sensor=Sensor(state_dict["front_left_sensor"]),
-                front_sensor=Sensor(state_dict["front_sensor"]),
-                front_right_sensor=Sensor(state_dict["front_right_sensor"]),
-                right_sensor=Sensor(state_dict["right_sensor"]),
-                food_distance=Sensor(state_dict["food_distance"]),
-                food_angle=Sensor(state_dict["food_angle"]),
-            )
-            self.qtable[(state, action)] = serializable_qtable[(state_dict_str, action)]
-        print(f"Q-table loaded from {filename}")
-
-    def export_qtable(self, filename="qtable.json"):
-        # Convert the Q-table to a JSON-serializable format
-        serializable_qtable = {}
-        for (state, action), qvalue in self.qtable.items():
-            # Convert the state to a dictionary using the to_dict method
-            state_dict = state.to_dict()
-            serializable_qtable[(str(state_dict), action)] = qvalue
-
-        # Save to JSON file
-        with open(filename, "w") as file:
-            json.dump(serializable_qtable, file, indent=4)
-        print(f"Q-table exported to {filename}")
+    def load_qtable(self, filename=QTABLE_PATH):
+        if filename.endswith(".npy"):
+            qtable = np.load(filename)
+            if qtable.shape != self.qtable.shape:
+                raise ValueError(
+                    f"Q-table in {filename} has shape {qtable.shape}, expected {self.qtable.shape}"
+                )
+            self.qtable = qtable.astype(float)
+        else:
+            self.qtable = qtable_file.load_qtable(filename, QTABLE_SCHEMA, QTABLE_ACTIONS)
+        Logger.info(f"QLearn: Q-table loaded from {filename}")
+
+    def export_qtable(self, filename=QTABLE_PATH):
+        if filename.endswith(".npy"):
+            np.save(filename, self.qtable)
+        else:
+            qtable_file.save_qtable(filename, self.qtable, QTABLE_SCHEMA, QTABLE_ACTIONS)
+        Logger.info(f"QLearn: Q-table exported to {filename}")
+
+    def save_checkpoint(self) -> None:
+        """Write the Q-table rows updated since the last checkpoint."""
+        if self.checkpoint is not None:
+            self.checkpoint.write(self.qtable)
 
     def reward(self) -> int:
         reward = 0
+        state = ALL_STATES[self.cur_state]
 
-        if self.cur_state.food_distance == FoodDistance.FAR:
+        if state.food_distance == FoodDistance.FAR:
             reward += 1
-        elif self.cur_state.food_distance == FoodDistance.MIDDLE:
+        elif state.food_distance == FoodDistance.MIDDLE:
             reward += 3
-        elif self.cur_state.food_distance == FoodDistance.NEAR:
+        elif state.food_distance == FoodDistance.NEAR:
             reward += 5
 
         if self.cur_action == Action.FORWARD:
@@ -397,7 +495,7 @@ class QLearnRobot(BaseRobot):
 
         if (
             self.cur_action == Action.FORWARD
-            and self.cur_state.food_angle == Angle.FRONT
+            and state.food_angle == Angle.FRONT
         ):
             reward += 5
 
@@ -405,7 +503,7 @@ class QLearnRobot(BaseRobot):
             self.cur_action != Action.FORWARD
             or self.cur_action != Action.MOVE_LEFT
             or self.cur_action != Action.MOVE_RIGHT
-        ) and self.cur_state.food_angle == Angle.FRONT:
+        ) and state.food_angle == Angle.FRONT:
             reward -= 5
 
         if self.collision:
@@ -418,20 +516,13 @@ class QLearnRobot(BaseRobot):
 
     def choose_action(self):
         if random.uniform(0, 1) < self.exploration_rate:
-            self.cur_action = random.choice(list(Action))
+            self.cur_action = random.choice(ACTIONS)
         else:
-            q_values = [
-                self.qtable.get((self.cur_state, action), 0) for action in Action
-            ]
+            q_values = self.qtable[self.cur_state]
             # print(q_values)
-            max_q_value = max(q_values)
-            max_actions = [
-                action
-                for action, value in zip(Action, q_values)
-                if value == max_q_value
-            ]
+            max_actions = np.flatnonzero(q_values == q_values.max())
             # print(max_actions)
-            self.cur_action = random.choice(max_actions)
+            self.cur_action = ACTIONS[random.choice(max_actions)]
 
         # if self._sm.iteration % 100 == 0:
         #     self.exploration_rate = max(
@@ -439,22 +530,7 @@ class QLearnRobot(BaseRobot):
         #     )
         #     print("%.4f" % self.exploration_rate)
 
-        if self.cur_action == Action.FORWARD:
-            self.move(10)
-        elif self.cur_action == Action.LEFT:
-            self.turn(-20)
-        elif self.cur_action == Action.RIGHT:
-            self.turn(20)
-        elif self.cur_action == Action.MOVE_LEFT:
-            self.move(5)
-            self.turn(-20)
-        elif self.cur_action == Action.MOVE_RIGHT:
-            self.move(5)
-            self.turn(20)
-        elif self.cur_action == Action.EX_LEFT:
-            self.turn(-90)
-        elif self.cur_action == Action.EX_RIGHT:
-            self.turn(90)
+        apply_action(self, self.cur_action)
 
         return self.cur_action
 
@@ -465,11 +541,6 @@ class QLearnRobot(BaseRobot):
         pass
 
     def update(self):
-
-        # Track eat and collision counts per iteration
-        eat_counts.append(1 if self.just_eat else 0)
-        collision_counts.append(1 if self.collision else 0)
-        time_steps.append(self._sm.iteration)
         self.choose_action()
         self.update_state()
         reward = self.reward()
@@ -477,15 +548,37 @@ class QLearnRobot(BaseRobot):
         self.update_qtable(
             reward=reward, learning_rate=LEARNING_RATE, discount_fac=DISCOUNT_FACTOR
         )
+        tick = self._sm.iteration
+        self.metrics.add(tick, time_step=tick, eat=self.just_eat, collision=self.collision, reward=reward)
+        if self.checkpoint_interval and self._sm.iteration % self.checkpoint_interval == 0:
+            self.save_checkpoint()
         # self.print_qtable()
 
 
-def main():
+def main(headless: bool = False):
     """Main application entry point"""
+    if headless:
+        Logger.info("Starting headless Simbot with RL robot.")
+        simbot = Simbot(
+            robot_cls=lambda: QLearnRobot(qtable_path=QTABLE_PATH),
+            num_robots=1,
+            max_tick=100000,
+            map="default_map2",
+            simulation_forever=False,
+            food_move_after_eat=True,
+            customfn_after_simulation=after_simulation,
+        )
+        for stats in simbot.run():
+            Logger.info(f"Simulation: {stats}")
+        return
+
+    # the Kivy front end opens a window, headless runs must not import it
+    from pysimbotlib.core import PySimbotApp
+
     Logger.info("Starting PySimbotApp with RL robot.")
     try:
         app = PySimbotApp(
-            robot_cls=QLearnRobot,
+            robot_cls=lambda: QLearnRobot(qtable_path=QTABLE_PATH),
             num_robots=1,
             max_tick=100000,
             interval=REFRESH_INTERVAL,
@@ -501,6 +594,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
-
-graph()
+    main(headless="--headless" in sys.argv)
+    graph()
@@ -0,0 +1,267 @@
+"""Headless Q-learning across many environments stepped in lockstep.
+
+Every environment is an independent Simbot with one robot. On each tick the trainer
+encodes the states of all robots, picks their epsilon-greedy actions and updates the
+shared Q-table in batched array operations; only moving the robots and reading their
+sensors stays per environment.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+import math
+import os
+import random
+import sys
+
+import numpy as np
+
+from pysimbotlib.core import Robot, Simbot
+from kivy.logger import Logger
+from q_learning_robot import (
+    ACTIONS,
+    CHECKPOINT_INTERVAL,
+    DISCOUNT_FACTOR,
+    EXPLORATION_RATE,
+    LEARNING_RATE,
+    QTABLE_ACTIONS,
+    QTABLE_PATH,
+    QTABLE_SCHEMA,
+    STATE_ENCODER,
+    Action,
+    apply_action,
+    encode_states,
+)
+import qtable_file
+
+_FORWARD = ACTIONS.index(Action.FORWARD)
+_FOOD_DISTANCE_DIGIT = 5
+_FOOD_ANGLE_DIGIT = 6
+_FOOD_ANGLE_FRONT = 1
+
+
+class TrainerRobot(Robot):
+    """Robot that performs the action the trainer chose for it on its next update."""
+
+    action: Optional[Action] = None
+
+    def update(self) -> None:
+        if self.action is not None:
+            apply_action(self, self.action)
+
+
+@dataclass
+class TrainingStats:
+    ticks: int
+    episodes: int
+    transitions: int
+    eat_count: int
+    collision_count: int
+    mean_reward: float
+
+
+def batch_rewards(states: np.ndarray, actions: np.ndarray, collisions: np.ndarray, eats: np.ndarray) -> np.ndarray:
+    """`QLearnRobot.reward` for many (state row, action index) pairs at once."""
+    food_distance = (states // STATE_ENCODER.strides[_FOOD_DISTANCE_DIGIT]) % STATE_ENCODER.radices[_FOOD_DISTANCE_DIGIT]
+    food_front = (states // STATE_ENCODER.strides[_FOOD_ANGLE_DIGIT]) % STATE_ENCODER.radices[_FOOD_ANGLE_DIGIT] == _FOOD_ANGLE_FRONT
+    forward = actions == _FORWARD
+    # FoodDistance digits NEAR, MIDDLE, FAR score 5, 3, 1
+    rewards = 5 - 2 * food_distance
+    rewards += 2 * forward
+    rewards += 5 * (forward & food_front)
+    # QLearnRobot.reward penalizes every action while the food is in front, FORWARD included
+    rewards -= 5 * food_front
+    rewards -= 20 * collisions
+    return np.where(eats, 100, rewards)
+
+
+class QLearningTrainer:
+    """Trains one shared Q-table on `num_envs` headless environments in lockstep.
+
+    A transition is learned exactly as in `QLearnRobot.update`: the robot acts, its new
+    state s' is sensed and Q[s', a] moves towards reward + discount_factor * max Q[s'].
+    When several environments update the same row on one tick, the updates are applied
+    in environment order, so the table matches a sequential pass over the environments.
+    Environments that reach max_tick start a new episode on the next tick; the transition
+    of their last tick is not learned because their objectives are already removed.
+    """
+
+    def __init__(
+        self,
+        num_envs: int = 8,
+        seed: Optional[int] = None,
+        qtable: Optional[np.ndarray] = None,
+        learning_rate: float = LEARNING_RATE,
+        discount_factor: float = DISCOUNT_FACTOR,
+        exploration_rate: float = EXPLORATION_RATE,
+        map: str = "default_map2",
+        max_tick: int = 4000,
+        qtable_path: Optional[str] = None,  # warm-start from and checkpoint to this file
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+    ) -> None:
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1.")
+        if seed is not None:
+            # spawn positions come from the random module
+            random.seed(seed)
+        self.rng = np.random.default_rng(seed)
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.exploration_rate = exploration_rate
+        if qtable is None and qtable_path is not None and os.path.exists(qtable_path):
+            qtable = qtable_file.load_qtable(qtable_path, QTABLE_SCHEMA, QTABLE_ACTIONS)
+            Logger.info(f"QLearn: Q-table loaded from {qtable_path}")
+        self.qtable = (
+            np.zeros((STATE_ENCODER.n_states, len(ACTIONS)))
+            if qtable is None
+            else np.array(qtable, dtype=float)
+        )
+        self.checkpoint = (
+            qtable_file.QTableCheckpoint(qtable_path, QTABLE_SCHEMA, QTABLE_ACTIONS)
+            if qtable_path is not None
+            else None
+        )
+        self.checkpoint_interval = checkpoint_interval
+        self.envs: List[Simbot] = [
+            Simbot(
+                robot_cls=TrainerRobot,
+                num_robots=1,
+                max_tick=max_tick,
+                map=map,
+                simulation_forever=True,
+                food_move_after_eat=True,
+            )
+            for _ in range(num_envs)
+        ]
+        self.ticks = 0
+        self.episodes = 0
+        self.transitions = 0
+        self.eat_count = 0
+        self.collision_count = 0
+        self.reward_sum = 0.0
+        for env in self.envs:
+            env.step()
+        self.states = self.sense()
+
+    @property
+    def num_envs(self) -> int:
+        return len(self.envs)
+
+    def sense(self, indexes: Optional[List[int]] = None) -> np.ndarray:
+        """Q-table rows of the robots in the given environments, all of them by default."""
+        envs = self.envs if indexes is None else [self.envs[i] for i in indexes]
+        distances = np.empty((len(envs), 8))
+        food_distances = np.empty(len(envs))
+        food_angles = np.empty(len(envs))
+        for i, env in enumerate(envs):
+            robot = env.robots[0]
+            food = env.nearest_objective(robot.pos)
+            distances[i] = robot.distance()
+            # same arithmetic as BaseRobot.food_dist, so values on a threshold digitize alike
+            food_distances[i] = math.sqrt((robot.pos[0] - food.pos[0]) ** 2 + (robot.pos[1] - food.pos[1]) ** 2)
+            food_angles[i] = robot.calc_angle_to_objective(food)
+        return encode_states(distances, food_distances, food_angles)
+
+    def choose_actions(self, states: np.ndarray) -> np.ndarray:
+        """Epsilon-greedy action indexes, ties between the best actions broken at random."""
+        n = len(states)
+        q_values = self.qtable[states]
+        best = q_values == q_values.max(axis=1, keepdims=True)
+        greedy = np.argmax(best * self.rng.random((n, len(ACTIONS))), axis=1)
+        explore = self.rng.random(n) < self.exploration_rate
+        return np.where(explore, self.rng.integers(0, len(ACTIONS), n), greedy)
+
+    def update_qtable(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray) -> None:
+        rows, first, counts = np.unique(states, return_index=True, return_counts=True)
+        single = first[counts == 1]
+        q_values = self.qtable[states[single]]
+        picked = q_values[np.arange(len(single)), actions[single]]
+        self.qtable[states[single], actions[single]] = picked + self.learning_rate * (
+            rewards[single] + self.discount_factor * q_values.max(axis=1) - picked
+        )
+        # a row shared by several environments sees their updates one after another
+        for row in rows[counts > 1]:
+            q_values = self.qtable[row]
+            for i in np.flatnonzero(states == row):
+                current = q_values[actions[i]]
+                q_values[actions[i]] = current + self.learning_rate * (
+                    rewards[i] + self.discount_factor * q_values.max() - current
+                )
+
+    def step(self) -> np.ndarray:
+        """Advances every environment by one tick and learns from it; returns the rewards.
+
+        Environments whose episode ended on this tick get a reward of 0.
+        """
+        actions = self.choose_actions(self.states)
+        collisions = np.zeros(self.num_envs, dtype=bool)
+        eats = np.zeros(self.num_envs, dtype=bool)
+        ended = []
+        for i, env in enumerate(self.envs):
+            robot = env.robots[0]
+            robot.action = ACTIONS[actions[i]]
+            if env.step() is not None:
+                ended.append(i)
+            collisions[i] = robot.collision
+            eats[i] = robot.just_eat
+
+        live = np.ones(self.num_envs, dtype=bool)
+        live[ended] = False
+        states = self.states.copy()
+        if ended:
+            states[live] = self.sense(np.flatnonzero(live).tolist())
+        else:
+            states = self.sense()
+        rewards = np.where(live, batch_rewards(states, actions, collisions, eats), 0)
+        self.update_qtable(states[live], actions[live], rewards[live])
+        if self.checkpoint is not None:
+            self.checkpoint.mark(states[live].tolist())
+
+        self.ticks += 1
+        self.transitions += int(np.count_nonzero(live))
+        self.eat_count += int(np.count_nonzero(eats))
+        self.collision_count += int(np.count_nonzero(collisions))
+        self.reward_sum += float(rewards.sum())
+
+        if ended:
+            self.episodes += len(ended)
+            for i in ended:
+                # respawn the robot and its food for the next episode
+                self.envs[i].step()
+            states[ended] = self.sense(ended)
+        self.states = states
+        return rewards
+
+    def save_checkpoint(self) -> None:
+        """Write the Q-table rows updated since the last checkpoint."""
+        if self.checkpoint is not None:
+            self.checkpoint.write(self.qtable)
+
+    def train(self, ticks: int) -> TrainingStats:
+        """Runs `ticks` lockstep ticks, checkpointing every `checkpoint_interval` ticks."""
+        for _ in range(ticks):
+            self.step()
+            if self.checkpoint_interval and self.ticks % self.checkpoint_interval == 0:
+                self.save_checkpoint()
+        self.save_checkpoint()
+        return self.stats()
+
+    def stats(self) -> TrainingStats:
+        return TrainingStats(
+            ticks=self.ticks,
+            episodes=self.episodes,
+            transitions=self.transitions,
+            eat_count=self.eat_count,
+            collision_count=self.collision_count,
+            mean_reward=self.reward_sum / max(self.transitions, 1),
+        )
+
+
+def main(num_envs: int = 8, ticks: int = 100000) -> None:
+    trainer = QLearningTrainer(num_envs=num_envs, qtable_path=QTABLE_PATH)
+    Logger.info(f"QLearn: training on {num_envs} environments for {ticks} ticks")
+    Logger.info(f"QLearn: {trainer.train(ticks)}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,134 @@
+"""Versioned binary Q-table files.
+
+Layout, little-endian:
+    magic b"PSQT" | version uint16 | header length uint32 | JSON header | padding | data
+
+The JSON header records the state schema (every state field with its values, in
+encoding order), the action names, the table shape and the byte offset of the data.
+The data is a raw C-order float32 array aligned to 64 bytes, so the file can be
+memory-mapped with np.memmap.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"PSQT"
+VERSION = 1
+DTYPE = np.dtype("<f4")
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct("<4sHI")
+
+# ((field name, (value, ...)), ...) in state encoding order
+StateSchema = Sequence[Tuple[str, Sequence[str]]]
+
+
+def make_header(state_schema: StateSchema, actions: Sequence[str]) -> Dict:
+    n_states = int(np.prod([len(values) for _, values in state_schema], dtype=np.int64))
+    return {
+        "state_schema": [[name, list(values)] for name, values in state_schema],
+        "actions": list(actions),
+        "shape": [n_states, len(actions)],
+        "dtype": DTYPE.str,
+    }
+
+
+def _encode_header(header: Dict) -> bytes:
+    body = json.dumps(header).encode("utf-8")
+    offset = _PREFIX.size + len(body)
+    padding = -offset % ALIGNMENT
+    return _PREFIX.pack(MAGIC, VERSION, len(body) + padding) + body + b" " * padding
+
+
+def read_header(path: str) -> Dict:
+    """Header of a Q-table file, with the data offset under "offset"."""
+    with open(path, "rb") as file:
+        prefix = file.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path} is not a Q-table file")
+        magic, version, length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Q-table file")
+        if version != VERSION:
+            raise ValueError(f"{path} has Q-table format version {version}, expected {VERSION}")
+        header = json.loads(file.read(length).decode("utf-8"))
+    header["offset"] = _PREFIX.size + length
+    return header
+
+
+def check_header(header: Dict, state_schema: StateSchema, actions: Sequence[str], path: str = "") -> None:
+    expected = make_header(state_schema, actions)
+    for key in ("state_schema", "actions", "shape", "dtype"):
+        if header[key] != expected[key]:
+            raise ValueError(f"Q-table {path} has {key} {header[key]}, expected {expected[key]}")
+
+
+def save_qtable(path: str, qtable: np.ndarray, state_schema: StateSchema, actions: Sequence[str]) -> None:
+    """Write the whole table, replacing the file atomically."""
+    header = make_header(state_schema, actions)
+    if list(qtable.shape) != header["shape"]:
+        raise ValueError(f"Q-table has shape {qtable.shape}, the schema expects {tuple(header['shape'])}")
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_encode_header(header))
+        file.write(np.ascontiguousarray(qtable, dtype=DTYPE).tobytes())
+    os.replace(temporary, path)
+
+
+def open_qtable(
+    path: str,
+    state_schema: Optional[StateSchema] = None,
+    actions: Optional[Sequence[str]] = None,
+    mode: str = "r",
+) -> np.memmap:
+    """Memory-map the table of a Q-table file; "r+" writes through to the file."""
+    header = read_header(path)
+    if state_schema is not None and actions is not None:
+        check_header(header, state_schema, actions, path)
+    return np.memmap(path, dtype=np.dtype(header["dtype"]), mode=mode, offset=header["offset"], shape=tuple(header["shape"]))
+
+
+def load_qtable(
+    path: str,
+    state_schema: Optional[StateSchema] = None,
+    actions: Optional[Sequence[str]] = None,
+) -> np.ndarray:
+    """Read the table into a float64 array, checking it against the schema when given."""
+    table = open_qtable(path, state_schema, actions)
+    try:
+        return np.array(table, dtype=float)
+    finally:
+        del table
+
+
+class QTableCheckpoint:
+    """Keeps a Q-table file up to date by rewriting only the rows changed since the last write.
+
+    The first write, or a write after the file went missing, saves the whole table.
+    """
+
+    def __init__(self, path: str, state_schema: StateSchema, actions: Sequence[str]) -> None:
+        self.path = path
+        self.state_schema = state_schema
+        self.actions = actions
+        self._dirty: Set[int] = set()
+        self._synced = False
+
+    def mark(self, rows: Iterable[int]) -> None:
+        self._dirty.update(rows)
+
+    def write(self, qtable: np.ndarray) -> None:
+        if not self._synced or not os.path.exists(self.path):
+            save_qtable(self.path, qtable, self.state_schema, self.actions)
+            self._synced = True
+        elif self._dirty:
+            rows = np.fromiter(self._dirty, dtype=np.intp, count=len(self._dirty))
+            table = open_qtable(self.path, self.state_schema, self.actions, mode="r+")
+            table[rows] = qtable[rows]
+            table.flush()
+            del table
+        self._dirty.clear()
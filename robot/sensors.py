@@ -1,4 +1,4 @@
-from typing import Callable, Tuple
+from typing import Callable, Dict, Hashable, Tuple
 from collections import namedtuple
 from kivy.logger import Logger
 import numpy as np
@@ -30,11 +30,17 @@ class SensorData:
         safe_dist: float = 30,
         close_dist: float = 5,
         hit_dist: float = 0,
+        stamp: Callable[[], Hashable] = None,
     ) -> None:
-        self._distances = distances
+        # readings are kept while stamp() returns the same value, see Robot.sense_stamp;
+        # without a stamp every read senses again
+        self._stamp = stamp
+        self._snapshot_stamp: Hashable = None
+        self._snapshot: Dict[Hashable, object] = {}
+        self._distances = self._per_tick("distances", lambda: tuple(distances()))
         self.stuck = stuck
-        self.smell = smell
-        self.smell_nearest = smell_nearest
+        self.smell = self._per_tick("smell", smell)
+        self.smell_nearest = self._per_tick("smell_nearest", smell_nearest)
         self.SAFE_DIST = safe_dist
         self.CLOSE_DIST = close_dist
         self.HIT_DIST = hit_dist
@@ -49,6 +55,21 @@ class SensorData:
             "front_left",
         ]
 
+    def _per_tick(self, name: str, read: Callable) -> Callable:
+        def snapshot(*args):
+            if self._stamp is None:
+                return read(*args)
+            stamp = self._stamp()
+            if stamp != self._snapshot_stamp:
+                self._snapshot_stamp = stamp
+                self._snapshot = {}
+            key = (name, args)
+            if key not in self._snapshot:
+                self._snapshot[key] = read(*args)
+            return self._snapshot[key]
+
+        return snapshot
+
     @property
     def distances(self) -> DirectionalDistances:
         return DirectionalDistances(*self._distances())
@@ -1,4 +1,4 @@
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional, Union
 from abc import ABC, abstractmethod
 from kivy.logger import Logger
 from sensors import SensorData, DirectionalDistances
@@ -8,7 +8,7 @@ from fuzzy_logic import (
     FuzzyInterface,
     FuzzyVariable,
 )
-from GeneticAlgorithm import Genotype
+from GeneticAlgorithm import Genotype, CompiledGenotype
 import random
 
 
@@ -95,6 +95,13 @@ class FuzzyTurn(Turn):
     def calculate(self) -> float:
         sensor: Dict[str, float] = self.sensor.distances_as_dict()
         sensor["smell"] = self.sensor.smell_nearest_degree(offset=45)
+        # sensed once here instead of inside every rule
+        smell_side = self.sensor.smell_side()
+        sensor["smell_side"] = sensor[smell_side]
+        sensor["smell_side_left"] = sensor[self.sensor.side_with_offset(smell_side, -1)]
+        sensor["smell_side_right"] = sensor[self.sensor.side_with_offset(smell_side, 1)]
+        sensor["smell_angle"] = self.sensor.smell()
+        sensor["smell_sign"] = self.sensor.smell_food_on_left_sign()
         turn_value = self.fuzzy_interface.evaluate_rules(sensor)
         return turn_value
 
@@ -116,12 +123,11 @@ class FuzzyMove(Move):
 
 
 class GeneticTurn(Turn):
-    def __init__(self, sensor: SensorData, genotype: Genotype):
+    def __init__(self, sensor: SensorData, genotype: Union[Genotype, CompiledGenotype]):
         self.sensor = sensor
         self.genotype = genotype
 
     def calculate(self) -> float:
-        self.sensor.distances_as_dict()
         turn, _ = self.genotype.evaluate(
             args={
                 **self.sensor.distances_as_input(),
@@ -132,12 +138,11 @@ class GeneticTurn(Turn):
 
 
 class GeneticMove(Move):
-    def __init__(self, sensor: SensorData, genotype: Genotype):
+    def __init__(self, sensor: SensorData, genotype: Union[Genotype, CompiledGenotype]):
         self.sensor = sensor
         self.genotype = genotype
 
     def calculate(self) -> float:
-        self.sensor.distances_as_dict()
         _, move = self.genotype.evaluate(
             args={
                 **self.sensor.distances_as_input(),
@@ -148,21 +153,26 @@ class GeneticMove(Move):
 
 
 class NNTurn(Turn):
-    def __init__(self, sensor: SensorData, model, scaler, config):
+    def __init__(self, sensor: SensorData, model, scaler, config, predict: Optional[Callable] = None):
+        """`predict`, when given, returns this robot's row of a batched forward pass."""
         self.sensor = sensor
         self.model = model
         self.scaler = scaler
         self.config = config
+        self.predict = predict
 
     def calculate(self) -> float:
         """Predict robot movement using neural network"""
         try:
-            output = self.model.predict(
-                self.sensor.sensor_input(self.scaler, self.config), verbose=0
-            )
+            if self.predict is not None:
+                output = self.predict()
+            else:
+                output = self.model.predict(
+                    self.sensor.sensor_input(self.scaler, self.config), verbose=0
+                )[0]
 
             turn = self.scaler.scale(
-                output[0][0], self.config.NORMALIZED_RANGE, self.config.TURN_RANGE
+                output[0], self.config.NORMALIZED_RANGE, self.config.TURN_RANGE
             ).item()
 
             return turn
@@ -173,21 +183,26 @@ class NNTurn(Turn):
 
 
 class NNMove(Move):
-    def __init__(self, sensor: SensorData, model, scaler, config):
+    def __init__(self, sensor: SensorData, model, scaler, config, predict: Optional[Callable] = None):
+        """`predict`, when given, returns this robot's row of a batched forward pass."""
         self.sensor = sensor
         self.model = model
         self.scaler = scaler
         self.config = config
+        self.predict = predict
 
     def calculate(self) -> float:
         """Predict robot movement using neural network"""
         try:
-            output = self.model.predict(
-                self.sensor.sensor_input(self.scaler, self.config), verbose=0
-            )
+            if self.predict is not None:
+                output = self.predict()
+            else:
+                output = self.model.predict(
+                    self.sensor.sensor_input(self.scaler, self.config), verbose=0
+                )[0]
 
             move = self.scaler.scale(
-                output[0][1], self.config.NORMALIZED_RANGE, self.config.MOVE_RANGE
+                output[1], self.config.NORMALIZED_RANGE, self.config.MOVE_RANGE
             ).item()
 
             return move
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the robot scripts and pysimbotlib are imported from robot/, like the scripts import each other
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
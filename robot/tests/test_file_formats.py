@@ -0,0 +1,135 @@
+"""Round trips through the binary formats: Q-tables (PSQT), compiled maps (PSMC), history (PSHI) and metrics (PSMS)."""
+
+import numpy as np
+import pytest
+
+import qtable_file
+from metrics import MetricSeries, read_series
+from pysimbotlib.core.History import (
+    DISTANCE_COLUMNS,
+    HistoryRecorder,
+    count_history_rows,
+    iter_history_blocks,
+    read_history,
+)
+from pysimbotlib.core.Map import compile_map, compiled_map_path, load_compiled_map, read_compiled_map, write_compiled_map
+from pysimbotlib.core.MapGenerator import generate_map
+
+SCHEMA = (("front", ("NEAR", "MEDIUM", "FAR")), ("food", ("LEFT", "FRONT", "RIGHT")))
+ACTIONS = ("FORWARD", "LEFT", "RIGHT")
+
+
+def test_qtable_round_trip(tmp_path):
+    path = str(tmp_path / "qtable.qtb")
+    qtable = np.random.default_rng(0).normal(size=(9, 3)).astype(np.float32).astype(float)
+    qtable_file.save_qtable(path, qtable, SCHEMA, ACTIONS)
+
+    assert np.array_equal(qtable_file.load_qtable(path, SCHEMA, ACTIONS), qtable)
+    header = qtable_file.read_header(path)
+    assert header["shape"] == [9, 3]
+    assert header["offset"] % qtable_file.ALIGNMENT == 0
+    with pytest.raises(ValueError):
+        qtable_file.load_qtable(path, SCHEMA, ACTIONS[:2])
+
+
+def test_qtable_checkpoint_writes_changed_rows(tmp_path):
+    path = str(tmp_path / "qtable.qtb")
+    qtable = np.zeros((9, 3))
+    checkpoint = qtable_file.QTableCheckpoint(path, SCHEMA, ACTIONS)
+    checkpoint.write(qtable)
+    qtable[[2, 7]] = [[1, 2, 3], [4, 5, 6]]
+    checkpoint.mark([2, 7])
+    checkpoint.write(qtable)
+    assert np.array_equal(qtable_file.load_qtable(path, SCHEMA, ACTIONS), qtable)
+
+
+def test_compiled_map_round_trip(tmp_path):
+    map_file = generate_map(str(tmp_path / "generated.kv"), 40, seed=1)
+    with open(map_file) as f:
+        compiled = compile_map(f.read(), cell_size=50, arena_size=(700, 600))
+    path = str(tmp_path / "generated.psmc")
+    write_compiled_map(compiled, path)
+
+    loaded = read_compiled_map(path)
+    assert loaded.source_hash == compiled.source_hash
+    assert loaded.arena_size == compiled.arena_size
+    assert loaded.cell_size == compiled.cell_size
+    for name in ("bboxes", "segments", "cell_ranges"):
+        assert np.array_equal(getattr(loaded, name), getattr(compiled, name))
+        assert getattr(loaded, name).dtype == getattr(compiled, name).dtype
+
+
+def test_compiled_map_cache(tmp_path):
+    map_file = generate_map(str(tmp_path / "generated.kv"), 40, seed=1)
+    cache_dir = str(tmp_path / "cache")
+    first = load_compiled_map(map_file, 50, (700, 600), cache_dir)
+    cached = compiled_map_path(map_file, 50, (700, 600), cache_dir)
+    assert np.array_equal(read_compiled_map(cached).bboxes, first.bboxes)
+
+    # an edited map replaces its cache file
+    generate_map(map_file, 40, seed=2)
+    edited = load_compiled_map(map_file, 50, (700, 600), cache_dir)
+    assert not np.array_equal(edited.bboxes, first.bboxes)
+    assert read_compiled_map(cached).source_hash == edited.source_hash
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    uncached = load_compiled_map(map_file, 50, (700, 600), None)
+    assert np.array_equal(uncached.segments, edited.segments)
+
+
+def test_history_round_trip(tmp_path):
+    path = str(tmp_path / "history1.psh")
+    rng = np.random.default_rng(0)
+    rows = 23
+    distances = rng.uniform(0, 100, size=(rows, len(DISTANCE_COLUMNS))).astype(np.float32)
+    angles = rng.uniform(-180, 180, size=rows).astype(np.float32)
+    recorder = HistoryRecorder(path, buffer_rows=5)
+    recorder.append(0, 0, distances[0], angles[0], 5, 0)
+    recorder.extend(1, np.arange(1, rows), distances[1:], angles[1:], -5, 5)
+    assert len(recorder) == rows
+    recorder.close()
+
+    history = read_history(path)
+    assert np.array_equal(history["tick"], [0] + [1] * (rows - 1))
+    assert np.array_equal(history["robot"], np.arange(rows))
+    for i, name in enumerate(DISTANCE_COLUMNS):
+        assert np.array_equal(history[name], distances[:, i])
+    assert np.array_equal(history["angle"], angles)
+    assert np.array_equal(history["turn"], [5] + [-5] * (rows - 1))
+    assert np.array_equal(history["move"], [0] + [5] * (rows - 1))
+    assert count_history_rows(path) == rows
+    assert [len(block["tick"]) for block in iter_history_blocks(path)] == [5, 5, 5, 5, 3]
+
+
+def test_metrics_round_trip(tmp_path):
+    path = str(tmp_path / "metrics.bin")
+    series = MetricSeries(("reward",), 10, path=path, histograms={"reward": (0, 5)}, buffer_size=2)
+    for tick, reward in ((1, -1), (4, 7), (12, 2), (35, 5)):
+        series.add(tick, reward=reward)
+    series.close()
+
+    stored = read_series(path)
+    assert int(stored["window_size"]) == 10
+    assert np.array_equal(stored["window"], [0, 1, 2, 3])
+    assert np.array_equal(stored["samples"], [2, 1, 0, 1])
+    assert np.array_equal(stored["reward_sum"], [6, 2, 0, 5])
+    assert np.array_equal(stored["reward_min"], [-1, 2, 0, 5])
+    assert np.array_equal(stored["reward_max"], [7, 2, 0, 5])
+    assert np.array_equal(stored["reward_bin0"], [1, 0, 0, 0])
+    assert np.array_equal(stored["reward_bin1"], [0, 1, 0, 0])
+    assert np.array_equal(stored["reward_bin2"], [1, 0, 0, 1])
+    with pytest.raises(ValueError):
+        series.add(40, reward=1)
+
+
+def test_metrics_flush_keeps_the_open_window(tmp_path):
+    path = str(tmp_path / "metrics.bin")
+    series = MetricSeries(("reward",), 10, path=path)
+    series.add(1, reward=1)
+    series.flush()
+    series.add(2, reward=2)
+    series.flush()
+    assert np.array_equal(series.read()["window"], [0])
+    assert np.array_equal(series.read()["reward_sum"], [3])
+    series.close()
+    assert np.array_equal(read_series(path)["window"], [0])
@@ -0,0 +1,68 @@
+"""Compiled fuzzy rules against the same rules written as callables over fuzzified inputs."""
+
+import math
+import random
+
+import pytest
+
+from fuzzy_logic import CombinedMembershipFunctions, FuzzyInterface, MembershipFunction
+
+
+def make_inputs():
+    distance = CombinedMembershipFunctions()
+    distance.add_memberships(
+        {
+            "near": MembershipFunction.create("trapezoidal", a=-1, b=0, c=10, d=40),
+            "medium": MembershipFunction.create("triangular", a=20, b=50, c=80),
+            "far": MembershipFunction.create("s", a=50, b=100),
+        }
+    )
+    angle = CombinedMembershipFunctions()
+    angle.add_memberships(
+        {
+            "left": MembershipFunction.create("sigmoidal", a=-0.1, c=-30),
+            "center": MembershipFunction.create("gaussian", c=0, sigma=25),
+            "right": MembershipFunction.create("bell", a=60, b=2, c=90),
+        }
+    )
+    return {"front": distance, "side": distance, "angle": angle}
+
+
+# (clauses, consequent, t-norm) next to the callable computing the same firing strength
+RULES = [
+    (
+        ((("front", "near"),), -40.0, "product"),
+        lambda f, crisp: f["front"]["near"],
+    ),
+    (
+        ((("front", "far"), ("angle", "center")), 10.0, "min"),
+        lambda f, crisp: min(f["front"]["far"], f["angle"]["center"]),
+    ),
+    (
+        ((("front", "medium"), (("side", "near"), ("side", "medium")), ("angle", "left")), 25.0, "product"),
+        lambda f, crisp: f["front"]["medium"] * max(f["side"]["near"], f["side"]["medium"]) * f["angle"]["left"],
+    ),
+    (
+        ((("angle", "right"), ("side", "far"), ("sign", None)), -15.0, "mean"),
+        lambda f, crisp: (f["angle"]["right"] + f["side"]["far"] + crisp["sign"]) / 3,
+    ),
+]
+
+
+def test_compiled_rules_match_callables():
+    input_mfs = make_inputs()
+    compiled = FuzzyInterface(input_mfs=input_mfs)
+    callables = FuzzyInterface(input_mfs=input_mfs)
+    for (clauses, consequent, t_norm), strength in RULES:
+        compiled.add_rule(clauses, consequent, t_norm)
+        # callable rules only get the fuzzified inputs, the crisp one is read from the loop below
+        callables.add_rule(lambda f, strength=strength: strength(f, crisp), consequent)
+
+    rng = random.Random(0)
+    for _ in range(500):
+        crisp = {"sign": rng.choice((0.0, 1.0))}
+        inputs = {"front": rng.uniform(0, 100), "side": rng.uniform(0, 100), "angle": rng.uniform(-180, 180), **crisp}
+        expected = callables.evaluate_rules(inputs)
+        # equal up to the last bits of NumPy's vectorized exp and division
+        assert compiled.evaluate_rules(inputs) == pytest.approx(expected, rel=1e-12, abs=1e-12)
+        assert math.isfinite(expected)
@@ -0,0 +1,124 @@
+"""Packed genotypes and compiled genotypes against the per-gene Genotype they stand in for."""
+
+import random
+
+from fuzzy_logic import CombinedMembershipFunctions, MembershipFunction
+from GeneticAlgorithm import Chromosome, Genotype
+from GeneticAlgorithm.mutation import BitFlipMutation, CompositeMutation, GaussianMutation, RandomResetMutation
+
+GENERATIONS = 30
+
+
+def make_template() -> Genotype:
+    chromosome = Chromosome()
+    for _ in range(3):
+        chromosome.add_rule_gene(value="_", mapping=dict(_=lambda **_: 1, a=lambda **_: 0, b=lambda **_: 0))
+    chromosome.add_rule_gene(value="on", mapping=dict(on=lambda **_: 1, off=lambda **_: 0))
+    chromosome.add_return_gene(name="turn", value=180.0, func=lambda x: x)
+    chromosome.add_return_gene(name="move", value=3, func=lambda x: x)
+    genotype = Genotype()
+    for _ in range(5):
+        genotype.add_chromosome(chromosome.clone())
+    return genotype
+
+
+def genotype_mutate(genotype: Genotype, strategy) -> None:
+    """The mutation operators as they worked gene by gene on Genotype values."""
+    for chromosome in genotype.chromosomes:
+        if isinstance(strategy, BitFlipMutation):
+            for gene in chromosome.rules_list:
+                if len(gene.variant) == 2 and strategy.apply_mutation_probability():
+                    gene.value = gene.variant[1 - gene.variant.index(gene.value)]
+            for gene in chromosome.returns_list:
+                if isinstance(gene.value, int) and strategy.apply_mutation_probability():
+                    gene.value = 1 - gene.value
+        elif isinstance(strategy, RandomResetMutation):
+            for gene in chromosome.rules_list:
+                if strategy.apply_mutation_probability():
+                    gene.value = random.choice(gene.variant)
+            for gene in chromosome.returns_list:
+                if strategy.apply_mutation_probability():
+                    gene.value = random.randrange(gene.variant[0], gene.variant[1])
+        elif isinstance(strategy, GaussianMutation):
+            for gene in chromosome.returns_list:
+                if isinstance(gene.value, float) and strategy.apply_mutation_probability():
+                    gene.value += random.gauss(strategy.mean, strategy.stddev)
+
+
+def test_packed_mutation_matches_genotype_mutation():
+    strategies = [RandomResetMutation(0.3), GaussianMutation(0.3, stddev=5.0), BitFlipMutation(0.3)]
+    mutation = CompositeMutation(strategies)
+    random.seed(5)
+    genotypes = [make_template() for _ in range(6)]
+    # half keep the template's int return gene, half are all floats
+    for genotype in genotypes[3:]:
+        genotype.scamble()
+    packed = [genotype.pack() for genotype in genotypes]
+
+    for _ in range(GENERATIONS):
+        state = random.getstate()
+        for genotype in genotypes:
+            for strategy in strategies:
+                genotype_mutate(genotype, strategy)
+        random.setstate(state)
+        for genotype in packed:
+            mutation.mutate(genotype)
+
+        for genotype, packed_genotype in zip(genotypes, packed):
+            expected = genotype.get_values()
+            values = packed_genotype.get_values()
+            assert values == expected
+            assert [[type(value) for value in row] for row in values] == [[type(value) for value in row] for row in expected]
+
+
+def make_fuzzy_genotype(seed: int):
+    distance = CombinedMembershipFunctions()
+    distance.add_membership("near", MembershipFunction.create(function="triangular", a=0, b=0, c=100))
+    distance.add_membership("far", MembershipFunction.create(function="triangular", a=0, b=100, c=100))
+    smell = CombinedMembershipFunctions()
+    smell.add_membership("left", MembershipFunction.create(function="gaussian", c=-90, sigma=40))
+    smell.add_membership("center", MembershipFunction.create(function="gaussian", c=0, sigma=40))
+    smell.add_membership("right", MembershipFunction.create(function="gaussian", c=90, sigma=40))
+
+    chromosome = Chromosome()
+    for side in ("front", "left", "right"):
+        chromosome.add_rule_gene(
+            name=side,
+            value="near",
+            mapping=dict(
+                near=lambda **args: distance.fuzzify(args["x"])["near"],
+                far=lambda **args: distance.fuzzify(args["x"])["far"],
+            ),
+        )
+    chromosome.add_rule_gene(
+        name="smell",
+        value="center",
+        mapping={name: (lambda name: lambda **args: smell.fuzzify(args["x"])[name])(name) for name in ("left", "center", "right")},
+    )
+    chromosome.add_return_gene(name="turn", value=0.0, func=lambda x: x)
+    chromosome.add_return_gene(name="move", value=0.0, func=lambda x: x)
+    genotype = Genotype()
+    for _ in range(12):
+        genotype.add_chromosome(chromosome.clone())
+    random.seed(seed)
+    genotype.scamble()
+
+    exact_distance, exact_smell = distance.compile(), smell.compile()
+    fuzzifiers = {side: lambda **args: exact_distance.fuzzify(args["x"]) for side in ("front", "left", "right")}
+    fuzzifiers["smell"] = lambda **args: exact_smell.fuzzify(args["x"])
+    return genotype, fuzzifiers
+
+
+def test_compiled_genotype_matches_evaluate():
+    rng = random.Random(2)
+    for seed in range(5):
+        genotype, fuzzifiers = make_fuzzy_genotype(seed)
+        compiled = genotype.compile()
+        fuzzified = genotype.compile(fuzzifiers)
+        for _ in range(50):
+            args = {side: {"x": rng.uniform(0, 100)} for side in ("front", "left", "right")}
+            args["smell"] = {"x": rng.uniform(-180, 180)}
+            expected = genotype.evaluate(args)
+            # bit-for-bit, as the CompiledGenotype docstring promises
+            assert compiled.evaluate(args) == expected
+            assert fuzzified.evaluate(args) == expected
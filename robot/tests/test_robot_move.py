@@ -0,0 +1,72 @@
+"""Robot.move, which solves the swept circle analytically, against the pixel-step move it replaced."""
+
+import math
+import random
+
+import pytest
+
+from pysimbotlib.core import Simbot
+from pysimbotlib.core.MapGenerator import generate_map
+
+TRIALS = 2000
+
+
+def pixel_step_move(robot, step):
+    """(pos, collision, stuck) after `robot.move(step)`, checking every whole-pixel position in turn."""
+    if step >= 0:
+        rad_angle = math.radians(-robot._direction)
+        step = int(step)
+    else:
+        rad_angle = math.radians(180 - robot._direction)
+        step = int(-step)
+    dx = math.cos(rad_angle)
+    dy = math.sin(rad_angle)
+
+    collision = stuck = False
+    next_position = (robot.pos[0] + step * dx, robot.pos[1] + step * dy)
+    if not robot._is_valid_position(next_position):
+        next_position = robot.pos
+        for distance in range(0, step, 1):
+            next_position_to_validate = (next_position[0] + dx, next_position[1] + dy)
+            if not robot._is_valid_position(next_position_to_validate):
+                collision = True
+                stuck = distance == 0
+                break
+            next_position = next_position_to_validate
+    return next_position, collision, stuck
+
+
+@pytest.fixture(params=["default", "generated"])
+def simbot(request, tmp_path):
+    random.seed(0)
+    if request.param == "generated":
+        map_name = generate_map(str(tmp_path / "generated.kv"), 150, seed=3, gap=20)
+    else:
+        map_name = request.param
+    simbot = Simbot(num_robots=8, robot_see_each_other=True, map=map_name, map_cache_dir=None)
+    simbot.step()
+    return simbot
+
+
+def test_move_matches_pixel_steps(simbot):
+    rng = random.Random(1)
+    width, height = simbot.arena_size
+    collisions = 0
+    for _ in range(TRIALS):
+        robot = rng.choice(simbot.robots)
+        while True:
+            robot.pos = (rng.uniform(0, width - robot.width), rng.uniform(0, height - robot.height))
+            if robot._is_valid_position(robot.pos):
+                break
+        robot._direction = rng.choice((rng.uniform(0, 360), rng.randrange(0, 360, 45)))
+        step = rng.randint(-30, 60)
+
+        expected_pos, expected_collision, expected_stuck = pixel_step_move(robot, step)
+        robot.move(step)
+
+        assert robot.pos == pytest.approx(expected_pos, abs=1e-9)
+        assert robot.collision == expected_collision
+        assert robot.stuck == expected_stuck
+        collisions += expected_collision
+    # the poses must exercise the blocked paths, not only free moves
+    assert collisions > TRIALS // 10
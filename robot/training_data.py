@@ -0,0 +1,163 @@
+"""Streaming training data for `NeuralNetworkTrainer`.
+
+WASD sessions and rollouts are recorded as `history{N}.psh` shards by `Simbot` (older
+sessions as `history{N}.csv`, or a merged `move_history.csv`) with the columns ir0..ir7,
+angle, turn, move. `build_cache` streams
+every shard in chunks, scales the columns and appends them to one float32 .npy file,
+which `TrainingData` memory-maps, so no shard is ever held in memory as a whole.
+
+Inputs are scaled to SensorConfig.NORMALIZED_RANGE with the SensorConfig distance and
+angle ranges; turn and move are scaled from OUTPUT_RANGE, the step of one WASD key.
+The cache is rebuilt whenever the set of shards, or the size or mtime of one, changes.
+"""
+
+from glob import glob
+from itertools import islice
+from typing import Iterator, List, Optional, Sequence, Tuple
+import json
+import os
+
+import numpy as np
+
+from ann_numpy import DataScaler, SensorConfig
+from pysimbotlib.core.History import count_history_rows, iter_history_blocks
+
+HISTORY_PATTERNS: Tuple[str, ...] = ("move_history.csv", "history*.csv", "history*.psh")
+CACHE_PATH = "training_data.npy"
+COLUMNS: Tuple[str, ...] = ("ir0", "ir1", "ir2", "ir3", "ir4", "ir5", "ir6", "ir7", "angle", "turn", "move")
+OUTPUT_RANGE: Tuple[float, float] = (-5, 5)
+CHUNK_ROWS = 100_000
+
+
+def find_shards(patterns: Sequence[str] = HISTORY_PATTERNS) -> List[str]:
+    """History shards (.csv or .psh) matching any of the glob patterns, in sorted order."""
+    return sorted({path for pattern in patterns for path in glob(pattern)})
+
+
+def scale_rows(rows: np.ndarray, config: SensorConfig = SensorConfig()) -> np.ndarray:
+    """Scale raw (n, 11) history rows into float32 network inputs and targets."""
+    scale = DataScaler.scale
+    n_inputs = config.INPUT_FEATURES
+    scaled = np.empty(rows.shape, dtype=np.float32)
+    scaled[:, : n_inputs - 1] = scale(rows[:, : n_inputs - 1], config.DISTANCE_RANGE, config.NORMALIZED_RANGE)
+    scaled[:, n_inputs - 1] = scale(rows[:, n_inputs - 1], config.ANGLE_RANGE, config.NORMALIZED_RANGE)
+    scaled[:, n_inputs:] = scale(rows[:, n_inputs:], OUTPUT_RANGE, config.NORMALIZED_RANGE)
+    return scaled
+
+
+def _is_binary_shard(path: str) -> bool:
+    return path.endswith(".psh")
+
+
+def _is_history(path: str) -> bool:
+    if _is_binary_shard(path):
+        return True
+    # Simbot used to write a lone "No history" line for sessions without any key press
+    with open(path, newline="") as file:
+        return tuple(file.readline().strip().split(",")) == COLUMNS
+
+
+def _count_rows(path: str) -> int:
+    if _is_binary_shard(path):
+        return count_history_rows(path)
+    with open(path, "rb") as file:
+        lines = sum(block.count(b"\n") for block in iter(lambda: file.read(1 << 20), b""))
+        file.seek(-1, os.SEEK_END)
+        if file.read(1) != b"\n":
+            lines += 1
+    return max(lines - 1, 0)
+
+
+def _read_chunks(path: str, chunk_rows: int) -> Iterator[np.ndarray]:
+    """Raw (n, 11) rows of a shard, at most chunk_rows at a time for CSV shards."""
+    if _is_binary_shard(path):
+        # binary shards are read one written block at a time
+        for block in iter_history_blocks(path):
+            yield np.column_stack([block[name] for name in COLUMNS]).astype(np.float64)
+        return
+    with open(path, newline="") as file:
+        file.readline()
+        while True:
+            lines = list(islice(file, chunk_rows))
+            if not lines:
+                return
+            yield np.loadtxt(lines, delimiter=",", ndmin=2)
+
+
+def _fingerprint(shards: Sequence[str]) -> List:
+    return [[os.path.abspath(path), os.path.getsize(path), os.stat(path).st_mtime_ns] for path in shards]
+
+
+def build_cache(
+    shards: Sequence[str],
+    cache_path: str = CACHE_PATH,
+    chunk_rows: int = CHUNK_ROWS,
+    config: SensorConfig = SensorConfig(),
+) -> np.memmap:
+    """Scale the shards into a float32 (rows, 11) .npy file, chunk by chunk."""
+    shards = [path for path in shards if _is_history(path)]
+    total = sum(_count_rows(path) for path in shards)
+    temporary = f"{cache_path}.tmp"
+    cache = np.lib.format.open_memmap(temporary, mode="w+", dtype=np.float32, shape=(total, len(COLUMNS)))
+    row = 0
+    for path in shards:
+        for rows in _read_chunks(path, chunk_rows):
+            cache[row : row + len(rows)] = scale_rows(rows, config)
+            row += len(rows)
+    cache.flush()
+    del cache
+    if row != total:
+        os.remove(temporary)
+        raise ValueError(f"Counted {total} history rows but read {row}")
+    os.replace(temporary, cache_path)
+    with open(f"{cache_path}.json", "w") as file:
+        json.dump(_fingerprint(shards), file)
+    return np.load(cache_path, mmap_mode="r")
+
+
+def load_cache(
+    shards: Optional[Sequence[str]] = None,
+    cache_path: str = CACHE_PATH,
+    chunk_rows: int = CHUNK_ROWS,
+) -> np.memmap:
+    """The memory-mapped cache of the shards, rebuilt first when it is stale."""
+    if shards is None:
+        shards = find_shards()
+    shards = sorted(shards)
+    try:
+        with open(f"{cache_path}.json") as file:
+            fresh = json.load(file) == _fingerprint([path for path in shards if _is_history(path)])
+    except (OSError, ValueError):
+        fresh = False
+    if fresh and os.path.exists(cache_path):
+        return np.load(cache_path, mmap_mode="r")
+    return build_cache(shards, cache_path, chunk_rows)
+
+
+class TrainingData:
+    """Training batches drawn from a memory-mapped (rows, 11) array of scaled rows.
+
+    Like Keras' validation_split, the last `validation_split` of the rows, taken before
+    shuffling, is held out for validation.
+    """
+
+    def __init__(self, rows: np.ndarray, validation_split: float = 0.2, input_features: int = 9) -> None:
+        if not 0 <= validation_split < 1:
+            raise ValueError("validation_split must be in [0, 1).")
+        self.rows = rows
+        self.input_features = input_features
+        n_train = int(len(rows) * (1 - validation_split))
+        self.train_indexes = np.arange(n_train)
+        self.validation_indexes = np.arange(n_train, len(rows))
+
+    @classmethod
+    def load(cls, shards: Optional[Sequence[str]] = None, cache_path: str = CACHE_PATH, **kwargs) -> "TrainingData":
+        return cls(load_cache(shards, cache_path), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def batch(self, indexes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(inputs, targets) of the given rows, read in file order."""
+        rows = self.rows[np.sort(indexes)]
+        return rows[:, : self.input_features], rows[:, self.input_features :]